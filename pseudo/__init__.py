@@ -1,19 +1,44 @@
 """Pseudo AI Content Routing Package."""
 
 import os
-import importlib.metadata
 import logging
 import shutil
+import threading
+from datetime import datetime
 from pathlib import Path
+from typing import Callable, Dict, Optional
 import json
 
-# Configure root logger
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
 
-__version__ = importlib.metadata.version("pseudo")
+def configure_logging() -> None:
+    """Configure the root logger, called by entry points rather than on import."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+
+def __getattr__(name: str):
+    """Resolve __version__ lazily, reading package metadata only when asked for."""
+    if name == "__version__":
+        import importlib.metadata
+
+        return importlib.metadata.version("pseudo")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Bump when clean_history_files learns a new cleanup step
+HISTORY_SCHEMA_VERSION = 1
+
+# Marker file recording the schema version the chat history was cleaned to
+SCHEMA_VERSION_FILE = ".schema_version"
+
+# Shared status file so every worker process can report maintenance progress
+MAINTENANCE_STATUS_FILE = ".maintenance.json"
+
+_maintenance_status: Dict = {"state": "idle"}
+_maintenance_pid: Optional[int] = None
+_maintenance_lock = threading.Lock()
 
 
 def get_correct_chat_history_path(base_dir=None):
@@ -33,6 +58,30 @@ def get_correct_chat_history_path(base_dir=None):
     return project_root / "chat_history"
 
 
+def get_schema_version(chat_dir: Path) -> int:
+    """Read the schema version marker of a chat history directory (0 if missing)."""
+    try:
+        return int((chat_dir / SCHEMA_VERSION_FILE).read_text().strip())
+    except (OSError, ValueError):
+        return 0
+
+
+def set_schema_version(chat_dir: Path, version: int = HISTORY_SCHEMA_VERSION) -> None:
+    """Write the schema version marker of a chat history directory."""
+    chat_dir.mkdir(parents=True, exist_ok=True)
+    (chat_dir / SCHEMA_VERSION_FILE).write_text(f"{version}\n")
+
+
+def _has_chats(history_file: Path) -> bool:
+    """Return whether a history.json exists and lists at least one chat, in any storage format."""
+    from pseudo.core.services import storage
+
+    try:
+        return bool(storage.read_file(history_file).get("chats"))
+    except Exception:
+        return False
+
+
 def migrate_chat_history(cleanup=True):
     """Migrate chat history from old location to new location if needed."""
     # The incorrect path that was being used
@@ -52,7 +101,8 @@ def migrate_chat_history(cleanup=True):
         old_history_file = old_chat_dir / "history.json"
         new_history_file = new_chat_dir / "history.json"
 
-        if old_history_file.exists() and not new_history_file.exists():
+        # The app may already have created an empty index before maintenance ran
+        if old_history_file.exists() and not _has_chats(new_history_file):
             shutil.copy2(old_history_file, new_history_file)
             logging.info(f"Migrated history.json to {new_history_file}")
 
@@ -63,6 +113,9 @@ def migrate_chat_history(cleanup=True):
                 shutil.copytree(chat_dir, new_chat_dir / chat_dir.name)
                 logging.info(f"Migrated chat {chat_dir.name} to {new_chat_dir}")
 
+        # Migrated chats may predate the current schema, so force a cleanup pass
+        (new_chat_dir / SCHEMA_VERSION_FILE).unlink(missing_ok=True)
+
         logging.info("Chat history migration completed")
 
         # Cleanup old directory if requested
@@ -95,72 +148,180 @@ def migrate_chat_history(cleanup=True):
                 logging.error(f"Error during cleanup of old directory: {e}")
 
 
-def clean_history_files():
-    """Clean up history.json files to remove unused fields."""
+def clean_history_files(progress: Optional[Callable[[int, int], None]] = None):
+    """Clean up history.json files to remove unused fields.
+
+    Skipped in O(1) when the schema version marker shows the history is already clean.
+    The optional progress callback receives (processed, total) chat directory counts.
+    """
     # Get the correct chat history path
     chat_dir = get_correct_chat_history_path()
+    base_dir = chat_dir
+
+    if get_schema_version(base_dir) >= HISTORY_SCHEMA_VERSION:
+        logging.info(f"Chat history already at schema version {HISTORY_SCHEMA_VERSION}")
+        return
+
+    # History files may be JSON or MessagePack, the storage module reads either
+    from pseudo.core.services import locks, storage
+
+    failed = False
 
     # Check if history.json exists
     history_file = chat_dir / "history.json"
     if history_file.exists():
         try:
-            # Load existing history
-            with open(history_file, "r") as f:
-                history = json.load(f)
+            # Other nodes sharing the directory may be writing the history already
+            with locks.history_lock(base_dir):
+                # Load existing history
+                history = storage.read_file(history_file)
 
-            # Remove global updated_at field if it exists
-            if "updated_at" in history:
-                del history["updated_at"]
-                logging.info("Removed global updated_at field from history.json")
+                # Remove global updated_at field if it exists
+                if "updated_at" in history:
+                    del history["updated_at"]
+                    logging.info("Removed global updated_at field from history.json")
 
-            # Remove message_count from each chat entry
-            changed = False
-            for chat in history.get("chats", []):
-                if "message_count" in chat:
-                    del chat["message_count"]
-                    changed = True
+                # Remove message_count from each chat entry
+                changed = False
+                for chat in history.get("chats", []):
+                    if "message_count" in chat:
+                        del chat["message_count"]
+                        changed = True
 
-            if changed:
-                logging.info("Removed message_count fields from chat entries")
+                if changed:
+                    logging.info("Removed message_count fields from chat entries")
 
-            # Save the updated history
-            with open(history_file, "w") as f:
-                json.dump(history, f, indent=2)
+                # Save the updated history
+                storage.write_file(history_file, history)
 
             logging.info(f"Cleaned up history file at {history_file}")
         except Exception as e:
+            failed = True
             logging.error(f"Error cleaning history file: {e}")
 
     # Also check all individual chat metadata files
-    for chat_dir in (chat_dir).glob("*"):
-        if chat_dir.is_dir() and not chat_dir.name.startswith("."):
-            metadata_file = chat_dir / "metadata.json"
-            if metadata_file.exists():
-                try:
-                    # Load existing metadata
-                    with open(metadata_file, "r") as f:
-                        metadata = json.load(f)
+    chat_dirs = [
+        item for item in base_dir.glob("*") if item.is_dir() and not item.name.startswith(".")
+    ]
+    for processed, chat_dir in enumerate(chat_dirs, start=1):
+        if progress:
+            progress(processed, len(chat_dirs))
+
+        metadata_file = chat_dir / "metadata.json"
+        try:
+            # Requests append to and archive chats while this runs
+            with locks.chat_lock(base_dir, chat_dir.name):
+                # An archived or deleted chat is gone by now and must not be recreated
+                if not metadata_file.exists():
+                    continue
 
-                    # Remove message_count if it exists
-                    if "message_count" in metadata:
-                        del metadata["message_count"]
+                # Load existing metadata
+                metadata = storage.read_file(metadata_file)
 
-                        # Save the updated metadata
-                        with open(metadata_file, "w") as f:
-                            json.dump(metadata, f, indent=2)
+                # Remove message_count if it exists
+                if "message_count" in metadata:
+                    del metadata["message_count"]
 
-                        logging.info(f"Cleaned up metadata file at {metadata_file}")
-                except Exception as e:
-                    logging.error(f"Error cleaning metadata file {metadata_file}: {e}")
+                    # Save the updated metadata
+                    storage.write_file(metadata_file, metadata)
+
+                    logging.info(f"Cleaned up metadata file at {metadata_file}")
+        except Exception as e:
+            failed = True
+            logging.error(f"Error cleaning metadata file {metadata_file}: {e}")
+
+    # Leave the marker unset on errors so the next run retries
+    if not failed and base_dir.exists():
+        set_schema_version(base_dir)
+
+
+def _update_maintenance_status(persist: bool = True, **fields) -> None:
+    """Update the in-process maintenance status and mirror it to the shared status file."""
+    with _maintenance_lock:
+        _maintenance_status.update(fields)
+        status = dict(_maintenance_status)
+
+    if persist:
+        try:
+            chat_dir = get_correct_chat_history_path()
+            chat_dir.mkdir(parents=True, exist_ok=True)
+            with open(chat_dir / MAINTENANCE_STATUS_FILE, "w") as f:
+                json.dump(status, f)
+        except Exception as e:
+            logging.error(f"Error saving maintenance status: {e}")
+
+
+def get_maintenance_status() -> Dict:
+    """Return migration/cleanup progress for this process or the one running it."""
+    if _maintenance_pid == os.getpid():
+        with _maintenance_lock:
+            return dict(_maintenance_status)
+
+    # Maintenance runs in another process (e.g. the gunicorn master), read its status file
+    status_file = get_correct_chat_history_path() / MAINTENANCE_STATUS_FILE
+    try:
+        with open(status_file, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"state": "idle"}
+
+
+def run_maintenance() -> None:
+    """Migrate and clean the chat history, recording progress as it goes."""
+    global _maintenance_pid
+    _maintenance_pid = os.getpid()
+    _update_maintenance_status(
+        state="running",
+        step="migrate",
+        processed=0,
+        total=0,
+        started_at=datetime.now().isoformat(),
+        finished_at=None,
+        error=None,
+    )
+
+    def report(processed: int, total: int) -> None:
+        # Only hit the shared file every 100 chats and on the last one
+        persist = processed % 100 == 0 or processed == total
+        _update_maintenance_status(persist=persist, processed=processed, total=total)
+
+    try:
+        # Migrate old chat history if needed
+        migrate_chat_history()
+
+        # Clean up history files to remove unused fields
+        _update_maintenance_status(step="clean")
+        clean_history_files(progress=report)
+
+        # Pack chats that have not been touched for ARCHIVE_AFTER_DAYS
+        from pseudo.core.config import Config
+
+        if Config.ARCHIVE_AFTER_DAYS > 0:
+            from pseudo.core.services.chat_history import ChatManager
+
+            _update_maintenance_status(step="archive", processed=0, total=0)
+            ChatManager(base_dir=get_correct_chat_history_path()).archive_cold_chats(
+                Config.ARCHIVE_AFTER_DAYS, progress=report
+            )
+
+        _update_maintenance_status(state="completed", finished_at=datetime.now().isoformat())
+    except Exception as e:
+        logging.error(f"Error during chat history maintenance: {e}")
+        _update_maintenance_status(
+            state="failed", error=str(e), finished_at=datetime.now().isoformat()
+        )
+
+
+def start_background_maintenance() -> threading.Thread:
+    """Run chat history maintenance in a daemon thread so serving is not delayed."""
+    thread = threading.Thread(target=run_maintenance, name="history-maintenance", daemon=True)
+    thread.start()
+    return thread
 
 
 def main():
     """Run the Pseudo application."""
-    # Migrate old chat history if needed
-    migrate_chat_history()
-
-    # Clean up history files to remove unused fields
-    clean_history_files()
+    configure_logging()
 
     # Only import app when needed to avoid circular imports
     from pseudo.core.app import main as run_app
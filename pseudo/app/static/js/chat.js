@@ -16,6 +16,8 @@ document.addEventListener('DOMContentLoaded', function () {
     let currentChatId = null;
     let chatMessages = [];
     let tempChatId = null; // Add this to track temporary chat ID
+    let selectedModel = 'Auto'; // Model picked in the dropdown ("provider/model" or "Auto")
+    let selectedMode = null; // Mode of the picked model, lets the server skip classification
 
     // Initialize
     setupEventListeners();
@@ -49,6 +51,12 @@ document.addEventListener('DOMContentLoaded', function () {
      * Set up all event listeners
      */
     function setupEventListeners() {
+        // Track the model picked in the model dropdown
+        document.addEventListener('modelSelected', function (e) {
+            selectedModel = e.detail.model || 'Auto';
+            selectedMode = selectedModel === 'Auto' ? null : (e.detail.mode || null);
+        });
+
         // Send button click
         if (sendButton) {
         sendButton.addEventListener('click', handleSendMessage);
@@ -244,7 +252,9 @@ document.addEventListener('DOMContentLoaded', function () {
             },
             body: JSON.stringify({
                 message: message,
-                chat_id: currentChatId
+                chat_id: currentChatId,
+                model: selectedModel,
+                mode: selectedMode
             })
         })
         .then(response => response.json())
@@ -142,9 +142,9 @@ document.addEventListener('DOMContentLoaded', function() {
             // Add options for each provider's models
             providers.forEach(provider => {
                 const providerData = modeData.providers[provider];
-                const providerDisplayName = provider.charAt(0).toUpperCase() + provider.slice(1);
                 
-                // Check if provider has models array
+                // Only configured models can be pinned, providers without a models list are
+                // reachable through Auto
                 if (providerData && providerData.models && Array.isArray(providerData.models) && providerData.models.length > 0) {
                     // Sort models alphabetically
                     const sortedModels = [...providerData.models].sort();
@@ -161,20 +161,11 @@ document.addEventListener('DOMContentLoaded', function() {
                             displayName, 
                             description, 
                             false,
-                            `${provider}/${model}`
+                            `${provider}/${model}`,
+                            mode
                         );
                         submenu.appendChild(modelOption);
                     });
-                } else {
-                    // Fallback if no models array or empty array
-                    const modelName = getModelNameForProvider(provider, mode);
-                    const modelOption = createModelOption(
-                        modelName, 
-                        `${providerDisplayName} provider`, 
-                        false,
-                        `${provider}/${modelName.toLowerCase().replace(/\s+/g, '-')}`
-                    );
-                    submenu.appendChild(modelOption);
                 }
             });
 
@@ -201,11 +192,15 @@ document.addEventListener('DOMContentLoaded', function() {
     /**
      * Create a model option element
      */
-    function createModelOption(title, subtitle, isSelected = false, modelId = null) {
+    function createModelOption(title, subtitle, isSelected = false, modelId = null, mode = null) {
         const option = document.createElement('div');
         option.className = 'model-option' + (isSelected ? ' selected' : '');
         option.setAttribute('role', 'menuitem');
         option.setAttribute('data-model', modelId || title);
+        if (mode) {
+            // Mode the model belongs to, so the server can skip classification
+            option.setAttribute('data-mode', mode);
+        }
 
         const titleSpan = document.createElement('span');
         titleSpan.className = 'model-title';
@@ -221,32 +216,6 @@ document.addEventListener('DOMContentLoaded', function() {
         return option;
     }
 
-    /**
-     * Get a friendly model name for a provider and mode
-     */
-    function getModelNameForProvider(provider, mode) {
-        // Map of provider and mode to model names
-        // In a real implementation, this would come from the credentials.json
-        const modelNames = {
-            'text': {
-                'openai': 'GPT-4',
-                'anthropic': 'Claude 3',
-                'ollama': 'Llama 2'
-            },
-            'image': {
-                'openai': 'DALL-E 3',
-                'stability': 'Stable Diffusion XL',
-                'midjourney': 'Midjourney'
-            },
-            'audio': {
-                'elevenlabs': 'ElevenLabs TTS',
-                'openai': 'Whisper'
-            }
-        };
-
-        return modelNames[mode]?.[provider] || `${provider.charAt(0).toUpperCase() + provider.slice(1)} ${mode}`;
-    }
-
     /**
      * Get a description for a model based on its name and provider
      */
@@ -265,6 +234,7 @@ document.addEventListener('DOMContentLoaded', function() {
             option.addEventListener('click', function(e) {
                 e.stopPropagation();
                 const model = this.getAttribute('data-model');
+                const mode = this.getAttribute('data-mode');
                 
                 // Only proceed if this option has a model attribute
                 if (model) {
@@ -289,7 +259,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     
                     // Dispatch a custom event for model selection
                     document.dispatchEvent(new CustomEvent('modelSelected', {
-                        detail: { model: model }
+                        detail: { model: model, mode: mode }
                     }));
                     
                     console.log('Selected model:', model);
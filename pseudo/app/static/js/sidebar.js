@@ -6,14 +6,19 @@ document.addEventListener('DOMContentLoaded', function () {
     // Always keep sidebar expanded
     sidebar.classList.add('expanded');
     
-    // Load existing chats from the server
-    loadChats();
+    // Last chat list version received from the server, used by the change feed
+    let chatListVersion = 0;
+
+    // Load existing chats from the server, then follow changes made in other tabs
+    // from the version they were loaded at
+    loadChats().then(subscribeToChatChanges);
 
     /**
      * Load existing chats from the server
+     * @returns {Promise} Resolves once the chat list is drawn, or loading has failed
      */
     function loadChats() {
-        fetch('/api/chats', {
+        return fetch('/api/chats', {
             method: 'GET',
             headers: {
                 'Content-Type': 'application/json'
@@ -22,6 +27,8 @@ document.addEventListener('DOMContentLoaded', function () {
         .then(response => response.json())
         .then(data => {
             if (data.chats && Array.isArray(data.chats)) {
+                chatListVersion = data.version || 0;
+
                 // Check if we already have a temporary chat that should remain at the top
                 const existingTempChats = document.querySelectorAll('.chat-history-item[data-id^="temp-"]');
                 let tempChatActive = false;
@@ -53,7 +60,7 @@ document.addEventListener('DOMContentLoaded', function () {
                     const chatTitle = chat.title || 'Untitled Chat';
                     const chatId = chat.id;
                     const chatDate = new Date(chat.updated_at).toLocaleDateString();
-                    addChatHistoryItem(chatTitle, chatId, chatDate);
+                    addChatHistoryItem(chatTitle, chatId, chatDate, chat.updated_at);
                 });
                 
                 // If we had a temporary chat, re-add it at the top
@@ -78,19 +85,129 @@ document.addEventListener('DOMContentLoaded', function () {
         });
     }
 
+    /**
+     * Follow the chat change feed so only created, updated and deleted chats are redrawn
+     * Uses server-sent events where available and falls back to polling
+     */
+    function subscribeToChatChanges() {
+        if (window.EventSource) {
+            // The browser reconnects by itself and resumes from the last event id
+            const source = new EventSource(`/api/chats/changes/stream?since=${chatListVersion}`);
+            source.addEventListener('changes', event => {
+                applyChatChanges(JSON.parse(event.data));
+            });
+
+            // A closed stream (disabled on the server, or too many open) is not retried, poll instead
+            source.onerror = () => {
+                if (source.readyState === EventSource.CLOSED) {
+                    setInterval(fetchChatChanges, 10000);
+                }
+            };
+            return;
+        }
+
+        setInterval(fetchChatChanges, 10000);
+    }
+
+    /**
+     * Fetch the chats changed since the last version seen and apply them
+     */
+    function fetchChatChanges() {
+        fetch(`/api/chats/changes?since=${chatListVersion}`, {
+            method: 'GET',
+            headers: {
+                'Content-Type': 'application/json'
+            }
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (!data.error) {
+                applyChatChanges(data);
+            }
+        })
+        .catch(error => {
+            console.error('Error fetching chat changes:', error);
+        });
+    }
+
+    /**
+     * Apply a change feed delta to the sidebar without rebuilding it
+     * @param {Object} changes - Version, changed chat summaries and deleted chat IDs
+     */
+    function applyChatChanges(changes) {
+        // Changes older than what we already have are ignored
+        if (!changes.reset && changes.version <= chatListVersion) {
+            return;
+        }
+
+        if (changes.reset) {
+            // The server could not compute a delta, drop chats it no longer knows about
+            const knownIds = new Set(changes.chats.map(chat => chat.id));
+            document.querySelectorAll('.chat-history-item:not([data-id^="temp-"])').forEach(item => {
+                if (!knownIds.has(item.dataset.id)) {
+                    item.remove();
+                }
+            });
+        }
+
+        (changes.deleted || []).forEach(chatId => {
+            const item = document.querySelector(`.chat-history-item[data-id="${chatId}"]`);
+            if (item && !item.classList.contains('active')) {
+                item.remove();
+            }
+        });
+
+        // Oldest first, so each upserted chat lands above the ones already placed
+        changes.chats.slice().reverse().forEach(chat => {
+            upsertChatHistoryItem(chat);
+        });
+
+        chatListVersion = changes.version;
+    }
+
+    /**
+     * Insert or update one chat in the sidebar, keeping the list sorted by last update
+     * @param {Object} chat - Chat summary from the server
+     */
+    function upsertChatHistoryItem(chat) {
+        const chatHistory = document.querySelector('.chat-history');
+        const title = chat.title || 'Untitled Chat';
+        let item = document.querySelector(`.chat-history-item[data-id="${chat.id}"]`);
+
+        if (item) {
+            const titleElement = item.querySelector('.chat-item-title');
+            titleElement.textContent = title.length > 30 ? title.substring(0, 30) + '...' : title;
+            titleElement.title = title;
+            item.querySelector('.chat-item-date').textContent = new Date(chat.updated_at).toLocaleDateString();
+            item.dataset.updated = chat.updated_at;
+            item.remove();
+        } else {
+            item = addChatHistoryItem(title, chat.id, new Date(chat.updated_at).toLocaleDateString(), chat.updated_at);
+            item.remove();
+        }
+
+        // Place before the first saved chat that was updated earlier, temp chats stay on top
+        const nextItem = Array.from(chatHistory.children).find(other =>
+            !other.dataset.id.startsWith('temp-') && (other.dataset.updated || '') < chat.updated_at
+        );
+        chatHistory.insertBefore(item, nextItem || null);
+    }
+
     /**
      * Add a chat history item
      * @param {string} title - Chat title
      * @param {string} id - Unique identifier
      * @param {string} date - Formatted date string
+     * @param {string} [updatedAt] - ISO timestamp of the last update, used for ordering
      */
-    function addChatHistoryItem(title, id, date) {
+    function addChatHistoryItem(title, id, date, updatedAt) {
         const chatHistory = document.querySelector('.chat-history');
 
         // Create chat history item
         const item = document.createElement('div');
         item.className = 'chat-history-item';
         item.dataset.id = id;
+        item.dataset.updated = updatedAt || new Date().toISOString();
 
         const itemContent = document.createElement('div');
         itemContent.className = 'chat-item-content';
@@ -213,7 +330,8 @@ document.addEventListener('DOMContentLoaded', function () {
         }
         
         // For real chat IDs, load chat data from the server
-        fetch(`/api/chats/${chatId}`, {
+        // The compact view leaves out message fields the chat UI does not use
+        fetch(`/api/chats/${chatId}?view=compact`, {
             method: 'GET',
             headers: {
                 'Content-Type': 'application/json'
@@ -501,8 +619,16 @@ document.addEventListener('DOMContentLoaded', function () {
      */
     function updateChatInSidebar(chatId, title) {
         // Handle case where we need to update a temp chat
-        const tempChatItem = document.querySelector('.chat-history-item[data-id^="temp-"].active');
+        let tempChatItem = document.querySelector('.chat-history-item[data-id^="temp-"].active');
         
+        // The change feed may already have added the real chat, keep only that item
+        const realChatItem = chatId ? document.querySelector(`.chat-history-item[data-id="${chatId}"]`) : null;
+        if (tempChatItem && realChatItem) {
+            tempChatItem.remove();
+            tempChatItem = null;
+            realChatItem.classList.add('active');
+        }
+
         // If we have an active temp chat and a real chat ID, update the temp chat
         if (tempChatItem && chatId && !chatId.startsWith('temp-')) {
             // Update the temp chat with the real ID
@@ -521,6 +647,7 @@ document.addEventListener('DOMContentLoaded', function () {
             if (dateElement) {
                 dateElement.textContent = new Date().toLocaleDateString();
             }
+            tempChatItem.dataset.updated = new Date().toISOString();
             
             // Ensure it's at the top of the list
             const chatHistory = document.querySelector('.chat-history');
@@ -549,6 +676,7 @@ document.addEventListener('DOMContentLoaded', function () {
             if (dateElement) {
                 dateElement.textContent = new Date().toLocaleDateString();
             }
+            existingItem.dataset.updated = new Date().toISOString();
             
             // Move to top of list (most recent first)
             const chatHistory = document.querySelector('.chat-history');
@@ -569,6 +697,7 @@ document.addEventListener('DOMContentLoaded', function () {
         deleteChat,
         updateChatInSidebar,
         refreshChats: loadChats,
+        syncChats: fetchChatChanges,
         removeExistingTempChat,
         createNewChat: function() {
             // This is a bridge function to allow chat.js to create a new chat from sidebar.js
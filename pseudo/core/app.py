@@ -1,16 +1,23 @@
 """Flask application setup and entry point."""
 
+import argparse
 import os
 from pathlib import Path
-
-from flask import Flask
+from typing import TYPE_CHECKING, List, Optional
 
 from pseudo.core.config import Config
-from pseudo.core.routes import register_routes
+
+if TYPE_CHECKING:
+    from flask import Flask
 
 
-def create_app() -> Flask:
+def create_app() -> "Flask":
     """Create and configure the Flask application instance."""
+    # Flask and the routes are imported here so the CLI starts without them
+    from flask import Flask
+
+    from pseudo.core.routes import register_routes
+
     # Create Flask app with proper static and template folders
     app = Flask(
         __name__,
@@ -21,6 +28,12 @@ def create_app() -> Flask:
     # Load configuration from config module
     app.config.from_object(Config)
 
+    # Faster JSON encoding and compressed responses for large chat payloads
+    from pseudo.core.responses import install_json_provider, register_compression
+
+    install_json_provider(app)
+    register_compression(app)
+
     # Ensure required directories exist for storage
     chat_history_dir = Path(app.config["CHAT_HISTORY_DIR"])
     chat_history_dir.mkdir(exist_ok=True, parents=True)  #  Create directory if it doesn't exist
@@ -38,8 +51,136 @@ def create_app() -> Flask:
     return app
 
 
-def main() -> None:
+def start_worker_threads(app: "Flask") -> None:
+    """Start the background threads of a serving process: selector keep-alive and trash collector.
+
+    Threads do not survive fork, so preforking servers call this in each worker after the
+    fork rather than in create_app.
+    """
+    # Start loading the local selector model before the first classification needs it
+    from pseudo.core.services.selector import selector_manager
+
+    selector_manager.ensure_started()
+
+    # Reclaim the space of chats deleted before the last shutdown
+    from pseudo.core.services.trash import trash_collector
+
+    trash_collector.ensure_started(Path(app.config["CHAT_HISTORY_DIR"]))
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser for the `pseudo` command."""
+    parser = argparse.ArgumentParser(prog="pseudo", description="Run the Pseudo application.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    # Production server with a tuned worker model
+    serve_parser = subparsers.add_parser("serve", help="Run under a production server")
+    serve_parser.add_argument(
+        "--server",
+        choices=["gunicorn", "uvicorn"],
+        default="gunicorn",
+        help="gunicorn loads the app once before forking workers, "
+        "uvicorn workers each load it after they start",
+    )
+    serve_parser.add_argument("--host", default=os.environ.get("FLASK_HOST", "0.0.0.0"))
+    serve_parser.add_argument("--port", type=int, default=int(os.environ.get("FLASK_PORT", 5000)))
+    serve_parser.add_argument("--workers", type=int, help="Worker processes")
+    serve_parser.add_argument("--threads", type=int, help="Threads per worker (gunicorn)")
+    serve_parser.add_argument("--timeout", type=int, help="Worker timeout in seconds")
+    serve_parser.add_argument(
+        "--graceful-timeout", type=int, help="Seconds in-flight chats get to finish on shutdown"
+    )
+
+    # Rewrite the chat history files in another storage format
+    convert_parser = subparsers.add_parser(
+        "convert-storage",
+        help="Convert chat history files to another storage format",
+        description="Rewrite history.json and each chat's metadata.json and summary.json. "
+        "Message logs stay JSON lines, archived chats are converted when next written.",
+    )
+    convert_parser.add_argument("--format", choices=["json", "msgpack"], default="json")
+    convert_parser.add_argument(
+        "--zstd", action="store_true", help="Compress the converted files with zstd"
+    )
+
+    # Pack cold chats into archives, e.g. from a daily cron job
+    archive_parser = subparsers.add_parser("archive", help="Archive chats not updated recently")
+    archive_parser.add_argument(
+        "--days",
+        type=int,
+        default=Config.ARCHIVE_AFTER_DAYS or 30,
+        help="Archive chats not updated for this many days",
+    )
+
+    # Report turn latency and provider failure rates from the stored chat history
+    stats_parser = subparsers.add_parser(
+        "stats", help="Report latency percentiles and failure rates by mode/provider/model"
+    )
+    stats_parser.add_argument("--days", type=float, help="Only count turns of the last N days")
+    stats_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Run the application with settings from environment variables."""
+    args = _build_parser().parse_args(argv)
+
+    from pseudo import configure_logging
+
+    configure_logging()
+
+    if args.command == "serve":
+        # Only import the server module when needed
+        from pseudo.core.server import serve
+
+        serve(
+            server=args.server,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            threads=args.threads,
+            timeout=args.timeout,
+            graceful_timeout=args.graceful_timeout,
+        )
+        return
+
+    if args.command == "convert-storage":
+        from pseudo import get_correct_chat_history_path
+        from pseudo.core.services.storage import convert_history
+
+        stats = convert_history(get_correct_chat_history_path(), args.format, args.zstd)
+        print(
+            f"Converted {stats['converted']} files to {args.format} "
+            f"({stats['bytes_before']} -> {stats['bytes_after']} bytes), "
+            f"{stats['failed']} failed"
+        )
+        return
+
+    if args.command == "archive":
+        from pseudo import get_correct_chat_history_path
+        from pseudo.core.services.chat_history import ChatManager
+
+        chat_manager = ChatManager(base_dir=get_correct_chat_history_path())
+        print(f"Archived {chat_manager.archive_cold_chats(args.days)} chats")
+        return
+
+    if args.command == "stats":
+        import json
+
+        from pseudo import get_correct_chat_history_path
+        from pseudo.core.services.metrics import aggregate, format_report, since_days
+
+        report = aggregate(get_correct_chat_history_path(), since_days(args.days))
+        print(json.dumps(report, indent=2) if args.json else format_report(report))
+        return
+
+    # The debug reloader runs main() again in its child, maintenance runs in the parent only
+    if os.environ.get("WERKZEUG_RUN_MAIN") != "true":
+        from pseudo import start_background_maintenance
+
+        start_background_maintenance()
+
     # Create the Flask application
     app = create_app()
 
@@ -52,6 +193,10 @@ def main() -> None:
         "t",
     )  #  Debug mode toggle
 
+    # With the debug reloader, only its child process serves requests
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_worker_threads(app)
+
     # Display startup information
     print(f"Starting Pseudo application on http://{host}:{port}")
     print(f"Chat history: {app.config['CHAT_HISTORY_DIR']}")
@@ -1,6 +1,7 @@
 """Application configuration settings and environment variable handling."""
 
 import os
+import tempfile
 from pathlib import Path
 
 # Base directory
@@ -9,6 +10,9 @@ base_dir = Path(__file__).parent.parent.parent
 # Chat history directory
 chat_history_dir = os.environ.get("CHAT_HISTORY_DIR", base_dir / "chat_history")
 
+# Node-local directory for the SQLite databases the worker processes of one host share
+runtime_dir = os.environ.get("RUNTIME_DIR", Path(tempfile.gettempdir()) / "pseudo")
+
 # Credentials file path
 credentials_file = os.environ.get("CREDENTIALS_FILE", base_dir / "credentials.json")
 
@@ -23,6 +27,7 @@ class Config:
     # Application settings
     BASE_DIR = base_dir
     CHAT_HISTORY_DIR = chat_history_dir
+    RUNTIME_DIR = runtime_dir
     CREDENTIALS_FILE = credentials_file
 
     # Ollama settings for content detection
@@ -32,6 +37,194 @@ class Config:
     SELECTOR_MODEL_TAG = os.environ.get(
         "SELECTOR_MODEL_TAG", "8b"
     )  #  Size/tag of the selector model
+    SELECTOR_KEEP_ALIVE = os.environ.get(
+        "SELECTOR_KEEP_ALIVE", "30m"
+    )  #  How long Ollama keeps the classifier model and prompt context loaded
+    SELECTOR_ENABLED = os.environ.get("SELECTOR_ENABLED", "False").lower() in (
+        "true",
+        "1",
+        "t",
+    )  #  Preload the selector in Ollama and classify with it first
+    SELECTOR_FALLBACK_MODEL = os.environ.get(
+        "SELECTOR_FALLBACK_MODEL", ""
+    )  #  Lighter Ollama model used while the selector loads, empty uses the credentials queue
+    SELECTOR_PING_INTERVAL = int(
+        os.environ.get("SELECTOR_PING_INTERVAL", 300)
+    )  #  Seconds between keep-alive pings, shorter than SELECTOR_KEEP_ALIVE
+    SELECTOR_LOAD_TIMEOUT = int(
+        os.environ.get("SELECTOR_LOAD_TIMEOUT", 300)
+    )  #  Seconds to wait for Ollama to load the selector into memory
+    OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
+
+    CLASSIFIER_STREAMING = os.environ.get("CLASSIFIER_STREAMING", "True").lower() in (
+        "true",
+        "1",
+        "t",
+    )  #  Stream Ollama classifiers and stop once mode and content are parsed
+    CLASSIFIER_CACHE_TTL = int(
+        os.environ.get("CLASSIFIER_CACHE_TTL", 0)
+    )  #  Seconds a shared classification is reused, 0 (default) classifies every request
+
+    # Classifier prompt template: "full" or "compact", and its template version
+    CLASSIFIER_PROMPT = os.environ.get("CLASSIFIER_PROMPT", "full")
+    CLASSIFIER_PROMPT_VERSION = os.environ.get("CLASSIFIER_PROMPT_VERSION", "v1")
+
+    # Answer text requests in the same call that classifies them
+    COMBINED_TEXT_MODE = os.environ.get("COMBINED_TEXT_MODE", "False").lower() in (
+        "true",
+        "1",
+        "t",
+    )
+
+    # Speculative text generation while the classifier runs (opt-in)
+    SPECULATIVE_TEXT = os.environ.get("SPECULATIVE_TEXT", "False").lower() in ("true", "1", "t")
+    SPECULATIVE_PROVIDERS = [
+        name.strip()
+        for name in os.environ.get("SPECULATIVE_PROVIDERS", "ollama").split(",")
+        if name.strip()
+    ]  #  Providers cheap enough to spend a possibly wasted call on
+    SPECULATIVE_MAX_INPUT_CHARS = int(
+        os.environ.get("SPECULATIVE_MAX_INPUT_CHARS", 2000)
+    )  #  Longer inputs are not speculated on
+
+    # Conversation context settings
+    CONTEXT_TOKEN_BUDGET = int(
+        os.environ.get("CONTEXT_TOKEN_BUDGET", 2000)
+    )  #  Estimated tokens of earlier turns sent with text prompts, 0 sends the prompt alone
+    CONTEXT_SUMMARIES = os.environ.get("CONTEXT_SUMMARIES", "False").lower() in (
+        "true",
+        "1",
+        "t",
+    )  #  Summarize turns that no longer fit the budget, costs a text call now and then
+
+    # Provider call settings
+    PROVIDER_EXECUTOR_WORKERS = int(
+        os.environ.get("PROVIDER_EXECUTOR_WORKERS", 64)
+    )  #  Threads for speculative provider calls and async callers of ContentRouter
+    REQUEST_COALESCING = os.environ.get("REQUEST_COALESCING", "True").lower() in (
+        "true",
+        "1",
+        "t",
+    )  #  Identical generations in flight at the same time share one provider call
+
+    # Provider rate limits, configured per provider in credentials.json
+    RATE_LIMIT_MAX_WAIT = float(
+        os.environ.get("RATE_LIMIT_MAX_WAIT", 30)
+    )  #  Seconds a call may queue for a slot before the next provider is tried
+    RATE_LIMIT_LEASE_SECONDS = int(
+        os.environ.get("RATE_LIMIT_LEASE_SECONDS", 600)
+    )  #  Concurrency slots held longer than this (crashed worker) are freed
+    RATE_LIMIT_DB = os.environ.get(
+        "RATE_LIMIT_DB", ""
+    )  #  Limiter database, .rate_limits.db in RUNTIME_DIR if unset, keep it off NFS
+
+    # Adaptive provider ordering (opt-in), providers marked "pinned" keep their place
+    ADAPTIVE_ROUTING = os.environ.get("ADAPTIVE_ROUTING", "False").lower() in (
+        "true",
+        "1",
+        "t",
+    )  #  Order each mode's provider queue by measured latency and success rate
+    ADAPTIVE_EXPLORATION = float(
+        os.environ.get("ADAPTIVE_EXPLORATION", 0.05)
+    )  #  Share of requests that try a random other provider/model first
+    ADAPTIVE_EWMA_ALPHA = float(
+        os.environ.get("ADAPTIVE_EWMA_ALPHA", 0.2)
+    )  #  Weight of the newest call in the rolling latency and success rate
+    ADAPTIVE_ROUTING_DB = os.environ.get(
+        "ADAPTIVE_ROUTING_DB", ""
+    )  #  Statistics database, .adaptive_routing.db in RUNTIME_DIR if unset, keep it off NFS
+
+    # Cache shared by the worker processes on a host
+    SHARED_CACHE = os.environ.get("SHARED_CACHE", "True").lower() in (
+        "true",
+        "1",
+        "t",
+    )  #  Share classifier results and chat summaries between workers
+    SHARED_CACHE_DB = os.environ.get(
+        "SHARED_CACHE_DB", ""
+    )  #  Cache database, .shared_cache.db in RUNTIME_DIR if unset, keep it off NFS
+    SHARED_CACHE_MAX_ENTRIES = int(
+        os.environ.get("SHARED_CACHE_MAX_ENTRIES", 10000)
+    )  #  Most recently used entries kept per kind of entry
+
+    # Batch chat settings
+    BATCH_CONCURRENCY = int(
+        os.environ.get("BATCH_CONCURRENCY", 8)
+    )  #  Concurrent provider calls per batch request
+    BATCH_MAX_MESSAGES = int(os.environ.get("BATCH_MAX_MESSAGES", 500))  #  Messages per batch
+
+    # Sidebar change feed settings
+    CHANGE_FEED_TOMBSTONES = int(
+        os.environ.get("CHANGE_FEED_TOMBSTONES", 1000)
+    )  #  Deleted chats remembered in history.json for clients catching up
+    CHANGE_FEED_STREAM = os.environ.get("CHANGE_FEED_STREAM", "False").lower() in (
+        "true",
+        "1",
+        "t",
+    )  #  Serve the SSE change stream, each open tab holds one server thread
+    CHANGE_FEED_MAX_STREAMS = int(
+        os.environ.get("CHANGE_FEED_MAX_STREAMS", 8)
+    )  #  Open change streams per worker, further tabs poll instead
+    CHANGE_FEED_POLL_INTERVAL = float(
+        os.environ.get("CHANGE_FEED_POLL_INTERVAL", 1.0)
+    )  #  Seconds between history.json checks in a change stream
+    CHANGE_FEED_STREAM_SECONDS = int(
+        os.environ.get("CHANGE_FEED_STREAM_SECONDS", 300)
+    )  #  A change stream closes after this and the browser reconnects
+
+    # API response settings
+    FAST_JSON = os.environ.get("FAST_JSON", "True").lower() in (
+        "true",
+        "1",
+        "t",
+    )  #  Serialize responses with orjson when it is installed
+    COMPRESS_MIN_SIZE = int(
+        os.environ.get("COMPRESS_MIN_SIZE", 1024)
+    )  #  Smallest response body in bytes that is compressed, negative disables compression
+    COMPRESS_GZIP_LEVEL = int(os.environ.get("COMPRESS_GZIP_LEVEL", 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get("COMPRESS_BROTLI_QUALITY", 5))
+
+    # Chat history storage settings
+    STORAGE_FORMAT = os.environ.get(
+        "STORAGE_FORMAT", "json"
+    ).lower()  #  json (compact) or msgpack, existing files are read in either format
+    ZSTD_LEVEL = int(os.environ.get("ZSTD_LEVEL", 10))  #  zstd level for compressed history files
+    ARCHIVE_AFTER_DAYS = int(
+        os.environ.get("ARCHIVE_AFTER_DAYS", 0)
+    )  #  Archive chats not updated for this many days at startup, 0 disables archiving
+    TRASH_GC_INTERVAL = float(
+        os.environ.get("TRASH_GC_INTERVAL", 300)
+    )  #  Seconds between trash collections, deletes also wake the collector
+
+    # Multi-node settings, for several servers sharing one CHAT_HISTORY_DIR
+    LOCK_BACKEND = os.environ.get(
+        "LOCK_BACKEND", "file"
+    ).lower()  #  file (locks on the shared directory) or redis
+    REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")  #  For LOCK_BACKEND=redis
+    LOCK_TIMEOUT = float(
+        os.environ.get("LOCK_TIMEOUT", 30)
+    )  #  Seconds a write may wait for a chat history lock before failing
+    LOCK_LEASE_SECONDS = int(
+        os.environ.get("LOCK_LEASE_SECONDS", 60)
+    )  #  Redis locks held longer than this (crashed node) expire
+    NODE_ID = os.environ.get(
+        "NODE_ID", ""
+    )  #  Name of this server in lock and temporary file names, the hostname if unset
 
     # Media settings
     MAX_MEDIA_SIZE = int(os.environ.get("MAX_MEDIA_SIZE", 10 * 1024 * 1024))  #  10 MB
+
+    # Production server settings (used by `pseudo serve`)
+    SERVER_WORKERS = int(
+        os.environ.get("SERVER_WORKERS", min(os.cpu_count() or 1, 4))
+    )  #  Worker processes
+    SERVER_THREADS = int(
+        os.environ.get("SERVER_THREADS", 16)
+    )  #  Threads per worker, most of them wait on provider calls
+    SERVER_TIMEOUT = int(
+        os.environ.get("SERVER_TIMEOUT", 300)
+    )  #  Seconds before a silent worker is restarted, longer than the slowest provider call
+    SERVER_GRACEFUL_TIMEOUT = int(
+        os.environ.get("SERVER_GRACEFUL_TIMEOUT", 120)
+    )  #  Seconds in-flight chats get to finish on shutdown
+    SERVER_KEEPALIVE = int(os.environ.get("SERVER_KEEPALIVE", 5))  #  Idle keep-alive seconds
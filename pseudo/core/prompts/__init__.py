@@ -0,0 +1,26 @@
+"""Versioned prompt templates used by the content router."""
+
+from functools import lru_cache
+from pathlib import Path
+
+# Directory holding the <name>_<variant>_<version>.txt template files
+PROMPTS_DIR = Path(__file__).parent
+
+# Classifier prompt variants shipped with the package
+CLASSIFIER_VARIANTS = ("full", "compact")
+
+
+@lru_cache(maxsize=None)
+def load_prompt(name: str, version: str = "v1") -> str:
+    """Load a prompt template once and return the cached text."""
+    path = PROMPTS_DIR / f"{name}_{version}.txt"
+    if not path.exists():
+        raise ValueError(f"Unknown prompt template: {path.name}")
+    return path.read_text(encoding="utf-8")
+
+
+def get_classifier_prompt(variant: str = "full", version: str = "v1") -> str:
+    """Return the classifier system prompt for a variant ('full' or 'compact')."""
+    if variant not in CLASSIFIER_VARIANTS:
+        raise ValueError(f"Unknown classifier prompt variant: {variant}")
+    return load_prompt(f"classifier_{variant}", version)
@@ -0,0 +1,142 @@
+"""Fast JSON serialization and compression for API responses."""
+
+import gzip
+import logging
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional
+
+from flask.json.provider import DefaultJSONProvider
+
+if TYPE_CHECKING:
+    from flask import Flask, Response
+
+logger = logging.getLogger(__name__)
+
+# Content types worth compressing, media files are already compressed
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/",
+)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson, keeping Flask's output options."""
+
+    def __init__(self, app: "Flask") -> None:
+        """Initialize the provider and import orjson."""
+        import orjson
+
+        super().__init__(app)
+        self._orjson = orjson
+
+    def _options(self, indent: bool) -> int:
+        """Return orjson option flags matching the provider settings."""
+        # Datetimes go through Flask's default so they keep its HTTP date format
+        options = self._orjson.OPT_NON_STR_KEYS | self._orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= self._orjson.OPT_SORT_KEYS
+        if indent:
+            options |= self._orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize data as JSON text."""
+        return self._dump_bytes(obj, indent=bool(kwargs.get("indent"))).decode()
+
+    def _dump_bytes(self, obj: Any, indent: bool = False) -> bytes:
+        """Serialize data as JSON bytes, falling back to Flask for types orjson rejects."""
+        try:
+            return self._orjson.dumps(obj, default=self.default, option=self._options(indent))
+        except TypeError:
+            # e.g. integers wider than 64 bits
+            return super().dumps(obj, indent=2 if indent else None).encode()
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        """Deserialize JSON text or bytes."""
+        return self._orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> "Response":
+        """Serialize the arguments straight to bytes and wrap them in a JSON response."""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._dump_bytes(obj, indent=indent) + b"\n", mimetype=self.mimetype
+        )
+
+
+def install_json_provider(app: "Flask") -> None:
+    """Serialize JSON responses with orjson when it is installed."""
+    if not app.config["FAST_JSON"]:
+        return
+
+    try:
+        app.json = OrjsonProvider(app)
+    except ImportError:
+        logger.info("orjson is not installed, using the standard JSON provider")
+
+
+@lru_cache(maxsize=None)
+def _brotli() -> Optional[Any]:
+    """Return the brotli module, or None if it is not installed."""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _choose_encoding(accept_encoding: str) -> str:
+    """Pick brotli if the client accepts it and it is installed, else gzip, else none."""
+    accepted = {
+        part.split(";")[0].strip().lower()
+        for part in accept_encoding.split(",")
+        if not part.strip().endswith("q=0")
+    }
+
+    if "br" in accepted and _brotli() is not None:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return ""
+
+
+def register_compression(app: "Flask") -> None:
+    """Compress JSON and text responses larger than COMPRESS_MIN_SIZE bytes."""
+    min_size = app.config["COMPRESS_MIN_SIZE"]
+    if min_size < 0:
+        return
+
+    @app.after_request
+    def compress_response(response: "Response") -> "Response":
+        from flask import request
+
+        # Streams (NDJSON batches, SSE) and files are sent as they are produced
+        if (
+            response.status_code < 200
+            or response.status_code >= 300
+            or response.is_streamed
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or not (response.mimetype or "").startswith(COMPRESSIBLE_TYPES)
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        if (response.content_length or 0) < min_size:
+            return response
+
+        encoding = _choose_encoding(request.headers.get("Accept-Encoding", ""))
+        if not encoding:
+            return response
+
+        data = response.get_data()
+        if encoding == "br":
+            compressed = _brotli().compress(data, quality=app.config["COMPRESS_BROTLI_QUALITY"])
+        else:
+            compressed = gzip.compress(data, compresslevel=app.config["COMPRESS_GZIP_LEVEL"])
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        return response
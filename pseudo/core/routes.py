@@ -1,25 +1,36 @@
+import asyncio
 import json
 import logging
 import os
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from flask import (
     Blueprint,
+    Response,
+    current_app,
     g,
     jsonify,
     render_template,
     request,
     send_file,
     send_from_directory,
-    current_app,
+    stream_with_context,
 )
 
-from pseudo.core.services.chat_history import ChatManager
-from pseudo.core.services.content_router import ContentRouter
+from pseudo.core.services.chat_history import ChatManager, compact_chat_view
+from pseudo.core.services.content_router import MODES, ContentRouter
+from pseudo.core.services.context import assemble_context, summarize_in_background
 from pseudo.core.services.media_manager import MediaManager
+from pseudo.core.services.metrics import aggregate, attach_turn_metrics, since_days
+from pseudo.core.services.scheduler import provider_scheduler
+from pseudo.core.services.selector import selector_manager
+from pseudo.core.services.shared_cache import shared_cache
+from pseudo.core.services.speculation import speculation_stats
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -30,6 +41,10 @@ main_bp = Blueprint("main", __name__)
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 chats_bp = Blueprint("chats", __name__, url_prefix="/chats")
 
+# Change streams open in this process, each holds a server thread until it closes
+_open_streams = 0
+_open_streams_lock = threading.Lock()
+
 
 def get_chat_manager():
     """Get or create chat manager instance from flask application context."""
@@ -52,6 +67,9 @@ def index():
 def chat_history_media(chat_id, filename):
     chat_manager = get_chat_manager()
     chat_media_path = chat_manager.base_dir / chat_id / "media"
+    if not chat_media_path.exists():
+        # Media of an archived chat is served once the chat is unpacked
+        chat_manager.restore_archived_chat(chat_id)
     return send_from_directory(chat_media_path, filename)
 
 
@@ -61,6 +79,8 @@ def download_chat_history_media(chat_id, filename):
     """Allow downloading chat history media files with proper content disposition."""
     chat_manager = get_chat_manager()
     chat_media_path = chat_manager.base_dir / chat_id / "media" / filename
+    if not chat_media_path.exists():
+        chat_manager.restore_archived_chat(chat_id)
 
     # Get file extension for MIME type
     _, ext = os.path.splitext(filename)
@@ -79,158 +99,486 @@ def download_chat_history_media(chat_id, filename):
     )
 
 
+def build_chat_result(
+    chat_manager: ChatManager,
+    chat_id: str,
+    message: str,
+    mode: str,
+    cleaned_content: str,
+    response_data,
+):
+    """Save any generated media and build the API response and assistant message.
+
+    Returns a tuple of (response_obj, assistant_message, media_path).
+    """
+    # Extract response, provider and model information
+    provider = None
+    model = None
+    metrics = None
+
+    if isinstance(response_data, dict):
+        # Turn timing and provider attempts, stored with the message but not returned
+        metrics = response_data.pop("metrics", None)
+        response_data.pop("attempts", None)
+
+        # New format with provider and model included
+        provider = response_data.get("provider")
+        model = response_data.get("model")
+
+        # Extract the actual response content
+        if "content" in response_data:
+            response = response_data["content"]
+        else:
+            # If for some reason there's no content key, use the whole response
+            response = response_data
+    else:
+        # Legacy format, response is directly returned
+        response = response_data
+
+    # Handle media if needed
+    media_path = None
+    response_obj = {
+        "response": response if isinstance(response, str) else "Generated content",
+        "selected_mode": mode,
+        "chat_id": chat_id,
+        "original_input": message,
+        "cleaned_content": cleaned_content,
+        "provider": provider,
+        "model": model,
+    }
+
+    if mode in ["image", "audio"]:
+        # Get chat-specific media directory
+        chat_media_dir = chat_manager.base_dir / chat_id / "media"
+        chat_media_dir.mkdir(parents=True, exist_ok=True)
+
+        # Save media directly to chat-specific directory only
+        # Extract the actual response content for media
+        media_content = (
+            response
+            if not isinstance(response_data, dict) or "content" not in response_data
+            else response_data["content"]
+        )
+        media_path = chat_manager.save_media(media_content, mode, chat_media_dir)
+
+        if media_path:
+            # Get filename for the URL
+            filename = os.path.basename(media_path)
+
+            # Create a proper URL path that will work with our routes
+            url_path = f"/chat_history/{chat_id}/media/{filename}"
+
+            # Create response object with media info
+            response_obj = {
+                "type": mode,
+                "url": url_path,
+                "filename": filename,
+                "selected_mode": mode,
+                "chat_id": chat_id,
+                "response": "Generated content",  # Just a placeholder for text display
+                "original_input": message,
+                "cleaned_content": cleaned_content,
+                "provider": provider,
+                "model": model,
+            }
+
+    # Save assistant response to chat history
+    assistant_message = {
+        "role": "assistant",
+        "mode": mode,
+        "original_input": message,
+        "cleaned_content": cleaned_content,
+        "provider": provider,
+        "model": model,
+    }
+    if metrics is not None:
+        if media_path and os.path.isfile(media_path):
+            metrics["media_bytes"] = os.path.getsize(media_path)
+        assistant_message["metrics"] = metrics
+
+    # Handle content based on type
+    if isinstance(response, bytes):
+        # Don't try to JSON serialize bytes
+        assistant_message["content"] = "Generated content"
+    elif isinstance(response, str):
+        assistant_message["content"] = response
+    else:
+        # Try to serialize any other type
+        try:
+            assistant_message["content"] = json.dumps(response)
+        except Exception:
+            assistant_message["content"] = str(response)
+
+    return response_obj, assistant_message, media_path
+
+
+def _pinned_model(selected_model: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Return the (provider, model) pinned by the model dropdown, or (None, None) for Auto."""
+    # A pinned model arrives as "provider/model"
+    if selected_model and selected_model != "Auto" and "/" in selected_model:
+        provider, model = selected_model.split("/", 1)
+        return provider, model
+    return None, None
+
+
+def _pin_error(
+    router: ContentRouter, mode: Optional[str], provider: Optional[str], model: Optional[str]
+) -> Optional[str]:
+    """Return why a pinned provider/model cannot be used, or None if it is configured."""
+    if not provider:
+        return None
+    if mode:
+        if model in router.get_available_models(mode, provider):
+            return None
+        return f"Unknown model for {mode} mode: {provider}/{model}"
+    if router.find_mode_for_model(provider, model):
+        return None
+    return f"Unknown model: {provider}/{model}"
+
+
+def _chat_request_error(router: ContentRouter, data: Any) -> Optional[str]:
+    """Return why an /api/chat body cannot be served, or None if it is valid."""
+    if not isinstance(data, dict):
+        return "Request body must be a JSON object"
+    if not data.get("message"):
+        return "No message provided"
+
+    selected_mode = data.get("mode")  #  Optional explicit mode, skips classification
+    if selected_mode and selected_mode not in MODES:
+        return f"Unsupported mode: {selected_mode}"
+
+    # A pinned model that is not configured would silently fall back to the queue
+    return _pin_error(router, selected_mode, *_pinned_model(data.get("model", "Auto")))
+
+
+def _start_chat_turn(
+    chat_manager: ChatManager, chat_id: Optional[str], message: str
+) -> Tuple[str, List[Dict[str, str]], Optional[str]]:
+    """Create the chat if needed, read the turn's context and save the user message.
+
+    Returns (chat_id, context, dropped_before), see assemble_context.
+    """
+    # Initialize chat if needed
+    if not chat_id or not chat_manager.get_chat(chat_id, include_messages=False):
+        chat_id = chat_manager.create_new_chat(save=True)
+
+    # Earlier turns that fit the context token budget, read before this message is saved
+    context, dropped_before = assemble_context(chat_manager, chat_id)
+
+    # Save original user message to chat history
+    user_message = {"role": "user", "content": message}
+    chat_manager.add_message(chat_id, user_message)
+    return chat_id, context, dropped_before
+
+
+def _finish_chat_turn(
+    router: ContentRouter,
+    chat_manager: ChatManager,
+    chat_id: str,
+    message: str,
+    routed: Tuple[str, str, Any],
+    summarize: bool,
+) -> Dict[str, Any]:
+    """Save the assistant message of a routed turn and return the /api/chat response."""
+    mode, cleaned_content, response_data = routed
+
+    # For debugging
+    logger.info(f"Original input: '{message}'")
+    logger.info(f"Detected mode: {mode}")
+    logger.info(f"Cleaned content: '{cleaned_content}'")
+
+    response_obj, assistant_message, media_path = build_chat_result(
+        chat_manager, chat_id, message, mode, cleaned_content, response_data
+    )
+
+    # Pass media path for saving in chat history
+    # This will save the media filename in the message object
+    chat_manager.add_message(chat_id, assistant_message, media_path)
+
+    # Fold turns that fell out of the context window into the chat's summary
+    if summarize:
+        summarize_in_background(router, chat_manager, chat_id)
+
+    # Get the chat metadata to extract the title
+    chat_data = chat_manager.get_chat(chat_id, include_messages=False)
+    if chat_data and "title" in chat_data:
+        response_obj["title"] = chat_data["title"]
+
+    # Update the title in the response
+    if "title" not in response_obj or not response_obj["title"]:
+        # Use the first few words of the user message as the title
+        title = message.strip()
+        if len(title) > 30:
+            title = title[:30] + "..."
+        response_obj["title"] = title
+
+    return response_obj
+
+
 # API routes for chat
 @api_bp.route("/chat", methods=["POST"])
 def chat():
     """Process incoming chat message, route to appropriate AI provider, and return response."""
     try:
-        data = request.json
-        message = data.get("message")
-        data.get("model", "Auto")  #  Default to automatic model selection
-        chat_id = data.get("chat_id")
-
-        if not message:
-            return jsonify({"error": "No message provided"}), 400
+        data = request.get_json(silent=True)
 
         # Initialize services
         router = ContentRouter()
-        chat_manager = get_chat_manager()
-
-        # Initialize chat if needed
-        if not chat_id or not chat_manager.get_chat(chat_id):
-            chat_id = chat_manager.create_new_chat(save=True)
+        error = _chat_request_error(router, data)
+        if error:
+            return jsonify({"error": error}), 400
 
-        # Save original user message to chat history
-        user_message = {"role": "user", "content": message}
-        chat_manager.add_message(chat_id, user_message)
+        message = data["message"]
+        pinned_provider, pinned_model = _pinned_model(data.get("model", "Auto"))
+        chat_manager = get_chat_manager()
+        chat_id, context, dropped_before = _start_chat_turn(
+            chat_manager, data.get("chat_id"), message
+        )
+
+        # Determine mode and clean content (unless pinned), then process the message
+        routed = router.route(
+            message,
+            mode=data.get("mode"),
+            provider=pinned_provider,
+            model=pinned_model,
+            context=context,
+        )
+
+        summarize = bool(dropped_before) and current_app.config["CONTEXT_SUMMARIES"]
+        response_obj = _finish_chat_turn(router, chat_manager, chat_id, message, routed, summarize)
 
-        # Determine mode and clean content in one step
-        mode, cleaned_content = router.select_mode_and_clean_content(message)
+        # Return appropriate response format
+        return jsonify(response_obj)
 
-        # For debugging
-        logger.info(f"Original input: '{message}'")
-        logger.info(f"Detected mode: {mode}")
-        logger.info(f"Cleaned content: '{cleaned_content}'")
-
-        # Process the message based on detected mode and cleaned content
-        response_data = router.process_content(mode, cleaned_content)
-
-        # Extract response, provider and model information
-        provider = None
-        model = None
-
-        if isinstance(response_data, dict):
-            # New format with provider and model included
-            provider = response_data.get("provider")
-            model = response_data.get("model")
-
-            # Extract the actual response content
-            if "content" in response_data:
-                response = response_data["content"]
-            else:
-                # If for some reason there's no content key, use the whole response
-                response = response_data
-        else:
-            # Legacy format, response is directly returned
-            response = response_data
+    except Exception as e:
+        import traceback
 
-        # Handle media if needed
-        media_path = None
-        response_obj = {
-            "response": response if isinstance(response, str) else "Generated content",
-            "selected_mode": mode,
-            "chat_id": chat_id,
-            "original_input": message,
-            "cleaned_content": cleaned_content,
-            "provider": provider,
-            "model": model,
-        }
+        logger.error(f"Error in chat endpoint: {str(e)}")
+        logger.error(traceback.format_exc())
+        return jsonify({"error": str(e)}), 500
 
-        if mode in ["image", "audio"]:
-            # Get chat-specific media directory
-            chat_media_dir = chat_manager.base_dir / chat_id / "media"
-            chat_media_dir.mkdir(parents=True, exist_ok=True)
-
-            # Save media directly to chat-specific directory only
-            # Extract the actual response content for media
-            media_content = (
-                response
-                if not isinstance(response_data, dict) or "content" not in response_data
-                else response_data["content"]
-            )
-            media_path = chat_manager.save_media(media_content, mode, chat_media_dir)
-
-            if media_path:
-                # Get filename for the URL
-                filename = os.path.basename(media_path)
-
-                # Create a proper URL path that will work with our routes
-                url_path = f"/chat_history/{chat_id}/media/{filename}"
-
-                # Create response object with media info
-                response_obj = {
-                    "type": mode,
-                    "url": url_path,
-                    "filename": filename,
-                    "selected_mode": mode,
-                    "chat_id": chat_id,
-                    "response": "Generated content",  # Just a placeholder for text display
-                    "original_input": message,
-                    "cleaned_content": cleaned_content,
-                    "provider": provider,
-                    "model": model,
-                }
-
-        # Save assistant response to chat history
-        assistant_message = {
-            "role": "assistant",
-            "mode": mode,
-            "original_input": message,
-            "cleaned_content": cleaned_content,
-            "provider": provider,
-            "model": model,
-        }
 
-        # Handle content based on type
-        if isinstance(response, bytes):
-            # Don't try to JSON serialize bytes
-            assistant_message["content"] = "Generated content"
-        elif isinstance(response, str):
-            assistant_message["content"] = response
-        else:
-            # Try to serialize any other type
-            try:
-                assistant_message["content"] = json.dumps(response)
-            except Exception:
-                assistant_message["content"] = str(response)
-
-        # Pass media path for saving in chat history
-        # This will save the media filename in the message object
-        chat_manager.add_message(chat_id, assistant_message, media_path)
-
-        # Get the chat metadata to extract the title
-        chat_data = chat_manager.get_chat(chat_id)
-        if chat_data and "title" in chat_data:
-            response_obj["title"] = chat_data["title"]
-
-        # Update the title in the response
-        if "title" not in response_obj or not response_obj["title"]:
-            # Use the first few words of the user message as the title
-            title = message.strip()
-            if len(title) > 30:
-                title = title[:30] + "..."
-            response_obj["title"] = title
+async def chat_async(data: Any, config: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """Handle an /api/chat body on an event loop, returning (response, status code).
 
-        # Return appropriate response format
-        return jsonify(response_obj)
+    Served by the ASGI app under uvicorn (see pseudo.core.server) instead of the chat
+    view. Waiting on providers holds no thread: route_async awaits them, and chat
+    history reads and writes run in worker threads.
+    """
+    try:
+        router = await asyncio.to_thread(ContentRouter)
+        error = _chat_request_error(router, data)
+        if error:
+            return {"error": error}, 400
+
+        message = data["message"]
+        pinned_provider, pinned_model = _pinned_model(data.get("model", "Auto"))
+        chat_manager = await asyncio.to_thread(ChatManager, config["CHAT_HISTORY_DIR"])
+        chat_id, context, dropped_before = await asyncio.to_thread(
+            _start_chat_turn, chat_manager, data.get("chat_id"), message
+        )
+
+        routed = await router.route_async(
+            message,
+            mode=data.get("mode"),
+            provider=pinned_provider,
+            model=pinned_model,
+            context=context,
+        )
+
+        summarize = bool(dropped_before) and config["CONTEXT_SUMMARIES"]
+        response_obj = await asyncio.to_thread(
+            _finish_chat_turn, router, chat_manager, chat_id, message, routed, summarize
+        )
+        return response_obj, 200
 
     except Exception as e:
         import traceback
 
         logger.error(f"Error in chat endpoint: {str(e)}")
         logger.error(traceback.format_exc())
+        return {"error": str(e)}, 500
+
+
+@api_bp.route("/chat/batch", methods=["POST"])
+def chat_batch():
+    """Process many chat messages in one request and stream results as NDJSON.
+
+    Body: {"chat_id": optional default, "model": optional "provider/model", "mode": optional,
+    "messages": [{"message": str, "chat_id": optional, "model": optional, "mode": optional,
+    "id": optional client reference}, ...]}. Items are routed like /api/chat, except that
+    identical messages are classified once (no single-pass or speculative calls) and every
+    item of a chat gets the context from before the batch, not the answers of the other
+    items. Each item's metrics include the time of the classification it shares.
+    Generation fans out with bounded concurrency, and each chat's history is written once
+    all of its items are done, also when the client disconnects before reading every result.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Request body must be a JSON object"}), 400
+        items = data.get("messages")
+
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "No messages provided"}), 400
+
+        max_messages = current_app.config["BATCH_MAX_MESSAGES"]
+        if len(items) > max_messages:
+            return jsonify({"error": f"Too many messages, the limit is {max_messages}"}), 400
+
+        router = ContentRouter()
+        for item in items:
+            if not isinstance(item, dict) or not item.get("message"):
+                return jsonify({"error": "Every batch item needs a message"}), 400
+            item.setdefault("mode", data.get("mode"))
+            item.setdefault("model", data.get("model", "Auto"))
+            if item["mode"] and item["mode"] not in MODES:
+                return jsonify({"error": f"Unsupported mode: {item['mode']}"}), 400
+            pin_error = _pin_error(router, item["mode"], *_pinned_model(item["model"]))
+            if pin_error:
+                return jsonify({"error": pin_error}), 400
+
+        chat_manager = get_chat_manager()
+        concurrency = current_app.config["BATCH_CONCURRENCY"]
+        summaries = current_app.config["CONTEXT_SUMMARIES"]
+
+        # Resolve chats up front; items without a known chat share one new chat
+        resolved = {}
+        default_chat_id = data.get("chat_id")
+        new_chat_id = None
+        for item in items:
+            chat_id = item.get("chat_id") or default_chat_id
+            if chat_id and chat_id not in resolved:
+                resolved[chat_id] = (
+                    chat_id if chat_manager.get_chat(chat_id, include_messages=False) else None
+                )
+            chat_id = resolved.get(chat_id) if chat_id else None
+            if not chat_id:
+                if not new_chat_id:
+                    new_chat_id = chat_manager.create_new_chat(save=True)
+                chat_id = new_chat_id
+            item["chat_id"] = chat_id
+
+        # Earlier turns of each chat, read before any message of the batch is saved
+        contexts = {
+            chat_id: assemble_context(chat_manager, chat_id)
+            for chat_id in dict.fromkeys(item["chat_id"] for item in items)
+        }
+    except Exception as e:
+        logger.error(f"Error in batch chat endpoint: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+    # Messages per chat in input order, written once every item of the chat is done
+    pending = {}
+    for index, item in enumerate(items):
+        pending.setdefault(item["chat_id"], []).append(index)
+    finished = {}
+    finished_lock = threading.Lock()
+
+    def classify(message):
+        start = time.perf_counter()
+        mode, cleaned_content = router.select_mode_and_clean_content(message)
+        return mode, cleaned_content, time.perf_counter() - start
+
+    def process_item(index, item, classification):
+        message = item["message"]
+        route, mode, cleaned_content, classify_seconds = classification
+        pinned_provider, pinned_model = _pinned_model(item["model"])
+        context, _ = contexts[item["chat_id"]]
+        prompt = cleaned_content
+        if mode == "text" and context:
+            prompt = context + [{"role": "user", "content": cleaned_content}]
+
+        start = time.perf_counter()
+        response_data = router.process_content(mode, prompt, pinned_provider, pinned_model)
+        # Every item sharing a classification waited for it, so its time counts for each
+        total_seconds = classify_seconds + time.perf_counter() - start
+        attach_turn_metrics(response_data, route, prompt, classify_seconds, total_seconds)
+        response_obj, assistant_message, media_path = build_chat_result(
+            chat_manager, item["chat_id"], message, mode, cleaned_content, response_data
+        )
+        return index, response_obj, assistant_message, media_path
+
+    def persist(index, result):
+        # Runs as each item finishes, so the history does not depend on the stream being read
+        chat_id = items[index]["chat_id"]
+        with finished_lock:
+            finished[index] = result
+            if not all(i in finished for i in pending[chat_id]):
+                return
+
+        try:
+            chat_messages = []
+            for i in pending[chat_id]:
+                chat_messages.append(({"role": "user", "content": items[i]["message"]}, None))
+                if finished[i]:
+                    chat_messages.append(finished[i])
+            chat_manager.add_messages(chat_id, chat_messages)
+
+            # Fold turns that fell out of the context window into the chat's summary
+            if contexts[chat_id][1] and summaries:
+                summarize_in_background(router, chat_manager, chat_id)
+        except Exception as e:
+            logger.error(f"Error saving batch messages of chat {chat_id}: {str(e)}")
+
+    def on_done(index, future):
+        try:
+            _, _, assistant_message, media_path = future.result()
+            persist(index, (assistant_message, media_path))
+        except Exception:
+            persist(index, None)
+
+    def generate():
+        # The mode each item pins, directly or through its pinned model
+        pinned_modes = []
+        for item in items:
+            pinned_provider, pinned_model = _pinned_model(item["model"])
+            pinned_modes.append(
+                item["mode"]
+                or (pinned_provider and router.find_mode_for_model(pinned_provider, pinned_model))
+            )
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            # Classify every distinct message once, pinned text items keep their input as-is
+            unique_messages = list(
+                dict.fromkeys(
+                    item["message"] for item, mode in zip(items, pinned_modes) if mode != "text"
+                )
+            )
+            classifications = dict(zip(unique_messages, executor.map(classify, unique_messages)))
+
+            futures = {}
+            for index, (item, mode) in enumerate(zip(items, pinned_modes)):
+                if mode == "text":
+                    classification = ("pinned", mode, item["message"], 0.0)
+                elif mode:
+                    _, cleaned_content, seconds = classifications[item["message"]]
+                    classification = ("pinned", mode, cleaned_content, seconds)
+                else:
+                    classification = ("batch", *classifications[item["message"]])
+                future = executor.submit(process_item, index, item, classification)
+                future.add_done_callback(lambda future, index=index: on_done(index, future))
+                futures[future] = index
+
+            # Closing the stream early leaves this block, which waits for the remaining items
+            for future in as_completed(futures):
+                index = futures[future]
+                item = items[index]
+                try:
+                    _, response_obj, _, _ = future.result()
+                except Exception as e:
+                    logger.error(f"Error processing batch item {index}: {str(e)}")
+                    response_obj = {"error": str(e), "chat_id": item["chat_id"]}
+
+                response_obj["index"] = index
+                if "id" in item:
+                    response_obj["id"] = item["id"]
+                yield json.dumps(response_obj) + "\n"
+
+        yield json.dumps({"done": True, "count": len(items)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
 
 # API route to get configuration
 @api_bp.route("/configs", methods=["GET"])
@@ -253,24 +601,144 @@ def get_models():
         return jsonify({"error": str(e)}), 500
 
 
+# API route to report background chat history migration progress
+@api_bp.route("/status/maintenance", methods=["GET"])
+def maintenance_status():
+    from pseudo import get_maintenance_status
+
+    return jsonify(get_maintenance_status())
+
+
+# API route to report speculative generation hit rate and wasted spend
+@api_bp.route("/stats/speculation", methods=["GET"])
+def speculation_statistics():
+    return jsonify(speculation_stats.snapshot())
+
+
+# API route to report this worker's shared cache hit rates and the shared entry counts
+@api_bp.route("/stats/cache", methods=["GET"])
+def cache_statistics():
+    return jsonify(shared_cache.snapshot())
+
+
+# API route to report turn latency percentiles and failure rates by mode/provider/model
+@api_bp.route("/stats/providers", methods=["GET"])
+def provider_statistics():
+    try:
+        since = since_days(request.args.get("days", type=float))
+        return jsonify(aggregate(get_chat_manager().base_dir, since))
+    except Exception as e:
+        logger.error(f"Error aggregating provider statistics: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+# API route to report the adaptive scheduler's rolling statistics and learned order
+@api_bp.route("/stats/scheduler", methods=["GET"])
+def scheduler_statistics():
+    return jsonify(provider_scheduler.snapshot())
+
+
+# API route to report whether the local selector model is loaded
+@api_bp.route("/health/selector", methods=["GET"])
+def selector_health():
+    status = selector_manager.status()
+    # Not ready means classification is served by the fallback selector
+    code = 200 if status["state"] in ("ready", "disabled") else 503
+    return jsonify(status), code
+
+
 # API routes for chat history
 @api_bp.route("/chats", methods=["GET"])
 def get_chats():
     try:
         chat_manager = get_chat_manager()
         chats = chat_manager.get_all_chats()
-        return jsonify({"chats": chats})
+        return jsonify({"chats": chats, "version": chat_manager.history.get("version", 0)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# Change feed for the sidebar: chats created, updated or deleted after a version
+@api_bp.route("/chats/changes", methods=["GET"])
+def get_chat_changes():
+    try:
+        since = request.args.get("since", 0, type=int)
+        return jsonify(get_chat_manager().get_changes(since))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+# Server-sent events variant of the change feed, pushes changes to every open tab
+@api_bp.route("/chats/changes/stream", methods=["GET"])
+def stream_chat_changes():
+    global _open_streams
+    if not current_app.config["CHANGE_FEED_STREAM"]:
+        return jsonify({"error": "Change stream is disabled"}), 404
+
+    # A reconnecting EventSource resumes from the last event id it received
+    since = request.headers.get("Last-Event-ID", type=int)
+    if since is None:
+        since = request.args.get("since", 0, type=int)
+    chat_manager = ChatManager(base_dir=current_app.config.get("CHAT_HISTORY_DIR"))
+    stream_seconds = current_app.config["CHANGE_FEED_STREAM_SECONDS"]
+    poll_interval = current_app.config["CHANGE_FEED_POLL_INTERVAL"]
+
+    # Past the cap the browser falls back to polling, so streams cannot take every thread
+    with _open_streams_lock:
+        if _open_streams >= current_app.config["CHANGE_FEED_MAX_STREAMS"]:
+            return jsonify({"error": "Too many open change streams"}), 503
+        _open_streams += 1
+
+    def generate():
+        nonlocal since
+        deadline = time.monotonic() + stream_seconds
+        last_sent = time.monotonic()
+        refreshed = True  #  The first check compares against the history just loaded
+
+        while time.monotonic() < deadline:
+            # Only re-read history.json when another request has written it
+            if refreshed:
+                changes = chat_manager.get_changes(since)
+                if changes["reset"] or changes["chats"] or changes["deleted"]:
+                    since = changes["version"]
+                    last_sent = time.monotonic()
+                    yield f"id: {since}\nevent: changes\ndata: {json.dumps(changes)}\n\n"
+
+            # Comment lines keep proxies from closing an idle stream
+            if time.monotonic() - last_sent > 15:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            time.sleep(poll_interval)
+            refreshed = chat_manager.refresh_history()
+
+    def close_stream():
+        global _open_streams
+        with _open_streams_lock:
+            _open_streams -= 1
+
+    response = Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Runs when the server closes the response, also if the client left before the first event
+    response.call_on_close(close_stream)
+    return response
+
+
 @api_bp.route("/chats/<chat_id>", methods=["GET"])
 def get_chat(chat_id):
     try:
         chat_manager = get_chat_manager()
-        chat = chat_manager.get_chat(chat_id)
+        # ?tail=N returns only the last N messages, read from the end of the log
+        tail = request.args.get("tail", type=int)
+        chat = chat_manager.get_chat(chat_id, include_messages=tail is None)
         if not chat:
             return jsonify({"error": "Chat not found"}), 404
+        if tail is not None:
+            chat["messages"] = chat_manager.tail_messages(chat_id, tail)
+        if request.args.get("view") == "compact":
+            chat = compact_chat_view(chat)
         return jsonify(chat)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -297,6 +765,23 @@ def delete_chat(chat_id):
         return jsonify({"error": str(e)}), 500
 
 
+# API route to delete many chats at once
+@api_bp.route("/chats/delete", methods=["POST"])
+def delete_chats():
+    try:
+        data = request.get_json(silent=True) or {}
+        chat_ids = data.get("chat_ids")
+        if not isinstance(chat_ids, list) or not all(isinstance(i, str) for i in chat_ids):
+            return jsonify({"error": "chat_ids must be a list of chat IDs"}), 400
+
+        chat_manager = get_chat_manager()
+        deleted = chat_manager.delete_chats(chat_ids)
+        not_found = [chat_id for chat_id in dict.fromkeys(chat_ids) if chat_id not in deleted]
+        return jsonify({"deleted": deleted, "not_found": not_found})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 def register_routes(app):
     """Register all application routes."""
     app.register_blueprint(main_bp)
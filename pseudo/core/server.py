@@ -0,0 +1,216 @@
+"""Production server entry point for running Pseudo under gunicorn or uvicorn."""
+
+import json
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from pseudo.core.config import Config
+
+if TYPE_CHECKING:
+    from flask import Flask
+
+logger = logging.getLogger(__name__)
+
+# Servers supported by `pseudo serve`
+SERVERS = ("gunicorn", "uvicorn")
+
+
+def preload_app() -> "Flask":
+    """Create the Flask application and warm shared state before workers are forked.
+
+    Loading credentials here also imports apicenter and the provider SDKs, so forked
+    workers inherit them instead of paying the import on their first chat request.
+    """
+    from pseudo.core.app import create_app
+    from pseudo.core.services.chat_history import ChatManager
+    from pseudo.core.services.content_router import ContentRouter
+
+    app = create_app()
+    with app.app_context():
+        ChatManager(base_dir=app.config["CHAT_HISTORY_DIR"])
+        ContentRouter().api_center  #  apicenter is lazily imported, load it before fork
+
+    logger.info("Application preloaded for production serving")
+    return app
+
+
+def create_asgi_app() -> Any:
+    """Create the Flask application in a uvicorn worker and wrap it in an ASGI app.
+
+    POST /api/chat is served natively: the handler awaits ContentRouter.route_async on the
+    event loop, so a chat waiting on its providers holds no thread. Every other request
+    goes through the WSGI adapter to Flask, one thread per request.
+    """
+    try:
+        from asgiref.wsgi import WsgiToAsgi
+    except ImportError as e:
+        raise ImportError(
+            f"Error importing asgiref: {e}\n\n"
+            "Serving with uvicorn needs the server extras:\n"
+            "   poetry install --extras server"
+        )
+
+    # uvicorn calls this factory in each worker process, after it has started
+    app = preload_app()
+    from pseudo.core.app import start_worker_threads
+    from pseudo.core.routes import chat_async
+
+    start_worker_threads(app)
+    flask_app = WsgiToAsgi(app)
+
+    async def asgi_app(scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope["path"] != "/api/chat" or scope["method"] != "POST":
+            await flask_app(scope, receive, send)
+            return
+
+        body = b""
+        while True:
+            event = await receive()
+            body += event.get("body", b"")
+            if not event.get("more_body"):
+                break
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+
+        response, status = await chat_async(data, app.config)
+        content = json.dumps(response).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(content)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": content})
+
+    return asgi_app
+
+
+def _gunicorn_options(
+    host: str, port: int, workers: int, threads: int, timeout: int, graceful_timeout: int
+) -> Dict[str, Any]:
+    """Build gunicorn settings tuned for long-running provider calls."""
+
+    def when_ready(server: Any) -> None:
+        # Migration runs once in the master, after the socket accepts connections
+        from pseudo import start_background_maintenance
+
+        start_background_maintenance()
+
+    def post_fork(server: Any, worker: Any) -> None:
+        # The app is preloaded in the master, which never serves, so threads start per worker
+        from pseudo.core.app import start_worker_threads
+
+        start_worker_threads(server.app.wsgi())
+
+    def worker_int(worker: Any) -> None:
+        worker.log.info(f"Worker {worker.pid} interrupted, dropping in-flight requests")
+
+    def worker_exit(server: Any, worker: Any) -> None:
+        server.log.info(f"Worker {worker.pid} drained and exited")
+
+    return {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "threads": threads,
+        "worker_class": "gthread",  #  Threads block on provider I/O, not CPU
+        "timeout": timeout,
+        "graceful_timeout": graceful_timeout,  #  In-flight chats finish before a worker exits
+        "keepalive": Config.SERVER_KEEPALIVE,
+        "preload_app": True,  #  Load app, credentials and SDKs once in the master
+        "when_ready": when_ready,
+        "post_fork": post_fork,
+        "worker_int": worker_int,
+        "worker_exit": worker_exit,
+    }
+
+
+def _run_gunicorn(app: "Flask", options: Dict[str, Any]) -> None:
+    """Run the application under gunicorn with the given settings."""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError as e:
+        raise ImportError(
+            f"Error importing gunicorn: {e}\n\n"
+            "Serving with gunicorn needs the server extras:\n"
+            "   poetry install --extras server"
+        )
+
+    class PseudoApplication(BaseApplication):
+        """Gunicorn application that serves an already created Flask app."""
+
+        def __init__(self, application: "Flask", settings: Dict[str, Any]) -> None:
+            self.application = application
+            self.settings = settings
+            super().__init__()
+
+        def load_config(self) -> None:
+            for key, value in self.settings.items():
+                if key in self.cfg.settings and value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self) -> "Flask":
+            return self.application
+
+    PseudoApplication(app, options).run()
+
+
+def _run_uvicorn(host: str, port: int, workers: int, graceful_timeout: int) -> None:
+    """Run the ASGI-wrapped application under uvicorn."""
+    try:
+        import uvicorn
+    except ImportError as e:
+        raise ImportError(
+            f"Error importing uvicorn: {e}\n\n"
+            "Serving with uvicorn needs the server extras:\n"
+            "   poetry install --extras server"
+        )
+
+    uvicorn.run(
+        "pseudo.core.server:create_asgi_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        timeout_keep_alive=Config.SERVER_KEEPALIVE,
+        timeout_graceful_shutdown=graceful_timeout,  #  Let in-flight chats drain
+    )
+
+
+def serve(
+    server: str = "gunicorn",
+    host: str = "0.0.0.0",
+    port: int = 5000,
+    workers: Optional[int] = None,
+    threads: Optional[int] = None,
+    timeout: Optional[int] = None,
+    graceful_timeout: Optional[int] = None,
+) -> None:
+    """Serve the application with a production server.
+
+    Unset values fall back to the SERVER_* settings in Config.
+    """
+    if server not in SERVERS:
+        raise ValueError(f"Unsupported server: {server}")
+
+    workers = workers or Config.SERVER_WORKERS
+    threads = threads or Config.SERVER_THREADS
+    timeout = timeout or Config.SERVER_TIMEOUT
+    graceful_timeout = graceful_timeout or Config.SERVER_GRACEFUL_TIMEOUT
+
+    print(f"Serving Pseudo with {server} on http://{host}:{port} ({workers} workers)")
+
+    if server == "uvicorn":
+        # Migration touches every chat, so it runs once in this process and not per worker
+        from pseudo import start_background_maintenance
+
+        start_background_maintenance()
+        _run_uvicorn(host, port, workers, graceful_timeout)
+    else:
+        options = _gunicorn_options(host, port, workers, threads, timeout, graceful_timeout)
+        _run_gunicorn(preload_app(), options)
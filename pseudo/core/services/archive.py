@@ -0,0 +1,154 @@
+"""Packing of cold chat directories into one compressed archive per chat."""
+
+import logging
+import os
+import shutil
+import tarfile
+from pathlib import Path
+from typing import Optional, Set
+
+from pseudo.core.config import Config
+from pseudo.core.services import locks
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Directory under CHAT_HISTORY_DIR holding the archives, hidden from directory scans
+ARCHIVE_DIR = ".archive"
+
+# Archive suffixes, zstd is used when zstandard is installed
+ZSTD_SUFFIX = ".tar.zst"
+GZIP_SUFFIX = ".tar.gz"
+
+
+def find_archive(base_dir: Path, chat_id: str) -> Optional[Path]:
+    """Return the archive holding a chat, or None if the chat is not archived."""
+    for suffix in (ZSTD_SUFFIX, GZIP_SUFFIX):
+        path = base_dir / ARCHIVE_DIR / f"{chat_id}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def archived_chat_ids(base_dir: Path) -> Set[str]:
+    """Return the IDs of all archived chats from the archive file names."""
+    archive_dir = base_dir / ARCHIVE_DIR
+    if not archive_dir.is_dir():
+        return set()
+
+    return {
+        name[: -len(suffix)]
+        for name in os.listdir(archive_dir)
+        for suffix in (ZSTD_SUFFIX, GZIP_SUFFIX)
+        if name.endswith(suffix) and not name.startswith(".")
+    }
+
+
+def _write_archive(chat_dir: Path, path: Path, suffix: str) -> None:
+    """Write chat_dir, named by its chat ID, into a tar file compressed as suffix says."""
+    if suffix == ZSTD_SUFFIX:
+        import zstandard
+
+        compressor = zstandard.ZstdCompressor(level=Config.ZSTD_LEVEL)
+        with open(path, "wb") as f, compressor.stream_writer(f) as compressed:
+            with tarfile.open(fileobj=compressed, mode="w|") as tar:
+                tar.add(chat_dir, arcname=chat_dir.name)
+    else:
+        with tarfile.open(path, "w:gz") as tar:
+            tar.add(chat_dir, arcname=chat_dir.name)
+
+
+def _extract_archive(path: Path, target_dir: Path) -> None:
+    """Unpack an archive written by _write_archive into target_dir."""
+    if path.name.endswith(ZSTD_SUFFIX):
+        import zstandard
+
+        with open(path, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as reader:
+            with tarfile.open(fileobj=reader, mode="r|") as tar:
+                tar.extractall(target_dir, filter="data")
+    else:
+        with tarfile.open(path, "r:gz") as tar:
+            tar.extractall(target_dir, filter="data")
+
+
+def archive_chat(base_dir: Path, chat_id: str) -> bool:
+    """Pack a chat directory into its archive and remove the directory.
+
+    The chat's lock is held while packing, and the directory is kept if its metadata
+    changed anyway (e.g. by a server not taking locks).
+    """
+    with locks.chat_lock(base_dir, chat_id):
+        return _archive_chat(base_dir, chat_id)
+
+
+def _archive_chat(base_dir: Path, chat_id: str) -> bool:
+    """Pack a chat with its lock held, see archive_chat."""
+    chat_dir = base_dir / chat_id
+    metadata_file = chat_dir / "metadata.json"
+    if not metadata_file.exists():
+        return False
+
+    try:
+        import zstandard  # noqa: F401
+
+        suffix = ZSTD_SUFFIX
+    except ImportError:
+        suffix = GZIP_SUFFIX
+
+    archive_dir = base_dir / ARCHIVE_DIR
+    archive_dir.mkdir(exist_ok=True)
+    path = archive_dir / f"{chat_id}{suffix}"
+    tmp_path = archive_dir / f".{chat_id}.{locks.node_id()}.{os.getpid()}.tmp"
+
+    try:
+        mtime = metadata_file.stat().st_mtime_ns
+        _write_archive(chat_dir, tmp_path, suffix)
+        if metadata_file.stat().st_mtime_ns != mtime:
+            logger.info(f"Chat {chat_id} changed while being archived, keeping it")
+            tmp_path.unlink()
+            return False
+
+        os.replace(tmp_path, path)
+        shutil.rmtree(chat_dir)
+        return True
+    except Exception as e:
+        logger.error(f"Error archiving chat {chat_id}: {e}")
+        tmp_path.unlink(missing_ok=True)
+        return False
+
+
+def _copy_missing(src: str, dst: str) -> None:
+    """Copy a file unless the destination already exists."""
+    if not os.path.exists(dst):
+        shutil.copy2(src, dst)
+
+
+def restore_chat(base_dir: Path, chat_id: str) -> bool:
+    """Unpack an archived chat back into its directory, returning whether it was archived.
+
+    Files already in the chat directory (e.g. media saved before the restore) are kept.
+    """
+    # The chat's lock keeps two threads or nodes from unpacking it over each other
+    with locks.chat_lock(base_dir, chat_id):
+        path = find_archive(base_dir, chat_id)
+        if path is None:
+            return False
+
+        chat_dir = base_dir / chat_id
+        tmp_dir = base_dir / ARCHIVE_DIR / f".restore-{chat_id}-{locks.node_id()}-{os.getpid()}"
+        try:
+            _extract_archive(path, tmp_dir)
+            if chat_dir.exists():
+                shutil.copytree(
+                    tmp_dir / chat_id, chat_dir, copy_function=_copy_missing, dirs_exist_ok=True
+                )
+            else:
+                os.replace(tmp_dir / chat_id, chat_dir)
+            path.unlink()
+            logger.info(f"Restored archived chat {chat_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Error restoring chat {chat_id}: {e}")
+            return False
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -1,18 +1,57 @@
 """Chat history management system for Pseudo."""
 
-import json
 import logging
 import os
 import uuid
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from flask import current_app
 
+from pseudo.core.config import Config
+from pseudo.core.services import archive, locks, storage, trash
+from pseudo.core.services.shared_cache import shared_cache
+
 logger = logging.getLogger(__name__)
 
 
+# A chat's messages, one JSON record per line, so appends and tails never load them all
+MESSAGES_FILE = "messages.jsonl"
+
+# Bytes read per step when reading a message log backwards
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# Metadata fields the global index holds for each chat
+SUMMARY_FIELDS = ("title", "created_at", "updated_at")
+
+# Message fields the chat UI does not need, repeated or operational data
+COMPACT_DROPPED_FIELDS = ("original_input", "metrics")
+
+
+def compact_chat_view(chat: Dict) -> Dict:
+    """Return a copy of chat metadata without fields that repeat other data.
+
+    Assistant messages drop original_input (the preceding user message already holds it),
+    turn metrics, cleaned_content when it equals the user input, and empty provider/model
+    values.
+    """
+    messages = []
+    for message in chat.get("messages", []):
+        compact = {
+            key: value
+            for key, value in message.items()
+            if key not in COMPACT_DROPPED_FIELDS
+            and not (key in ("provider", "model") and value is None)
+        }
+        if compact.get("cleaned_content") == message.get("original_input"):
+            compact.pop("cleaned_content", None)
+        messages.append(compact)
+
+    return {**chat, "messages": messages}
+
+
 class ChatManager:
     """Manages chat history storage, retrieval, and media organization.
 
@@ -48,6 +87,7 @@ class ChatManager:
 
         # Initialize or load the global history tracker
         self.history_file = self.base_dir / "history.json"
+        self._history_identity: Optional[Tuple[int, int, int]] = None
         self.history = self._load_history()
 
     def _load_history(self) -> Dict:
@@ -62,19 +102,21 @@ class ChatManager:
         """
         if self.history_file.exists():
             try:
-                with open(self.history_file, "r") as f:
-                    history = json.load(f)
+                with open(self.history_file, "rb") as f:
+                    # The identity of the file read, not of whatever replaced it since
+                    self._history_identity = self._file_identity(os.fstat(f.fileno()))
+                    history = storage.loads(f.read())
 
-                    # Remove global updated_at if it exists
-                    if "updated_at" in history:
-                        del history["updated_at"]
+                # Remove global updated_at if it exists
+                if "updated_at" in history:
+                    del history["updated_at"]
 
-                    # Remove message_count from each chat entry
-                    for chat in history.get("chats", []):
-                        if "message_count" in chat:
-                            del chat["message_count"]
+                # Remove message_count from each chat entry
+                for chat in history.get("chats", []):
+                    if "message_count" in chat:
+                        del chat["message_count"]
 
-                    return history
+                return history
             except Exception as e:
                 logger.error(f"Error loading history: {str(e)}")
 
@@ -82,8 +124,8 @@ class ChatManager:
         default_history = {"chats": []}
 
         # Save default history
-        with open(self.history_file, "w") as f:
-            json.dump(default_history, f, indent=2)
+        storage.write_file(self.history_file, default_history)
+        self._history_identity = self._file_identity(self.history_file.stat())
 
         return default_history
 
@@ -94,13 +136,99 @@ class ChatManager:
             if "updated_at" in self.history:
                 del self.history["updated_at"]
 
-            with open(self.history_file, "w") as f:
-                json.dump(self.history, f, indent=2)
+            storage.write_file(self.history_file, self.history)
+            self._history_identity = self._file_identity(self.history_file.stat())
             return True
         except Exception as e:
             logger.error(f"Error saving history: {str(e)}")
             return False
 
+    @staticmethod
+    def _file_identity(stat: os.stat_result) -> Tuple[int, int, int]:
+        """Return what changes whenever a file is replaced, as every history write does."""
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def refresh_history(self) -> bool:
+        """Reload the history if another manager or process has written it since it was read.
+
+        Returns:
+            bool: Whether the history was reloaded.
+        """
+        try:
+            identity = self._file_identity(self.history_file.stat())
+        except FileNotFoundError:
+            identity = None
+        if identity == self._history_identity:
+            return False
+        self.history = self._load_history()
+        return True
+
+    @contextmanager
+    def _updating_history(self) -> Iterator[bool]:
+        """Hold the history lock around a change to the history and save it afterwards.
+
+        The history is reloaded first if another process or node has written it since this
+        manager read it, so their changes are built on rather than overwritten. Yields
+        whether it was reloaded.
+        """
+        with locks.history_lock(self.base_dir):
+            reloaded = self.refresh_history()
+
+            yield reloaded
+            self._save_history()
+
+    def _next_version(self) -> int:
+        """Advance the history version counter and return the new version.
+
+        Every created, updated or deleted chat is stamped with a new version so clients
+        can ask for the changes since the version they last saw.
+        """
+        self.history["version"] = self.history.get("version", 0) + 1
+        return self.history["version"]
+
+    def _record_deletion(self, chat_id: str) -> None:
+        """Add a tombstone for a deleted chat, keeping the newest CHANGE_FEED_TOMBSTONES."""
+        tombstones = self.history.setdefault("deleted", [])
+        tombstones.append({"id": chat_id, "version": self._next_version()})
+
+        excess = len(tombstones) - Config.CHANGE_FEED_TOMBSTONES
+        if excess > 0:
+            # Clients older than the dropped tombstones have to reload the full list
+            self.history["tombstone_floor"] = tombstones[excess - 1]["version"]
+            del tombstones[:excess]
+
+    def get_changes(self, since: int) -> Dict:
+        """Get the chats created, updated or deleted after a history version.
+
+        Args:
+            since: The last version the client has seen, 0 for none.
+
+        Returns:
+            Dict: The current version, changed chat summaries and deleted chat IDs. When the
+            changes cannot be computed from the tombstones, "reset" is True and "chats"
+            holds the full list.
+        """
+        version = self.history.get("version", 0)
+        if since <= 0 or since > version or since < self.history.get("tombstone_floor", 0):
+            chats = self.get_all_chats()
+            return {
+                "version": self.history.get("version", 0),
+                "reset": True,
+                "chats": chats,
+                "deleted": [],
+            }
+
+        return {
+            "version": version,
+            "reset": False,
+            "chats": [chat for chat in self.history["chats"] if chat.get("version", 0) > since],
+            "deleted": [
+                tombstone["id"]
+                for tombstone in self.history.get("deleted", [])
+                if tombstone["version"] > since
+            ],
+        }
+
     def create_new_chat(self, save: bool = True) -> str:
         """Create a new chat with a unique ID.
 
@@ -136,42 +264,147 @@ class ChatManager:
                 "title": "New Chat",  # Default title
                 "created_at": timestamp,
                 "updated_at": timestamp,
-                "messages": [],
             }
 
             # Add to global history
-            chat_summary = {
-                "id": chat_id,
-                "title": "New Chat",
-                "created_at": timestamp,
-                "updated_at": timestamp,
-            }
-
-            # Add to the beginning (most recent first)
-            self.history["chats"].insert(0, chat_summary)
-            self._save_history()
+            with self._updating_history():
+                chat_summary = {
+                    "id": chat_id,
+                    "title": "New Chat",
+                    "created_at": timestamp,
+                    "updated_at": timestamp,
+                    "version": self._next_version(),
+                }
+
+                # Add to the beginning (most recent first)
+                self.history["chats"].insert(0, chat_summary)
 
             # Save metadata
-            with open(chat_dir / "metadata.json", "w") as f:
-                json.dump(metadata, f, indent=2)
+            storage.write_file(chat_dir / "metadata.json", metadata)
 
         return chat_id
 
-    def get_chat(self, chat_id: str) -> Optional[Dict]:
-        """Get chat data for a specific chat ID."""
+    def get_chat(self, chat_id: str, include_messages: bool = True) -> Optional[Dict]:
+        """Get chat data for a specific chat ID.
+
+        Args:
+            chat_id: The unique identifier of the chat
+            include_messages: Whether to load the messages, False returns only the metadata
+
+        Returns:
+            Optional[Dict]: The chat metadata, with a "messages" list if requested
+        """
         chat_dir = self.base_dir / chat_id
         metadata_file = chat_dir / "metadata.json"
 
-        if not metadata_file.exists():
+        if not metadata_file.exists() and not self.restore_archived_chat(chat_id):
             return None
 
         try:
-            with open(metadata_file, "r") as f:
-                return json.load(f)
+            metadata = storage.read_file(metadata_file)
         except Exception as e:
             logger.error(f"Error loading chat {chat_id}: {str(e)}")
             return None
 
+        # Chats written before the message log keep their messages in metadata.json
+        legacy_messages = metadata.pop("messages", [])
+        if include_messages:
+            messages_file = chat_dir / MESSAGES_FILE
+            if messages_file.exists():
+                metadata["messages"] = list(self._read_message_log(messages_file))
+            else:
+                metadata["messages"] = legacy_messages
+        return metadata
+
+    def iter_messages(self, chat_id: str) -> Iterator[Dict]:
+        """Yield the messages of a chat in order, reading them from disk one at a time.
+
+        Args:
+            chat_id: The unique identifier of the chat
+
+        Yields:
+            Dict: Each stored message, oldest first
+        """
+        messages_file = self.base_dir / chat_id / MESSAGES_FILE
+        if not messages_file.exists():
+            # An archived chat is restored, a legacy chat reads its metadata.json
+            chat = self.get_chat(chat_id)
+            yield from chat.get("messages", []) if chat else []
+            return
+
+        yield from self._read_message_log(messages_file)
+
+    def tail_messages(self, chat_id: str, count: int) -> List[Dict]:
+        """Get the last messages of a chat, reading only the end of its message log.
+
+        Args:
+            chat_id: The unique identifier of the chat
+            count: The number of messages to return
+
+        Returns:
+            List[Dict]: Up to count messages, oldest first
+        """
+        if count <= 0:
+            return []
+
+        messages_file = self.base_dir / chat_id / MESSAGES_FILE
+        if not messages_file.exists():
+            chat = self.get_chat(chat_id)
+            return chat.get("messages", [])[-count:] if chat else []
+
+        with open(messages_file, "rb") as f:
+            position = f.seek(0, os.SEEK_END)
+            data = b""
+            # One more line than needed, the first line read may be cut off
+            while position > 0 and data.count(b"\n") <= count:
+                step = min(TAIL_BLOCK_SIZE, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+
+        lines = data.split(b"\n")
+        if position > 0:
+            lines = lines[1:]
+
+        # Only the lines that are returned are decoded, newest first
+        messages: List[Dict] = []
+        for line in reversed(lines):
+            if len(messages) == count:
+                break
+            if line.strip():
+                message = self._parse_message_line(line)
+                if message is not None:
+                    messages.append(message)
+        return messages[::-1]
+
+    def _read_message_log(self, messages_file: Path) -> Iterator[Dict]:
+        """Yield the messages in a message log, skipping unreadable lines."""
+        with open(messages_file, "rb") as f:
+            for line in f:
+                if line.strip():
+                    message = self._parse_message_line(line)
+                    if message is not None:
+                        yield message
+
+    def _ends_mid_record(self, messages_file: Path) -> bool:
+        """Return whether a message log's last line is missing its newline."""
+        try:
+            with open(messages_file, "rb") as f:
+                if f.seek(0, os.SEEK_END) == 0:
+                    return False
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b"\n"
+        except FileNotFoundError:
+            return False
+
+    def _parse_message_line(self, line: bytes) -> Optional[Dict]:
+        """Decode one message log line, None if it is incomplete or corrupt."""
+        try:
+            return storage.loads(line)
+        except ValueError as e:
+            logger.warning(f"Skipping unreadable message record: {e}")
+            return None
+
     def get_all_chats(self) -> List[Dict]:
         """Get metadata for all available chats in order of most recently updated."""
         # First, check if our history file is synced with actual directories
@@ -182,8 +415,21 @@ class ChatManager:
 
     def _sync_history_with_filesystem(self):
         """Synchronize history with actual filesystem to ensure consistency."""
-        existing_chat_ids = set()
+        # Scan without the lock first, as most scans find nothing to change
+        if not self._reconcile_with_filesystem():
+            return
+
+        with self._updating_history() as reloaded:
+            # Another node wrote the history since the scan, so scan again on its version
+            if reloaded:
+                self._reconcile_with_filesystem()
+
+    def _reconcile_with_filesystem(self) -> bool:
+        """Update the in-memory history from the chat directories, returning if it changed."""
+        # Archived chats have no directory but stay in the index
+        existing_chat_ids = archive.archived_chat_ids(self.base_dir)
         updated = False
+        chats_by_id = {chat["id"]: chat for chat in self.history["chats"]}
 
         # Scan actual directory structure
         for chat_dir in self.base_dir.iterdir():
@@ -198,14 +444,11 @@ class ChatManager:
                 metadata_file = chat_dir / "metadata.json"
 
                 # Check if this chat exists in history
-                chat_in_history = next(
-                    (chat for chat in self.history["chats"] if chat["id"] == chat_id), None
-                )
+                chat_in_history = chats_by_id.get(chat_id)
 
                 if metadata_file.exists():
                     try:
-                        with open(metadata_file, "r") as f:
-                            metadata = json.load(f)
+                        metadata = self._metadata_summary(metadata_file)
 
                         # If chat doesn't exist in history, add it
                         if not chat_in_history:
@@ -218,6 +461,7 @@ class ChatManager:
                                 "updated_at": metadata.get(
                                     "updated_at", datetime.now().isoformat()
                                 ),
+                                "version": self._next_version(),
                             }
                             self.history["chats"].append(chat_summary)
                             updated = True
@@ -227,25 +471,35 @@ class ChatManager:
                         ) > chat_in_history.get("updated_at", ""):
                             chat_in_history["title"] = metadata.get("title", "Untitled Chat")
                             chat_in_history["updated_at"] = metadata.get("updated_at")
+                            chat_in_history["version"] = self._next_version()
                             updated = True
                     except Exception as e:
                         logger.error(f"Error syncing chat {chat_id}: {str(e)}")
 
         # Remove chats from history that no longer exist on disk
-        original_length = len(self.history["chats"])
+        for chat in self.history["chats"]:
+            if chat["id"] not in existing_chat_ids:
+                self._record_deletion(chat["id"])
+                updated = True
         self.history["chats"] = [
             chat for chat in self.history["chats"] if chat["id"] in existing_chat_ids
         ]
 
-        if len(self.history["chats"]) != original_length:
-            updated = True
-
         # Sort by updated_at, most recent first
         self.history["chats"].sort(key=lambda x: x.get("updated_at", ""), reverse=True)
 
-        # Save changes if needed
-        if updated:
-            self._save_history()
+        return updated
+
+    def _metadata_summary(self, metadata_file: Path) -> Dict:
+        """Return a chat's title and timestamps, shared between workers until the file changes."""
+        stat = metadata_file.stat()
+        validator = f"{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+        summary = shared_cache.get("chat_summary", str(metadata_file), validator)
+        if summary is None:
+            metadata = storage.read_file(metadata_file)
+            summary = {field: metadata[field] for field in SUMMARY_FIELDS if field in metadata}
+            shared_cache.set("chat_summary", str(metadata_file), summary, validator)
+        return summary
 
     def add_message(self, chat_id: str, message: Dict, media_path: Optional[str] = None) -> bool:
         """Add a message to the chat history.
@@ -266,8 +520,39 @@ class ChatManager:
         5. Saves the updated metadata
         6. Updates the global chat index
         """
+        return self.add_messages(chat_id, [(message, media_path)])
+
+    def add_messages(self, chat_id: str, messages: List[Tuple[Dict, Optional[str]]]) -> bool:
+        """Add several messages to a chat with a single metadata and index write.
+
+        Args:
+            chat_id: The unique identifier of the chat
+            messages: (message, media_path) pairs in the order they should be stored
+
+        Returns:
+            bool: True if successful, False otherwise
+
+        Messages are appended to the chat's message log, so the existing messages are
+        never loaded. Only the small metadata file is rewritten for the title and time.
+        The chat's lock is held throughout, as appends from several NFS clients can
+        overwrite each other and metadata updates would be lost.
+        """
+        try:
+            with locks.chat_lock(self.base_dir, chat_id):
+                return self._append_messages(chat_id, messages)
+        except locks.LockTimeout as e:
+            logger.error(f"Error saving message: {e}")
+            return False
+
+    def _append_messages(self, chat_id: str, messages: List[Tuple[Dict, Optional[str]]]) -> bool:
+        """Append messages and update the metadata and index, see add_messages."""
         chat_dir = self.base_dir / chat_id
         metadata_file = chat_dir / "metadata.json"
+        messages_file = chat_dir / MESSAGES_FILE
+
+        # Bring an archived chat back before appending to it
+        if not metadata_file.exists():
+            self.restore_archived_chat(chat_id)
 
         # Create directories if needed
         chat_dir.mkdir(parents=True, exist_ok=True)
@@ -278,16 +563,106 @@ class ChatManager:
             "id": chat_id,
             "title": "New Chat",
             "created_at": datetime.now().isoformat(),
-            "messages": [],
         }
 
         if metadata_file.exists():
             try:
-                with open(metadata_file, "r") as f:
-                    metadata = json.load(f)
+                metadata = storage.read_file(metadata_file)
             except Exception as e:
                 logger.error(f"Error loading metadata for {chat_id}: {str(e)}")
 
+        records = []
+        for message, media_path in messages:
+            self._prepare_message(metadata, message, media_path)
+            records.append(storage.dumps(message, "json") + b"\n")
+
+        # Save updated metadata
+        try:
+            legacy_messages = metadata.pop("messages", None)
+            if legacy_messages and not messages_file.exists():
+                # Move a legacy chat's messages into a new log, replaced in one step
+                legacy_records = [storage.dumps(m, "json") + b"\n" for m in legacy_messages]
+                storage.replace_file(messages_file, b"".join(legacy_records + records))
+            else:
+                # A record cut off by a crash must not swallow the first new one
+                if self._ends_mid_record(messages_file):
+                    records.insert(0, b"\n")
+
+                # A single write per request keeps appends from other processes whole
+                with open(messages_file, "ab") as f:
+                    f.write(b"".join(records))
+
+            storage.write_file(metadata_file, metadata)
+
+            # Update the chat in the global history
+            self._update_chat_in_history(chat_id, metadata)
+
+            return True
+        except Exception as e:
+            logger.error(f"Error saving message: {str(e)}")
+            return False
+
+    def restore_archived_chat(self, chat_id: str) -> bool:
+        """Unpack an archived chat into its directory.
+
+        Args:
+            chat_id: The unique identifier of the chat
+
+        Returns:
+            bool: True if the chat was archived and has been restored
+        """
+        if not archive.restore_chat(self.base_dir, chat_id):
+            return False
+
+        with self._updating_history():
+            chat_in_history = next(
+                (chat for chat in self.history["chats"] if chat["id"] == chat_id), None
+            )
+            if chat_in_history:
+                chat_in_history.pop("archived", None)
+        return True
+
+    def archive_cold_chats(
+        self, days: int, progress: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """Pack chats not updated for a number of days into archives.
+
+        Args:
+            days: Chats last updated more than this many days ago are archived
+            progress: Optional callback receiving (processed, total) chat counts
+
+        Returns:
+            int: The number of chats archived
+
+        Archived chats keep their entry in the global index, marked "archived", and are
+        restored by get_chat and add_message.
+        """
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        cold_chats = [
+            chat
+            for chat in self.history["chats"]
+            if not chat.get("archived") and chat.get("updated_at", "") < cutoff
+        ]
+
+        archived_ids = set()
+        for processed, chat in enumerate(cold_chats, start=1):
+            if progress:
+                progress(processed, len(cold_chats))
+            if archive.archive_chat(self.base_dir, chat["id"]):
+                archived_ids.add(chat["id"])
+
+        if archived_ids:
+            with self._updating_history():
+                for chat in self.history["chats"]:
+                    if chat["id"] in archived_ids:
+                        chat["archived"] = True
+            logger.info(f"Archived {len(archived_ids)} chats not updated for {days} days")
+        return len(archived_ids)
+
+    def _prepare_message(
+        self, metadata: Dict, message: Dict, media_path: Optional[str] = None
+    ) -> None:
+        """Timestamp a message and update the chat's updated_at and title from it."""
         # Add message data
         message["timestamp"] = datetime.now().isoformat()
         if media_path:
@@ -301,7 +676,6 @@ class ChatManager:
                 elif message["media"].startswith("audio_"):
                     message["mode"] = "audio"
 
-        metadata["messages"].append(message)
         metadata["updated_at"] = message["timestamp"]
 
         # Update title based on first message content if we haven't set a custom title
@@ -317,45 +691,62 @@ class ChatManager:
                     title = title[:30] + "..."
                 metadata["title"] = title
 
-        # Save updated metadata
-        try:
-            with open(metadata_file, "w") as f:
-                json.dump(metadata, f, indent=2)
-
-            # Update the chat in the global history
-            self._update_chat_in_history(chat_id, metadata)
-
-            return True
-        except Exception as e:
-            logger.error(f"Error saving message: {str(e)}")
-            return False
-
     def _update_chat_in_history(self, chat_id: str, metadata: Dict) -> None:
         """Update the chat entry in the global history."""
-        # Find the chat in history
-        chat_in_history = next(
-            (chat for chat in self.history["chats"] if chat["id"] == chat_id), None
-        )
-
-        # If chat exists in history, update it
-        if chat_in_history:
-            chat_in_history["title"] = metadata.get("title", "Untitled Chat")
-            chat_in_history["updated_at"] = metadata.get("updated_at", datetime.now().isoformat())
-        else:
-            # Otherwise, add it
-            chat_summary = {
-                "id": chat_id,
-                "title": metadata.get("title", "Untitled Chat"),
-                "created_at": metadata.get("created_at", datetime.now().isoformat()),
-                "updated_at": metadata.get("updated_at", datetime.now().isoformat()),
-            }
-            self.history["chats"].append(chat_summary)
+        with self._updating_history():
+            # Find the chat in history
+            chat_in_history = next(
+                (chat for chat in self.history["chats"] if chat["id"] == chat_id), None
+            )
+
+            # If chat exists in history, update it
+            if chat_in_history:
+                chat_in_history["title"] = metadata.get("title", "Untitled Chat")
+                chat_in_history["updated_at"] = metadata.get(
+                    "updated_at", datetime.now().isoformat()
+                )
+                chat_in_history["version"] = self._next_version()
+            else:
+                # Otherwise, add it
+                chat_summary = {
+                    "id": chat_id,
+                    "title": metadata.get("title", "Untitled Chat"),
+                    "created_at": metadata.get("created_at", datetime.now().isoformat()),
+                    "updated_at": metadata.get("updated_at", datetime.now().isoformat()),
+                    "version": self._next_version(),
+                }
+                self.history["chats"].append(chat_summary)
+
+            # Sort by updated_at (most recent first)
+            self.history["chats"].sort(key=lambda x: x.get("updated_at", ""), reverse=True)
+
+    def _save_image_bytes(self, data: bytes, media_dir: Path, timestamp: str, source: str) -> str:
+        """Save image bytes using the format PIL detects, or as raw PNG bytes."""
+        try:
+            # PIL is only needed for image messages, import it on first use
+            import io
 
-        # Sort by updated_at (most recent first)
-        self.history["chats"].sort(key=lambda x: x.get("updated_at", ""), reverse=True)
+            from PIL import Image
 
-        # Save history
-        self._save_history()
+            # Try to open as image to determine format
+            img = Image.open(io.BytesIO(data))
+            format_ext = img.format.lower() if img.format else "png"
+            filename = f"image_{timestamp}.{format_ext}"
+            filepath = media_dir / filename
+
+            # Save the image
+            img.save(filepath)
+            logger.info(f"Saved image from {source} to {filepath}")
+            return str(filepath)
+        except Exception as e:
+            logger.error(f"Error saving image from {source}: {e}")
+            # Fallback to raw bytes if PIL fails
+            filename = f"image_{timestamp}.png"
+            filepath = media_dir / filename
+            with open(filepath, "wb") as f:
+                f.write(data)
+            logger.info(f"Saved raw image bytes from {source} to {filepath}")
+            return str(filepath)
 
     def save_media(
         self, content: Union[bytes, str, Path], media_type: str, media_dir: Path
@@ -381,93 +772,29 @@ class ChatManager:
             # Create media directory if needed
             media_dir.mkdir(parents=True, exist_ok=True)
 
-            # Generate unique filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # Generate unique filename, microseconds keep concurrent batch items apart
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
 
             if media_type == "image":
                 # Handle image content (bytes or file path)
                 if isinstance(content, bytes):
-                    import io
-                    from PIL import Image
-
-                    # Try to open as image
-                    try:
-                        img = Image.open(io.BytesIO(content))
-                        format_ext = img.format.lower() if img.format else "png"
-                        filename = f"image_{timestamp}.{format_ext}"
-                        filepath = media_dir / filename
-                        img.save(filepath)
-                        logger.info(f"Saved image from bytes to {filepath}")
-                        return str(filepath)
-                    except Exception as e:
-                        logger.error(f"Error saving image from bytes: {e}")
-                        # Fallback to raw bytes if PIL fails
-                        filename = f"image_{timestamp}.png"
-                        filepath = media_dir / filename
-                        with open(filepath, "wb") as f:
-                            f.write(content)
-                        logger.info(f"Saved raw image bytes to {filepath}")
-                        return str(filepath)
+                    return self._save_image_bytes(content, media_dir, timestamp, "bytes")
 
                 elif isinstance(content, dict) and "url" in content:
                     # Handle image URL in a dictionary
                     import requests
-                    import io
-                    from PIL import Image
 
-                    try:
-                        response = requests.get(content["url"], timeout=30)
-                        response.raise_for_status()
-
-                        # Try to open as image to determine format
-                        img = Image.open(io.BytesIO(response.content))
-                        format_ext = img.format.lower() if img.format else "png"
-                        filename = f"image_{timestamp}.{format_ext}"
-                        filepath = media_dir / filename
-
-                        # Save the image
-                        img.save(filepath)
-                        logger.info(f"Saved image from URL to {filepath}")
-                        return str(filepath)
-                    except Exception as e:
-                        logger.error(f"Error saving image from URL: {e}")
-                        # Fallback to raw bytes if PIL fails
-                        filename = f"image_{timestamp}.png"
-                        filepath = media_dir / filename
-                        with open(filepath, "wb") as f:
-                            f.write(response.content)
-                        logger.info(f"Saved raw image bytes from URL to {filepath}")
-                        return str(filepath)
+                    response = requests.get(content["url"], timeout=30)
+                    response.raise_for_status()
+                    return self._save_image_bytes(response.content, media_dir, timestamp, "URL")
 
                 elif isinstance(content, str) and content.startswith("http"):
                     # Handle image URL as string
                     import requests
-                    import io
-                    from PIL import Image
 
-                    try:
-                        response = requests.get(content, timeout=30)
-                        response.raise_for_status()
-
-                        # Try to open as image to determine format
-                        img = Image.open(io.BytesIO(response.content))
-                        format_ext = img.format.lower() if img.format else "png"
-                        filename = f"image_{timestamp}.{format_ext}"
-                        filepath = media_dir / filename
-
-                        # Save the image
-                        img.save(filepath)
-                        logger.info(f"Saved image from URL to {filepath}")
-                        return str(filepath)
-                    except Exception as e:
-                        logger.error(f"Error saving image from URL: {e}")
-                        # Fallback to raw bytes if PIL fails
-                        filename = f"image_{timestamp}.png"
-                        filepath = media_dir / filename
-                        with open(filepath, "wb") as f:
-                            f.write(response.content)
-                        logger.info(f"Saved raw image bytes from URL to {filepath}")
-                        return str(filepath)
+                    response = requests.get(content, timeout=30)
+                    response.raise_for_status()
+                    return self._save_image_bytes(response.content, media_dir, timestamp, "URL")
 
                 elif isinstance(content, (str, Path)):
                     import shutil
@@ -522,44 +849,60 @@ class ChatManager:
 
         Returns:
             bool: True if deletion was successful, False otherwise
+        """
+        return chat_id in self.delete_chats([chat_id])
+
+    def delete_chats(self, chat_ids: List[str]) -> List[str]:
+        """Delete several chats with a single index write.
+
+        Args:
+            chat_ids: The unique identifiers of the chats to delete
+
+        Returns:
+            List[str]: The IDs of the chats that were found and deleted
 
         This method:
-        1. Removes all files in the chat directory (including media)
-        2. Deletes the chat directory itself
-        3. Removes the chat from the global history index
-        4. Saves the updated history
+        1. Renames each chat directory (and archive) into the trash, in constant time
+        2. Removes the chats from the global history index, leaving tombstones
+        3. Saves the updated history once
+        4. Wakes the background collector, which reclaims the disk space
         """
-        chat_dir = self.base_dir / chat_id
+        deleted = []
+        for chat_id in dict.fromkeys(chat_ids):
+            # Only plain directory names, never "..", hidden directories or paths
+            if not chat_id or chat_id.startswith(".") or Path(chat_id).name != chat_id:
+                logger.warning(f"Refusing to delete invalid chat ID: {chat_id!r}")
+                continue
 
-        if not chat_dir.exists():
-            logger.warning(f"Chat directory not found for deletion: {chat_id}")
-            return False
+            chat_dir = self.base_dir / chat_id
+            archive_path = archive.find_archive(self.base_dir, chat_id)
 
-        try:
-            # Delete all files in the directory recursively
-            for item in chat_dir.glob("**/*"):
-                if item.is_file():
-                    item.unlink()
-
-            # Delete subdirectories
-            for item in chat_dir.glob("*/"):
-                if item.is_dir():
-                    try:
-                        item.rmdir()
-                    except Exception as e:
-                        logger.error(f"Error deleting subdirectory {item}: {e}")
+            if not chat_dir.exists() and archive_path is None:
+                logger.warning(f"Chat directory not found for deletion: {chat_id}")
+                continue
+
+            try:
+                # Appends in flight on other nodes finish before the chat is moved
+                with locks.chat_lock(self.base_dir, chat_id):
+                    for path in (chat_dir, archive_path):
+                        if path is not None and path.exists():
+                            trash.move_to_trash(self.base_dir, path)
+                deleted.append(chat_id)
+            except Exception as e:
+                logger.error(f"Error deleting chat {chat_id}: {e}")
 
-            # Delete the chat directory
-            chat_dir.rmdir()
+        if not deleted:
+            return deleted
 
-            # Remove from history
+        # Remove from history, leaving a tombstone for the change feed
+        deleted_ids = set(deleted)
+        with self._updating_history():
             self.history["chats"] = [
-                chat for chat in self.history["chats"] if chat["id"] != chat_id
+                chat for chat in self.history["chats"] if chat["id"] not in deleted_ids
             ]
-            self._save_history()
+            for chat_id in deleted:
+                self._record_deletion(chat_id)
 
-            logger.info(f"Successfully deleted chat: {chat_id}")
-            return True
-        except Exception as e:
-            logger.error(f"Error deleting chat {chat_id}: {e}")
-            return False
+        trash.trash_collector.wake(self.base_dir)
+        logger.info(f"Successfully deleted {len(deleted)} chats")
+        return deleted
@@ -0,0 +1,202 @@
+"""Parsing of classifier responses, including reasoning output from chain-of-thought models."""
+
+import json
+import re
+from typing import List, Optional, Tuple
+
+# Modes a classifier response may select
+VALID_MODES = ("text", "image", "audio")
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+# Field lines, fenced or not, with ":" or "=" and optional markdown, YAML or JSON quoting
+LINE_FIELD = re.compile(
+    r'^[ \t>*`"-]*(mode|content)["*]*[ \t]*[:=](.*)$', re.IGNORECASE | re.MULTILINE
+)
+
+# Fields of a single-line JSON object
+JSON_FIELD = re.compile(r'"(mode|content)"\s*:\s*"((?:[^"\\\n]|\\.)*)"', re.IGNORECASE)
+
+# Characters wrapped around values by markdown or YAML-style output
+VALUE_WRAPPERS = " \t*`"
+QUOTES = ('"', "'")
+
+
+def strip_reasoning(response_content: str) -> str:
+    """Remove <think>...</think> reasoning blocks, including an unclosed trailing one."""
+    start = response_content.find(THINK_OPEN)
+    if start == -1:
+        return response_content
+
+    visible = []
+    position = 0
+    while start != -1:
+        visible.append(response_content[position:start])
+        end = response_content.find(THINK_CLOSE, start)
+        if end == -1:
+            return "".join(visible)
+        position = end + len(THINK_CLOSE)
+        start = response_content.find(THINK_OPEN, position)
+
+    visible.append(response_content[position:])
+    return "".join(visible)
+
+
+def _clean_value(value: str) -> str:
+    """Strip markdown markers, a trailing comma and matching quotes from a line value."""
+    value = value.strip(VALUE_WRAPPERS)
+    if value.endswith(","):
+        value = value[:-1].rstrip(VALUE_WRAPPERS)
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in QUOTES:
+        value = value[1:-1]
+        if "\\" in value:
+            value = _decode_json_string(value)
+    return value.strip()
+
+
+def _decode_json_string(value: str) -> str:
+    """Decode JSON escapes in a quoted value, leaving it as is if it is not valid JSON."""
+    try:
+        return json.loads(f'"{value}"')
+    except ValueError:
+        return value
+
+
+def _scan_fields(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """Return the last (mode, content) values found in text, either may be None."""
+    mode = None
+    content = None
+    for key, value in LINE_FIELD.findall(text):
+        value = value.strip(VALUE_WRAPPERS)
+        if value.endswith(",") or value.startswith(QUOTES):
+            value = _clean_value(value)
+        if key.lower() == "mode":
+            mode = value
+        else:
+            content = value
+
+    # Compact JSON keeps both fields on one line, which the line pattern cannot split
+    if (mode is None or content is None) and "{" in text:
+        for key, value in JSON_FIELD.findall(text):
+            if "\\" in value:
+                value = _decode_json_string(value)
+            if key.lower() == "mode":
+                mode = value.strip()
+            else:
+                content = value.strip()
+
+    if mode is not None:
+        mode = mode.lower().rstrip(".")
+    return mode, content
+
+
+def parse_classifier_output(response_content: str) -> Optional[Tuple[str, str]]:
+    """Extract (mode, cleaned_content) from classifier output, or None if it has neither.
+
+    Handles unfenced and fenced `mode:`/`content:` lines, `key = value` lines and JSON
+    objects with precompiled patterns, after dropping reasoning blocks with plain string
+    searches. When a field appears more than once the last value wins.
+    """
+    mode, content = _scan_fields(strip_reasoning(response_content))
+    if mode in VALID_MODES and content:
+        return mode, content
+    return None
+
+
+def _partial_tag_length(text: str, tag: str) -> int:
+    """Return how many trailing characters of text could be the start of tag."""
+    for length in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:length]):
+            return length
+    return 0
+
+
+class StreamingClassifierParser:
+    """Incrementally parse a streamed classifier response.
+
+    Reasoning inside <think> tags is discarded as it arrives. Visible text is scanned line
+    by line with the same field pattern as parse_classifier_output, and `feed` returns
+    True as soon as a valid mode and a complete content line have been seen, so the
+    caller can stop the generation.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty parser."""
+        self.mode: Optional[str] = None
+        self.content: Optional[str] = None
+        self._in_think = False
+        self._pending = ""  #  Unprocessed text, may end in a partial tag
+        self._line = ""  #  Visible text of the current, unfinished line
+        self._visible: List[str] = []
+
+    @property
+    def done(self) -> bool:
+        """Whether a valid mode and cleaned content have been parsed."""
+        return self.mode in VALID_MODES and bool(self.content)
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk of streamed output and return True once parsing is complete."""
+        if self.done:
+            return True
+
+        self._pending += chunk
+        while self._pending:
+            if self._in_think:
+                end = self._pending.find(THINK_CLOSE)
+                if end == -1:
+                    # Drop the reasoning, keeping only what may be the start of </think>
+                    keep = _partial_tag_length(self._pending, THINK_CLOSE)
+                    self._pending = self._pending[len(self._pending) - keep :]
+                    break
+                self._pending = self._pending[end + len(THINK_CLOSE) :]
+                self._in_think = False
+            else:
+                start = self._pending.find(THINK_OPEN)
+                if start == -1:
+                    keep = _partial_tag_length(self._pending, THINK_OPEN)
+                    visible = self._pending[: len(self._pending) - keep]
+                    self._pending = self._pending[len(self._pending) - keep :]
+                    self._add_visible(visible)
+                    break
+                self._add_visible(self._pending[:start])
+                self._pending = self._pending[start + len(THINK_OPEN) :]
+                self._in_think = True
+
+            if self.done:
+                return True
+
+        return self.done
+
+    def finish(self) -> Tuple[Optional[Tuple[str, str]], str]:
+        """Flush the last line and return (parsed result or None, visible response text)."""
+        if not self._in_think:
+            self._add_visible(self._pending)
+        self._pending = ""
+        if self._line:
+            self._scan_line(self._line)
+            self._line = ""
+
+        result = (self.mode, self.content) if self.done else None
+        return result, "".join(self._visible)
+
+    def _add_visible(self, text: str) -> None:
+        """Record visible text and scan every line it completes."""
+        if not text:
+            return
+        self._visible.append(text)
+
+        lines = (self._line + text).split("\n")
+        self._line = lines.pop()
+        for line in lines:
+            self._scan_line(line)
+            if self.done:
+                return
+
+    def _scan_line(self, line: str) -> None:
+        """Pick up `mode:` and `content:` values from one complete line."""
+        mode, content = _scan_fields(line)
+        if mode is not None:
+            self.mode = mode
+        if content is not None:
+            self.content = content
@@ -0,0 +1,103 @@
+"""Single-flight coalescing of identical in-flight provider generations."""
+
+import asyncio
+import copy
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Run one call per key at a time and share its result with concurrent callers.
+
+    The first caller for a key (the leader) makes the call. Callers arriving while it is in
+    flight wait for the leader and get share(result), a deep copy by default, or its
+    exception. Results are shared through thread-safe futures, so sync callers, and async
+    callers on different event loops, can join the same flight.
+    """
+
+    def __init__(self, share: Callable[[Any], Any] = copy.deepcopy) -> None:
+        """Initialize with no calls in flight."""
+        self._share = share
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self.coalesced = 0  #  Callers that shared another caller's result
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """Return the future for key and whether this caller is the leader."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                future.followers += 1
+                return future, False
+
+            future = Future()
+            future.followers = 0
+            self._in_flight[key] = future
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future) -> bool:
+        """Stop sharing a call so later callers start a new one, return if it was shared."""
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+            return future.followers > 0
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args: Any) -> Any:
+        """Call func(*args), or wait for an identical call already in flight."""
+        future, leader = self._join(key)
+        if not leader:
+            logger.info("Sharing the result of an identical in-flight generation")
+            return self._share(future.result())
+
+        try:
+            result = func(*args)
+        except BaseException as e:
+            self._finish(key, future)
+            future.set_exception(e)
+            raise
+
+        shared = self._finish(key, future)
+        future.set_result(result)
+        # Followers copy the result, so the leader must not hand out the same objects
+        return copy.deepcopy(result) if shared else result
+
+    async def do_async(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Await func(*args), or wait for an identical call already in flight."""
+        future, leader = self._join(key)
+        if not leader:
+            logger.info("Sharing the result of an identical in-flight generation")
+            return self._share(await asyncio.wrap_future(future))
+
+        try:
+            result = await func(*args)
+        except BaseException as e:
+            self._finish(key, future)
+            future.set_exception(e)
+            raise
+
+        shared = self._finish(key, future)
+        future.set_result(result)
+        # Followers copy the result, so the leader must not hand out the same objects
+        return copy.deepcopy(result) if shared else result
+
+
+def share_response(response: Any) -> Any:
+    """Copy a provider response for a follower, marked coalesced instead of its attempts.
+
+    Only the leader called the providers, so only its turn reports the attempts.
+    """
+    response = copy.deepcopy(response)
+    if isinstance(response, dict):
+        response.pop("attempts", None)
+        response["coalesced"] = True
+    return response
+
+
+# Process-wide flights for provider generations
+generation_flights = SingleFlight(share=share_response)
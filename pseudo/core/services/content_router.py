@@ -1,30 +1,96 @@
 """Routes user content to appropriate AI providers based on content type detection."""
 
+import asyncio
+import inspect
 import json
 import logging
 import os
+import re
 import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
-
-# Add parent directory to sys.path so apicenter is available
-# This expects apicenter to be in a sibling directory
-parent_dir = str(Path(__file__).resolve().parent.parent.parent.parent.parent)
-if parent_dir not in sys.path:
-    sys.path.insert(0, parent_dir)
-
-# Import apicenter
-try:
-    from apicenter import apicenter
-except ImportError as e:
-    message = f"""
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple, Union
+
+from pseudo.core.config import Config
+from pseudo.core.prompts import get_classifier_prompt, load_prompt
+from pseudo.core.services.classifier_parser import (
+    StreamingClassifierParser,
+    parse_classifier_output,
+    strip_reasoning,
+)
+from pseudo.core.services.coalescing import generation_flights
+from pseudo.core.services.metrics import attach_turn_metrics, attempt
+from pseudo.core.services.rate_limiter import rate_limiter
+from pseudo.core.services.scheduler import provider_scheduler
+from pseudo.core.services.selector import selector_manager
+from pseudo.core.services.shared_cache import cache_key, shared_cache
+from pseudo.core.services.speculation import speculation_stats
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Output modes Pseudo can route to
+MODES = ("text", "image", "audio")
+
+# Separator between the classification header and the answer in a combined reply
+COMBINED_SEPARATOR = re.compile(r"^\s*---\s*$", re.MULTILINE)
+
+# Providers whose apicenter client rejected the keep_alive option
+_no_keep_alive_providers: set = set()
+
+# Bounded pool shared by all async callers for blocking apicenter calls
+_provider_executor: Optional[ThreadPoolExecutor] = None
+_provider_executor_lock = threading.Lock()
+
+
+def _get_provider_executor() -> ThreadPoolExecutor:
+    """Return the shared executor used to run blocking provider calls."""
+    global _provider_executor
+    with _provider_executor_lock:
+        if _provider_executor is None:
+            _provider_executor = ThreadPoolExecutor(
+                max_workers=Config.PROVIDER_EXECUTOR_WORKERS, thread_name_prefix="provider"
+            )
+    return _provider_executor
+
+
+async def _run_blocking(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking call in the bounded provider executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_provider_executor(), func, *args)
+
+
+# apicenter and the provider SDKs behind it are imported on first use, not at import time
+_apicenter: Any = None
+_apicenter_lock = threading.Lock()
+
+
+def _load_apicenter() -> Any:
+    """Import and return the apicenter singleton, loading it on the first call."""
+    global _apicenter
+    with _apicenter_lock:
+        if _apicenter is not None:
+            return _apicenter
+
+        # Add parent directory to sys.path so apicenter is available
+        # This expects apicenter to be in a sibling directory
+        parent_dir = str(Path(__file__).resolve().parent.parent.parent.parent.parent)
+        if parent_dir not in sys.path:
+            sys.path.insert(0, parent_dir)
+
+        try:
+            from apicenter import apicenter
+        except ImportError as e:
+            message = f"""
 Error importing apicenter: {e}
-    
+
 Please ensure the directory structure is:
 parent-directory/
   ├── apicenter/
   └── pseudo/
-    
+
 To fix this:
 1. Create a parent directory
 2. Clone both repositories side by side
@@ -32,21 +98,31 @@ To fix this:
    cd pseudo
    poetry install
 """
-    raise ImportError(message)
+            raise ImportError(message)
 
-# Set up logger
-logger = logging.getLogger(__name__)
+        _apicenter = apicenter
+        return _apicenter
 
 
 class ContentRouter:
     """Routes content to appropriate providers based on detected mode."""
 
-    def __init__(self) -> None:
-        """Initialize content router with API center and credentials."""
-        self.api_center = apicenter  # Use the singleton instance
+    def __init__(self, prompt_variant: Optional[str] = None) -> None:
+        """Initialize content router with API center, credentials and classifier prompt."""
         self.credentials_path = ""
         self.credentials = self._load_credentials()
 
+        # Static classifier prompt, sent byte-identical on every call so it can be cached
+        self.prompt_variant = prompt_variant or Config.CLASSIFIER_PROMPT
+        self.classifier_prompt = get_classifier_prompt(
+            self.prompt_variant, Config.CLASSIFIER_PROMPT_VERSION
+        )
+
+    @property
+    def api_center(self) -> Any:
+        """The apicenter singleton instance, imported on first provider call."""
+        return _load_apicenter()
+
     def _load_credentials(self) -> Dict[str, Any]:
         """Load credentials from available file locations and return credential dictionary."""
         try:
@@ -193,167 +269,196 @@ class ContentRouter:
             logger.error(f"Error saving credentials: {e}")
             raise e
 
+    def _classifier_candidates(self) -> Iterator[Tuple[str, str]]:
+        """Yield (provider, model) pairs to try for classification, in queue order."""
+        # The local selector (or its fallback while loading) goes before the queue
+        selector = selector_manager.candidate()
+        if selector:
+            yield selector
+
+        if "text" not in self.credentials["modes"]:
+            return
+
+        text_providers = self.credentials["modes"]["text"]["providers"]
+
+        # Try each provider in the order they appear in credentials.json
+        for provider_name, provider_config in text_providers.items():
+            if "models" in provider_config and provider_config["models"]:
+                # Use the first model in the list (queue order matters)
+                candidate = (provider_name, provider_config["models"][0])
+                if candidate != selector:
+                    yield candidate
+
+    def _call_classifier(self, provider_name: str, model_name: str, user_input: str) -> Any:
+        """Ask one text provider to classify and clean the user input."""
+        logger.info(f"Using {provider_name}/{model_name} for content detection and cleaning")
+
+        prompt = [
+            {"role": "system", "content": self.classifier_prompt},
+            {"role": "user", "content": user_input},
+        ]
+
+        # Stream local models so reasoning output does not have to finish before parsing
+        if provider_name == "ollama" and Config.CLASSIFIER_STREAMING:
+            try:
+                return self._stream_ollama_classifier(model_name, prompt)
+            except Exception as e:
+                logger.warning(f"Streaming classification with {model_name} failed: {e}")
+
+        # Use apicenter singleton to make the classification and extraction
+        return self._call_with_prefix_cache(provider_name, model_name, prompt)
+
+    def _stream_ollama_classifier(self, model_name: str, prompt: List[Dict[str, str]]) -> str:
+        """Stream a classification from Ollama, stopping once mode and content are known.
+
+        Closing the HTTP response makes Ollama cancel the rest of the generation. Returns
+        the parsed `mode:`/`content:` lines, or the visible response text if the stream
+        ended without them.
+        """
+        import requests
+
+        parser = StreamingClassifierParser()
+        with (
+            self._rate_limited("text", "ollama", model_name),
+            requests.post(
+                f"{Config.OLLAMA_HOST.rstrip('/')}/api/chat",
+                json={
+                    "model": model_name,
+                    "messages": prompt,
+                    "stream": True,
+                    "keep_alive": Config.SELECTOR_KEEP_ALIVE,
+                    "options": {"temperature": 0.0},
+                },
+                stream=True,
+                timeout=Config.SELECTOR_LOAD_TIMEOUT,
+            ) as response,
+        ):
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if parser.feed(chunk.get("message", {}).get("content", "")):
+                    logger.info(f"Stopped {model_name} classification once mode and content parsed")
+                    break
+                if chunk.get("done"):
+                    break
+
+        result, visible_text = parser.finish()
+        if result:
+            mode, cleaned_content = result
+            return f"mode: {mode}\ncontent: {cleaned_content}"
+        return visible_text
+
+    def _call_with_prefix_cache(
+        self, provider_name: str, model_name: str, prompt: List[Dict[str, str]]
+    ) -> Any:
+        """Send a classifier prompt, asking providers that support it to keep the prefix warm.
+
+        The system prompt comes first and never changes, so providers with automatic prefix
+        caching only prefill the user text. Ollama is also asked to keep the model (and its
+        cached prompt context) loaded between requests.
+        """
+        options: Dict[str, Any] = {"temperature": 0.0}
+        if provider_name == "ollama" and provider_name not in _no_keep_alive_providers:
+            options["keep_alive"] = Config.SELECTOR_KEEP_ALIVE
+
+        with self._rate_limited("text", provider_name, model_name):
+            try:
+                return self.api_center.text(
+                    provider=provider_name, model=model_name, prompt=prompt, **options
+                )
+            except TypeError as e:
+                if "keep_alive" not in options or "keep_alive" not in str(e):
+                    raise
+                # This apicenter version does not pass keep_alive through, stop sending it
+                logger.info(
+                    f"{provider_name} does not accept keep_alive, sending prompts without it"
+                )
+                _no_keep_alive_providers.add(provider_name)
+                return self.api_center.text(
+                    provider=provider_name, model=model_name, prompt=prompt, temperature=0.0
+                )
+
+    def _parse_classifier_response(
+        self, response: Any, provider_name: str, model_name: str
+    ) -> Optional[Tuple[str, str]]:
+        """Extract (mode, cleaned_content) from a classifier response, or None if invalid."""
+        # Extract the response content
+        if isinstance(response, str):
+            response_content = response
+        elif isinstance(response, dict) and "content" in response:
+            response_content = response["content"]
+        else:
+            logger.warning(f"Unexpected response format: {response}")
+            return None
+
+        # One pass over fenced, unfenced, key/value and JSON forms, ignoring reasoning
+        result = parse_classifier_output(response_content)
+        if result:
+            mode, cleaned_content = result
+            logger.info(f"Mode detected: {mode}, Cleaned content: '{cleaned_content}'")
+            return result
+
+        logger.warning(
+            f"Invalid output format from {provider_name}/{model_name}: {response_content[:200]!r}"
+        )
+        return None
+
+    def _classification_key(self, user_input: str) -> str:
+        """Return the shared cache key of an input's classification.
+
+        The key covers the prompt and the classifier queue, so a different prompt, selector
+        or classifier provider/model does not reuse another's results.
+        """
+        queue = ",".join(f"{provider}/{model}" for provider, model in self._classifier_candidates())
+        return cache_key(
+            f"{self.prompt_variant}\0{Config.CLASSIFIER_PROMPT_VERSION}\0{queue}\0{user_input}"
+        )
+
+    def _cached_classification(self, user_input: str) -> Optional[Tuple[str, str]]:
+        """Return (mode, cleaned_content) if any worker classified this input recently."""
+        if Config.CLASSIFIER_CACHE_TTL <= 0:
+            return None
+        cached = shared_cache.get("classifier", self._classification_key(user_input))
+        if not cached or len(cached) < 3 or cached[0] not in MODES:
+            return None
+        if time.time() - cached[2] > Config.CLASSIFIER_CACHE_TTL:
+            return None
+        logger.info(f"Mode from the classifier cache: {cached[0]}")
+        return cached[0], cached[1]
+
+    def _remember_classification(self, user_input: str, result: Tuple[str, str]) -> None:
+        """Share a successful classification with all workers, with the time it was made."""
+        if Config.CLASSIFIER_CACHE_TTL <= 0:
+            return
+        shared_cache.set("classifier", self._classification_key(user_input), [*result, time.time()])
+
     def select_mode_and_clean_content(self, user_input: str) -> tuple[str, str]:
         """Determine content type and extract cleaned content from user input.
 
         Returns a tuple of (mode, cleaned_content) where mode is one of 'text', 'image', 'audio'
         and cleaned_content is the extracted actual content the user wants to process.
+        Results are shared with the other workers, and inputs seen before skip the classifier.
         """
-        try:
-            # System prompt for content classification and extraction
-            system_prompt = """You are a content analyzer that determines both the type of content requested and extracts the actual content to be processed.
-
-Based on the user's input, you must respond with EXACTLY this format:
-```
-mode: <mode>
-content: <cleaned content>
-```
-
-Where <mode> is one of: 'text', 'image', or 'audio'
-And <cleaned content> is the actual content to be processed (removing meta-instructions).
-
-Rules for determining mode:
-1. For IMAGE requests - Detect when the user clearly wants a visual representation:
-   - Look for explicit visual keywords: image, picture, photo, drawing, illustration, render, visual, diagram, sketch
-   - Consider requests about visually-oriented subjects: landscapes, scenes, portraits, designs, logos
-
-2. For AUDIO requests - Strictly for text-to-speech conversion only:
-   - IMPORTANT: Audio mode ONLY converts text to spoken speech, it cannot create music or sound effects
-   - Only choose audio when the user explicitly wants text spoken aloud
-   - Look for audio keywords: speak, read aloud, narrate, voice, speech, pronounce, recite, say this, verbalize
-   - The intent should be to have specific text converted to spoken audio
-   - MUST have clear indication of speech intent - just providing a quote or sentence is NOT enough
-
-3. For TEXT requests - This is the primary generative content mode:
-   - Any requests for information, explanations, stories, essays, paragraphs
-   - Content that is meant to be read rather than seen or heard
-   - Requests using writing verbs: write, explain, tell me, describe, summarize, compose
-   - Any ambiguous requests about creating content (when not clearly visual)
-   - Standalone quotes or sentences without speech indicators should be treated as text
-
-4. For VAGUE requests - When the intent is unclear:
-   - If the request contains an equal mix of indicators, prefer text over other modes
-   - Words like "create," "generate," "make," "produce" without clear visual/audio context → text
-   - Requests about "sound" or "music" should be text, as audio is only for text-to-speech
-   - When truly ambiguous, default to text mode as it's the most general-purpose
-   - "Compose a scene" → text (unless explicitly asking for a visual)
-   - Standalone quotes or sentences → text (unless explicitly asked to be spoken)
-
-For content cleaning:
-- IMPORTANT: For TEXT mode - KEEP THE ORIGINAL QUERY INTACT with minimal to no cleaning
-  - Do NOT remove phrases like "write text about" or "tell me about" from text requests
-  - The text mode should receive the full original query to process
-  
-- For IMAGE requests: 
-  - Moderate cleaning - KEEP THE ORIGINAL QUERY INTACT with minimal to no cleaning
-  - Keep all descriptive details intact
-
-- For AUDIO requests ONLY: 
-  - Aggressive cleaning - Extract ONLY the specific text to be converted to speech
-  - If there's text after a colon (e.g., "read this aloud: hello world"), extract only "hello world"
-  - If there's no colon, try to extract only the text that should be spoken
-
-- For VAGUE requests: Minimal to no cleaning - keep the full query intact
-
-Examples:
-- "generate an image of a red cat" → mode: image, content: a red cat
-- "draw a landscape with mountains" → mode: image, content: a landscape with mountains
-
-- "write text about quantum physics" → mode: text, content: write text about quantum physics
-- "explain the theory of relativity" → mode: text, content: explain the theory of relativity
-- "tell me about the solar system" → mode: text, content: tell me about the solar system
-- "generate a paragraph about climate change" → mode: text, content: generate a paragraph about climate change
-
-- "convert this text to speech: hello world" → mode: audio, content: hello world
-- "read this aloud: welcome to the future" → mode: audio, content: welcome to the future
-- "say this sentence: I'm having a great day" → mode: audio, content: I'm having a great day
-
-- "create content about space exploration" → mode: text, content: create content about space exploration
-- "compose a scene by the pond" → mode: text, content: compose a scene by the pond
-- "To be, or not to be, that is the question" → mode: text, content: To be, or not to be, that is the question
-- "Climate change is the defining crisis of our time" → mode: text, content: Climate change is the defining crisis of our time
-"""
+        cached = self._cached_classification(user_input)
+        if cached:
+            return cached
 
+        try:
             # Use queue-based approach from credentials.json - try providers in strict order
-            if "text" in self.credentials["modes"]:
-                text_providers = self.credentials["modes"]["text"]["providers"]
-
-                # Try each provider in the order they appear in credentials.json
-                for provider_name, provider_config in text_providers.items():
-                    if "models" in provider_config and provider_config["models"]:
-                        # Use the first model in the list (queue order matters)
-                        model_name = provider_config["models"][0]
-
-                        try:
-                            logger.info(
-                                f"Using {provider_name}/{model_name} for content detection and cleaning"
-                            )
-
-                            # Use apicenter singleton to make the classification and extraction
-                            response = self.api_center.text(
-                                provider=provider_name,
-                                model=model_name,
-                                prompt=[
-                                    {"role": "system", "content": system_prompt},
-                                    {"role": "user", "content": user_input},
-                                ],
-                                temperature=0.0,
-                            )
-
-                            # Extract the response content
-                            if isinstance(response, str):
-                                response_content = response
-                            elif isinstance(response, dict) and "content" in response:
-                                response_content = response["content"]
-                            else:
-                                logger.warning(f"Unexpected response format: {response}")
-                                continue  #  Try next provider in queue
-
-                            # Parse the response to extract mode and cleaned content
-                            mode = None
-                            cleaned_content = None
-
-                            # Look for the mode and content pattern
-                            for line in response_content.split("\n"):
-                                line = line.strip()
-                                if line.startswith("mode:"):
-                                    mode = line.replace("mode:", "").strip().lower()
-                                elif line.startswith("content:"):
-                                    cleaned_content = line.replace("content:", "").strip()
-
-                            # If response is in code block format, try to extract from that
-                            if not mode or not cleaned_content:
-                                import re
-
-                                # Try to extract content between ```
-                                code_block_match = re.search(
-                                    r"```(.*?)```", response_content, re.DOTALL
-                                )
-                                if code_block_match:
-                                    code_block = code_block_match.group(1)
-                                    for line in code_block.split("\n"):
-                                        line = line.strip()
-                                        if line.startswith("mode:"):
-                                            mode = line.replace("mode:", "").strip().lower()
-                                        elif line.startswith("content:"):
-                                            cleaned_content = line.replace("content:", "").strip()
-
-                            # Validate the extracted information
-                            if mode in ["text", "image", "audio"] and cleaned_content:
-                                logger.info(
-                                    f"Mode detected: {mode}, Cleaned content: '{cleaned_content}'"
-                                )
-                                return mode, cleaned_content
-                            else:
-                                logger.warning(
-                                    f"Invalid output format from {provider_name}/{model_name}: mode={mode}, content={cleaned_content}"
-                                )
-                                continue  #  Try next provider in queue
-                        except Exception as e:
-                            logger.warning(
-                                f"Error using {provider_name}/{model_name} for content detection: {e}"
-                            )
-                            continue  #  Try next provider in queue
+            for provider_name, model_name in self._classifier_candidates():
+                try:
+                    response = self._call_classifier(provider_name, model_name, user_input)
+                    result = self._parse_classifier_response(response, provider_name, model_name)
+                    if result:
+                        self._remember_classification(user_input, result)
+                        return result
+                except Exception as e:
+                    logger.warning(
+                        f"Error using {provider_name}/{model_name} for content detection: {e}"
+                    )
+                # Try next provider in queue
 
             # If all providers failed or none configured, default to text with original input
             logger.warning(
@@ -365,6 +470,305 @@ Examples:
             logger.error(f"Error in mode and content detection: {e}")
             return "text", user_input  #  Default to text mode with original input on error
 
+    async def select_mode_and_clean_content_async(self, user_input: str) -> tuple[str, str]:
+        """Async variant of select_mode_and_clean_content.
+
+        Blocking classifier calls run in the bounded provider executor, so waiting on a
+        slow provider does not hold a request thread.
+        """
+        cached = self._cached_classification(user_input)
+        if cached:
+            return cached
+
+        try:
+            for provider_name, model_name in self._classifier_candidates():
+                try:
+                    response = await _run_blocking(
+                        self._call_classifier, provider_name, model_name, user_input
+                    )
+                    result = self._parse_classifier_response(response, provider_name, model_name)
+                    if result:
+                        self._remember_classification(user_input, result)
+                        return result
+                except Exception as e:
+                    logger.warning(
+                        f"Error using {provider_name}/{model_name} for content detection: {e}"
+                    )
+
+            logger.warning(
+                "All attempts to detect mode and clean content failed, defaulting to text mode with original input"
+            )
+            return "text", user_input
+
+        except Exception as e:
+            logger.error(f"Error in mode and content detection: {e}")
+            return "text", user_input
+
+    def _with_context(
+        self,
+        user_input: str,
+        context: Optional[List[Dict[str, str]]] = None,
+        system: Optional[str] = None,
+    ) -> Union[str, List[Dict[str, str]]]:
+        """Return the prompt for user_input, preceded by earlier turns and a system prompt.
+
+        Without context or system prompt the input is returned unchanged.
+        """
+        if not context and system is None:
+            return user_input
+
+        messages = list(context or [])
+        if system is not None:
+            # Providers accept one system message, so a context summary joins the system prompt
+            if messages and messages[0]["role"] == "system":
+                system = f"{system}\n\n{messages.pop(0)['content']}"
+            messages.insert(0, {"role": "system", "content": system})
+        messages.append({"role": "user", "content": user_input})
+        return messages
+
+    def _call_combined(
+        self,
+        provider_name: str,
+        model_name: str,
+        user_input: str,
+        context: Optional[List[Dict[str, str]]] = None,
+    ) -> Any:
+        """Ask one text provider to classify the input and, for text, answer it directly."""
+        logger.info(f"Using {provider_name}/{model_name} for single-pass classify and generate")
+
+        combined_prompt = self.classifier_prompt + load_prompt(
+            "combined_text", Config.CLASSIFIER_PROMPT_VERSION
+        )
+        return self._call_with_prefix_cache(
+            provider_name, model_name, self._with_context(user_input, context, combined_prompt)
+        )
+
+    def _parse_combined_response(
+        self, response: Any, provider_name: str, model_name: str, user_input: str, seconds: float
+    ) -> Optional[Tuple[str, str, Optional[Dict[str, Any]]]]:
+        """Split a single-pass reply into (mode, cleaned_content, text response or None).
+
+        Returns None if the reply has no valid classification header.
+        """
+        if isinstance(response, dict) and "content" in response:
+            response = response["content"]
+        if not isinstance(response, str):
+            logger.warning(f"Unexpected response format: {response}")
+            return None
+
+        # Header (mode/content lines) first, then the answer after the separator.
+        # Reasoning models may write a separator line while thinking, so the
+        # reasoning is removed before splitting.
+        parts = COMBINED_SEPARATOR.split(strip_reasoning(response), maxsplit=1)
+        header = parts[0]
+        answer = parts[1].strip() if len(parts) > 1 else ""
+
+        result = self._parse_classifier_response(header, provider_name, model_name)
+        if not result:
+            return None
+
+        self._remember_classification(user_input, result)
+        mode, cleaned_content = result
+        if mode == "text" and answer:
+            attempts = [attempt(provider_name, model_name, seconds)]
+            return (
+                mode,
+                cleaned_content,
+                self._wrap_response("text", answer, provider_name, model_name, attempts),
+            )
+        return mode, cleaned_content, None
+
+    def classify_and_generate(
+        self, user_input: str, context: Optional[List[Dict[str, str]]] = None
+    ) -> Tuple[str, str, Optional[Dict[str, Any]]]:
+        """Classify the input and, when it is text, produce the answer in the same call.
+
+        Returns (mode, cleaned_content, response). The response is None when the mode is
+        not text or the reply had no answer, and the caller must call process_content.
+        """
+        try:
+            for provider_name, model_name in self._classifier_candidates():
+                start = time.perf_counter()
+                try:
+                    response = self._call_combined(provider_name, model_name, user_input, context)
+                    result = self._parse_combined_response(
+                        response, provider_name, model_name, user_input, time.perf_counter() - start
+                    )
+                    if result:
+                        return result
+                except Exception as e:
+                    logger.warning(
+                        f"Error using {provider_name}/{model_name} for content detection: {e}"
+                    )
+
+            logger.warning(
+                "All attempts to detect mode and clean content failed, defaulting to text mode with original input"
+            )
+            return "text", user_input, None
+
+        except Exception as e:
+            logger.error(f"Error in mode and content detection: {e}")
+            return "text", user_input, None
+
+    async def classify_and_generate_async(
+        self, user_input: str, context: Optional[List[Dict[str, str]]] = None
+    ) -> Tuple[str, str, Optional[Dict[str, Any]]]:
+        """Async variant of classify_and_generate."""
+        try:
+            for provider_name, model_name in self._classifier_candidates():
+                start = time.perf_counter()
+                try:
+                    response = await _run_blocking(
+                        self._call_combined, provider_name, model_name, user_input, context
+                    )
+                    result = self._parse_combined_response(
+                        response, provider_name, model_name, user_input, time.perf_counter() - start
+                    )
+                    if result:
+                        return result
+                except Exception as e:
+                    logger.warning(
+                        f"Error using {provider_name}/{model_name} for content detection: {e}"
+                    )
+
+            logger.warning(
+                "All attempts to detect mode and clean content failed, defaulting to text mode with original input"
+            )
+            return "text", user_input, None
+
+        except Exception as e:
+            logger.error(f"Error in mode and content detection: {e}")
+            return "text", user_input, None
+
+    def _speculation_target(self, user_input: str) -> Optional[Tuple[str, str]]:
+        """Return the text provider/model to speculate on, or None if the cost guard says no.
+
+        Speculation uses the first entry of the text queue that is listed in
+        SPECULATIVE_PROVIDERS (local/cheap providers) and is not at its rate limit, so a
+        paid or saturated provider at the head of the queue does not turn it off.
+        """
+        if len(user_input) > Config.SPECULATIVE_MAX_INPUT_CHARS:
+            return None
+        if self._check_mode_configured("text"):
+            return None
+
+        providers = self.credentials["modes"]["text"]["providers"]
+        for provider_name, model_name in self._provider_candidates("text"):
+            if provider_name in Config.SPECULATIVE_PROVIDERS and rate_limiter.available(
+                provider_name, model_name, providers[provider_name]
+            ):
+                return provider_name, model_name
+        return None
+
+    def _speculate_text(
+        self, provider_name: str, model_name: str, prompt: Union[str, List[Dict[str, str]]]
+    ) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Generate a text answer for the raw input, returning (response or None, seconds)."""
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self._call_provider("text", provider_name, model_name, prompt)
+        except Exception as e:
+            logger.warning(f"Speculative call to {provider_name}/{model_name} failed: {e}")
+        elapsed = time.perf_counter() - start
+
+        if response:
+            attempts = [attempt(provider_name, model_name, elapsed)]
+            response = self._wrap_response("text", response, provider_name, model_name, attempts)
+            return response, elapsed
+        return None, elapsed
+
+    def _start_speculation(
+        self, user_input: str, context: Optional[List[Dict[str, str]]] = None
+    ) -> Optional[Tuple[str, Future]]:
+        """Submit a speculative text call on the raw input, returning (provider, future).
+
+        Returns None when the cost guard says no. The call runs in the provider executor,
+        so it outlives the request if it has to be discarded.
+        """
+        target = self._speculation_target(user_input)
+        if target is None:
+            speculation_stats.record_skipped()
+            return None
+
+        provider_name, model_name = target
+        speculation_stats.record_started(provider_name)
+        logger.info(f"Speculatively generating text with {provider_name}/{model_name}")
+        future = _get_provider_executor().submit(
+            self._speculate_text, provider_name, model_name, self._with_context(user_input, context)
+        )
+        return provider_name, future
+
+    def _speculation_used(self, mode: str, cleaned_content: str, user_input: str) -> bool:
+        """Return whether the classification lets the speculative answer on the raw input stand."""
+        return mode == "text" and cleaned_content.strip() == user_input.strip()
+
+    def _count_speculation(
+        self, provider_name: str, response: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Count a speculative answer the classifier agreed with as a hit, or a miss if it failed."""
+        if response is not None:
+            speculation_stats.record_hit(provider_name)
+        else:
+            speculation_stats.record_miss(provider_name, cancelled=False)
+        return response
+
+    def _discard_speculation(self, provider_name: str, future: Future, mode: str) -> None:
+        """Cancel a losing speculative call, or count its cost once it finishes."""
+        cancelled = future.cancel()
+        speculation_stats.record_miss(provider_name, cancelled)
+        if not cancelled:
+            future.add_done_callback(
+                lambda done: speculation_stats.record_waste(
+                    provider_name, done.result()[1], done.result()[0]
+                )
+            )
+        logger.info(
+            f"Discarded speculative text answer, classifier chose {mode}"
+            + (" with cleaned input" if mode == "text" else "")
+        )
+
+    def classify_with_speculation(
+        self, user_input: str, context: Optional[List[Dict[str, str]]] = None
+    ) -> Tuple[str, str, Optional[Dict[str, Any]]]:
+        """Classify while a speculative text answer is generated concurrently.
+
+        Returns (mode, cleaned_content, response). The response is the speculative answer
+        when text wins and the classifier left the input unchanged, otherwise None and the
+        caller must call process_content. The speculative answer was generated from the raw
+        input, so a cleaned input counts as a miss. A losing speculative call is cancelled
+        if it has not started, or discarded when it finishes.
+        """
+        started = self._start_speculation(user_input, context)
+        mode, cleaned_content = self.select_mode_and_clean_content(user_input)
+        if started is None:
+            return mode, cleaned_content, None
+
+        provider_name, future = started
+        if self._speculation_used(mode, cleaned_content, user_input):
+            response, _ = future.result()
+            return mode, cleaned_content, self._count_speculation(provider_name, response)
+
+        self._discard_speculation(provider_name, future, mode)
+        return mode, cleaned_content, None
+
+    async def classify_with_speculation_async(
+        self, user_input: str, context: Optional[List[Dict[str, str]]] = None
+    ) -> Tuple[str, str, Optional[Dict[str, Any]]]:
+        """Async variant of classify_with_speculation."""
+        started = self._start_speculation(user_input, context)
+        mode, cleaned_content = await self.select_mode_and_clean_content_async(user_input)
+        if started is None:
+            return mode, cleaned_content, None
+
+        provider_name, future = started
+        if self._speculation_used(mode, cleaned_content, user_input):
+            response, _ = await asyncio.wrap_future(future)
+            return mode, cleaned_content, self._count_speculation(provider_name, response)
+
+        self._discard_speculation(provider_name, future, mode)
+        return mode, cleaned_content, None
+
     def select_mode(self, user_input: str) -> str:
         """Determine content type (text, image, audio) and return mode string."""
         # Get mode and cleaned content, but only return the mode
@@ -377,134 +781,346 @@ Examples:
         _, cleaned_content = self.select_mode_and_clean_content(user_input)
         return cleaned_content
 
-    def process_content(self, mode: str, prompt: str) -> Any:
-        """Process content using provider queue and return response of appropriate type."""
-        try:
-            # Check for valid mode configuration
-            if mode not in self.credentials["modes"]:
-                logger.error(f"No providers configured for {mode} mode")
-                return {
-                    "content": f"The '{mode}' mode is not configured in credentials.json. Please add providers for this mode.",
-                    "provider": "system",
-                    "model": "none",
-                }
-
-            providers = self.credentials["modes"][mode]["providers"]
-            if not providers:
-                logger.error(f"No providers available for {mode} mode")
-                return {
-                    "content": f"No providers are configured for the '{mode}' mode in credentials.json. Please add at least one provider.",
-                    "provider": "system",
-                    "model": "none",
-                }
-
-            # Check if any providers have API keys
-            has_configured_provider = False
-            for provider_name, provider_config in providers.items():
-                # For non-local providers, check API keys
-                if (
-                    provider_name != "ollama"
-                    and "api_key" in provider_config
-                    and provider_config["api_key"]
-                ):
-                    has_configured_provider = True
-                    break
-                # For local providers like ollama, just check if it exists
-                elif provider_name == "ollama":
-                    has_configured_provider = True
-                    break
+    def _check_mode_configured(self, mode: str) -> Optional[Dict[str, Any]]:
+        """Return a system response explaining why a mode cannot be served, or None if it can."""
+        # Check for valid mode configuration
+        if mode not in self.credentials["modes"]:
+            logger.error(f"No providers configured for {mode} mode")
+            return {
+                "content": f"The '{mode}' mode is not configured in credentials.json. Please add providers for this mode.",
+                "provider": "system",
+                "model": "none",
+            }
 
-            if not has_configured_provider:
-                logger.error(f"No providers with API keys configured for {mode} mode")
-                return {
-                    "content": f"No API keys are configured for any providers in '{mode}' mode. Please add your API keys to credentials.json.",
-                    "provider": "system",
-                    "model": "none",
-                }
+        providers = self.credentials["modes"][mode]["providers"]
+        if not providers:
+            logger.error(f"No providers available for {mode} mode")
+            return {
+                "content": f"No providers are configured for the '{mode}' mode in credentials.json. Please add at least one provider.",
+                "provider": "system",
+                "model": "none",
+            }
 
-            errors = []
+        # Check if any providers have API keys
+        has_configured_provider = False
+        for provider_name, provider_config in providers.items():
+            # For non-local providers, check API keys
+            if (
+                provider_name != "ollama"
+                and "api_key" in provider_config
+                and provider_config["api_key"]
+            ):
+                has_configured_provider = True
+                break
+            # For local providers like ollama, just check if it exists
+            elif provider_name == "ollama":
+                has_configured_provider = True
+                break
+
+        if not has_configured_provider:
+            logger.error(f"No providers with API keys configured for {mode} mode")
+            return {
+                "content": f"No API keys are configured for any providers in '{mode}' mode. Please add your API keys to credentials.json.",
+                "provider": "system",
+                "model": "none",
+            }
 
-            # Try each provider in strict order from credentials.json (queue)
-            for provider_name, provider_config in providers.items():
-                # Skip providers without API keys (except for ollama which is local)
-                if (
-                    provider_name != "ollama"
-                    and "api_key" in provider_config
-                    and not provider_config["api_key"]
-                ):
-                    logger.warning(f"Skipping {provider_name} - no API key provided")
-                    continue
+        return None
 
-                # Check if the provider has models defined
-                if "models" not in provider_config or not provider_config["models"]:
-                    logger.warning(f"No models defined for {provider_name} in {mode} mode")
-                    continue
+    def _provider_candidates(
+        self, mode: str, provider: Optional[str] = None, model: Optional[str] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """Yield (provider, model) pairs for a mode in credentials.json queue order.
 
-                # Try each model in strict order from credentials.json (queue)
-                for model_name in provider_config["models"]:
-                    try:
-                        logger.info(f"Trying {provider_name}/{model_name} for {mode} mode")
+        A pinned provider/model is tried first and the queue is only used as fallback.
+        With ADAPTIVE_ROUTING the queue is reordered by measured latency and success rate,
+        except providers with "pinned": true, which stay ahead in their configured order.
+        """
+        providers = self.credentials["modes"][mode]["providers"]
+
+        pinned = None
+        if provider and model:
+            if provider in providers:
+                pinned = (provider, model)
+                yield pinned
+            else:
+                logger.warning(f"Pinned provider {provider} is not configured for {mode} mode")
+
+        queue = self._queue_entries(mode, providers, pinned)
+        if Config.ADAPTIVE_ROUTING:
+            queue = list(queue)
+            fixed = [entry for entry in queue if providers[entry[0]].get("pinned")]
+            adaptive = [entry for entry in queue if not providers[entry[0]].get("pinned")]
+            queue = fixed + provider_scheduler.order(mode, adaptive)
+        yield from queue
+
+    def _queue_entries(
+        self, mode: str, providers: Dict[str, Any], pinned: Optional[Tuple[str, str]]
+    ) -> Iterator[Tuple[str, str]]:
+        """Yield the usable (provider, model) pairs of a mode's providers in configured order."""
+        for provider_name, provider_config in providers.items():
+            # Skip providers without API keys (except for ollama which is local)
+            if (
+                provider_name != "ollama"
+                and "api_key" in provider_config
+                and not provider_config["api_key"]
+            ):
+                logger.warning(f"Skipping {provider_name} - no API key provided")
+                continue
+
+            # Check if the provider has models defined
+            if "models" not in provider_config or not provider_config["models"]:
+                logger.warning(f"No models defined for {provider_name} in {mode} mode")
+                continue
+
+            # Try each model in strict order from credentials.json (queue)
+            for model_name in provider_config["models"]:
+                if (provider_name, model_name) != pinned:
+                    yield provider_name, model_name
+
+    def find_mode_for_model(self, provider: str, model: str) -> Optional[str]:
+        """Return the first mode whose configured providers list the given model."""
+        for mode in MODES:
+            if model in self.get_available_models(mode, provider):
+                return mode
+        return None
+
+    def _rate_limited(self, mode: str, provider_name: str, model_name: str) -> ContextManager[None]:
+        """Return a context manager that holds the provider/model rate limit slot for a call.
+
+        Limits come from the provider's "rate_limit" entry in credentials.json. A call that
+        cannot get a slot within RATE_LIMIT_MAX_WAIT raises RateLimitTimeout, and the
+        queue moves on to the next provider.
+        """
+        provider_config = (
+            self.credentials["modes"].get(mode, {}).get("providers", {}).get(provider_name, {})
+        )
+        return rate_limiter.limit(provider_name, model_name, provider_config)
+
+    def _provider_method(self, mode: str) -> Optional[Callable[..., Any]]:
+        """Return the apicenter method that generates content for a mode."""
+        if mode in MODES:
+            return getattr(self.api_center, mode)
+        return None
+
+    def _call_provider(self, mode: str, provider_name: str, model_name: str, prompt: Any) -> Any:
+        """Call the apicenter singleton method for a mode with one provider and model."""
+        logger.info(f"Trying {provider_name}/{model_name} for {mode} mode")
+
+        method = self._provider_method(mode)
+        if method is None:
+            return None
+        with self._rate_limited(mode, provider_name, model_name):
+            return method(provider=provider_name, model=model_name, prompt=prompt)
+
+    async def _call_provider_async(
+        self, mode: str, provider_name: str, model_name: str, prompt: Any
+    ) -> Any:
+        """Call a provider natively if its apicenter method is async, else in the executor."""
+        method = self._provider_method(mode)
+        if method is not None and inspect.iscoroutinefunction(method):
+            logger.info(f"Trying {provider_name}/{model_name} for {mode} mode")
+            # Waiting for a slot blocks, so it happens in the executor
+            limit = self._rate_limited(mode, provider_name, model_name)
+            await _run_blocking(limit.__enter__)
+            try:
+                return await method(provider=provider_name, model=model_name, prompt=prompt)
+            finally:
+                limit.__exit__(None, None, None)
+
+        return await _run_blocking(self._call_provider, mode, provider_name, model_name, prompt)
+
+    def _wrap_response(
+        self,
+        mode: str,
+        response: Any,
+        provider_name: str,
+        model_name: str,
+        attempts: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """Return a dictionary with the provider response, provider/model info and attempts."""
+        logger.info(f"Successfully processed with {provider_name}/{model_name}")
+
+        # For debugging
+        if mode == "image":
+            logger.info(f"Image response type: {type(response)}")
+            if isinstance(response, dict):
+                logger.info(f"Image response keys: {list(response.keys())}")
+                if "url" in response:
+                    logger.info(f"Image URL: {response['url']}")
+
+        if isinstance(response, dict):
+            # If response is already a dict, add provider/model info
+            response.update({"provider": provider_name, "model": model_name})
+        else:
+            # Wrap strings, bytes and any other type
+            response = {
+                "content": response,
+                "provider": provider_name,
+                "model": model_name,
+            }
 
-                        # Call the appropriate apicenter singleton method based on the mode
-                        response = None
-                        if mode == "text":
-                            response = self.api_center.text(
-                                provider=provider_name, model=model_name, prompt=prompt
-                            )
-                        elif mode == "image":
-                            response = self.api_center.image(
-                                provider=provider_name, model=model_name, prompt=prompt
-                            )
-                        elif mode == "audio":
-                            response = self.api_center.audio(
-                                provider=provider_name, model=model_name, prompt=prompt
-                            )
+        if attempts is not None:
+            response["attempts"] = attempts
+        return response
+
+    def _record_attempts(self, mode: str, attempts: List[Dict[str, Any]]) -> None:
+        """Feed the provider calls of a request to the adaptive scheduler, if it is enabled."""
+        if Config.ADAPTIVE_ROUTING:
+            provider_scheduler.record(mode, attempts)
+
+    async def _record_attempts_async(self, mode: str, attempts: List[Dict[str, Any]]) -> None:
+        """Async variant of _record_attempts, the database write runs in the executor."""
+        if Config.ADAPTIVE_ROUTING:
+            await _run_blocking(provider_scheduler.record, mode, attempts)
+
+    def _all_attempts_failed(
+        self, mode: str, errors: List[str], attempts: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Build the system response returned when every queue option has failed."""
+        error_details = "\n".join(errors)
+        logger.error(f"All attempts to process {mode} content failed:\n{error_details}")
+        return {
+            "content": f"Unable to process {mode} content. Please check your API keys in credentials.json.\n\nErrors:\n{error_details}",
+            "provider": "system",
+            "model": "none",
+            "attempts": attempts,
+        }
+
+    def _coalescing_key(
+        self, mode: str, prompt: Any, provider: Optional[str], model: Optional[str]
+    ) -> Optional[Tuple[Any, ...]]:
+        """Key identifying identical generations: mode, provider queue and cleaned content."""
+        if not Config.REQUEST_COALESCING or not isinstance(prompt, str):
+            return None
+
+        providers = self.credentials["modes"].get(mode, {}).get("providers", {})
+        queue = tuple(
+            (provider_name, tuple(provider_config.get("models", [])))
+            for provider_name, provider_config in providers.items()
+        )
+        return mode, provider, model, queue, prompt
+
+    def process_content(
+        self, mode: str, prompt: Any, provider: Optional[str] = None, model: Optional[str] = None
+    ) -> Any:
+        """Process content using provider queue and return response of appropriate type.
+
+        The prompt is a string, or for text a list of chat messages ending with the input.
+        If provider and model are given they are tried first, falling back to the queue.
+        Identical string prompts in flight at the same time share one provider call.
+        """
+        key = self._coalescing_key(mode, prompt, provider, model)
+        if key is None:
+            return self._process_content(mode, prompt, provider, model)
+        return generation_flights.do(key, self._process_content, mode, prompt, provider, model)
+
+    def _process_content(
+        self, mode: str, prompt: Any, provider: Optional[str] = None, model: Optional[str] = None
+    ) -> Any:
+        """Run the provider queue for one request, see process_content."""
+        try:
+            not_configured = self._check_mode_configured(mode)
+            if not_configured:
+                return not_configured
 
-                        # If we got a response, return it immediately without trying further options
-                        if response:
-                            logger.info(f"Successfully processed with {provider_name}/{model_name}")
-
-                            # For debugging
-                            if mode == "image":
-                                logger.info(f"Image response type: {type(response)}")
-                                if isinstance(response, dict):
-                                    logger.info(f"Image response keys: {list(response.keys())}")
-                                    if "url" in response:
-                                        logger.info(f"Image URL: {response['url']}")
-
-                            # Return a dictionary with the response and provider/model info
-                            if isinstance(response, (str, bytes)):
-                                return {
-                                    "content": response,
-                                    "provider": provider_name,
-                                    "model": model_name,
-                                }
-                            elif isinstance(response, dict):
-                                # If response is already a dict, add provider/model info
-                                response.update({"provider": provider_name, "model": model_name})
-                                return response
-                            else:
-                                # For any other type, wrap it
-                                return {
-                                    "content": response,
-                                    "provider": provider_name,
-                                    "model": model_name,
-                                }
-                    except Exception as e:
-                        error_msg = f"Error with {provider_name}/{model_name}: {e}"
-                        logger.warning(error_msg)
-                        errors.append(error_msg)
-                        # Continue to next model or provider in the queue
+            errors = []
+            attempts = []
+
+            # Try each provider and model in queue order (credentials.json, or adaptive)
+            for provider_name, model_name in self._provider_candidates(mode, provider, model):
+                start = time.perf_counter()
+                try:
+                    response = self._call_provider(mode, provider_name, model_name, prompt)
+
+                    # If we got a response, return it immediately without trying further options
+                    if response:
+                        attempts.append(
+                            attempt(provider_name, model_name, time.perf_counter() - start)
+                        )
+                        self._record_attempts(mode, attempts)
+                        return self._wrap_response(
+                            mode, response, provider_name, model_name, attempts
+                        )
+                    attempts.append(
+                        attempt(
+                            provider_name, model_name, time.perf_counter() - start, "Empty response"
+                        )
+                    )
+                except Exception as e:
+                    error_msg = f"Error with {provider_name}/{model_name}: {e}"
+                    logger.warning(error_msg)
+                    errors.append(error_msg)
+                    attempts.append(
+                        attempt(provider_name, model_name, time.perf_counter() - start, str(e))
+                    )
+                    # Continue to next model or provider in the queue
 
             # All queue options exhausted with no success
-            error_details = "\n".join(errors)
-            logger.error(f"All attempts to process {mode} content failed:\n{error_details}")
+            self._record_attempts(mode, attempts)
+            return self._all_attempts_failed(mode, errors, attempts)
+
+        except Exception as e:
+            logger.error(f"Error processing content: {e}")
             return {
-                "content": f"Unable to process {mode} content. Please check your API keys in credentials.json.\n\nErrors:\n{error_details}",
+                "content": f"Error processing {mode} content: {e}. Please check your configuration.",
                 "provider": "system",
                 "model": "none",
             }
 
+    async def process_content_async(
+        self, mode: str, prompt: Any, provider: Optional[str] = None, model: Optional[str] = None
+    ) -> Any:
+        """Async variant of process_content that awaits providers instead of blocking."""
+        key = self._coalescing_key(mode, prompt, provider, model)
+        if key is None:
+            return await self._process_content_async(mode, prompt, provider, model)
+        return await generation_flights.do_async(
+            key, self._process_content_async, mode, prompt, provider, model
+        )
+
+    async def _process_content_async(
+        self, mode: str, prompt: Any, provider: Optional[str] = None, model: Optional[str] = None
+    ) -> Any:
+        """Run the provider queue for one request without blocking, see process_content."""
+        try:
+            not_configured = self._check_mode_configured(mode)
+            if not_configured:
+                return not_configured
+
+            errors = []
+            attempts = []
+
+            for provider_name, model_name in self._provider_candidates(mode, provider, model):
+                start = time.perf_counter()
+                try:
+                    response = await self._call_provider_async(
+                        mode, provider_name, model_name, prompt
+                    )
+                    if response:
+                        attempts.append(
+                            attempt(provider_name, model_name, time.perf_counter() - start)
+                        )
+                        await self._record_attempts_async(mode, attempts)
+                        return self._wrap_response(
+                            mode, response, provider_name, model_name, attempts
+                        )
+                    attempts.append(
+                        attempt(
+                            provider_name, model_name, time.perf_counter() - start, "Empty response"
+                        )
+                    )
+                except Exception as e:
+                    error_msg = f"Error with {provider_name}/{model_name}: {e}"
+                    logger.warning(error_msg)
+                    errors.append(error_msg)
+                    attempts.append(
+                        attempt(provider_name, model_name, time.perf_counter() - start, str(e))
+                    )
+
+            await self._record_attempts_async(mode, attempts)
+            return self._all_attempts_failed(mode, errors, attempts)
+
         except Exception as e:
             logger.error(f"Error processing content: {e}")
             return {
@@ -513,6 +1129,120 @@ Examples:
                 "model": "none",
             }
 
+    def route(
+        self,
+        user_input: str,
+        mode: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        context: Optional[List[Dict[str, str]]] = None,
+    ) -> Tuple[str, str, Any]:
+        """Pick the mode and generate a response, returning (mode, cleaned_content, response).
+
+        A text mode pinned by the client, or implied by a pinned provider/model, skips the
+        classifier round-trip and the input is used as-is. Pinned image and audio inputs are
+        still cleaned by the classifier, so the request phrasing is not drawn or spoken,
+        but its mode is ignored. Text answers are generated with
+        the earlier turns in context (chat messages, oldest first) before the input.
+        Provider calls run in the calling thread, only speculative calls use the executor.
+        """
+        start = time.perf_counter()
+        if not mode and provider and model:
+            mode = self.find_mode_for_model(provider, model)
+
+        cached = None
+        if not mode and (Config.COMBINED_TEXT_MODE or Config.SPECULATIVE_TEXT):
+            # A known classification needs neither a combined call nor a speculative one
+            cached = self._cached_classification(user_input)
+
+        response_data = None
+        if mode == "text":
+            logger.info("Using explicit text mode, skipping classification")
+            route, cleaned_content = "pinned", user_input
+        elif mode:
+            logger.info(f"Using explicit {mode} mode, classifying only to clean the input")
+            route = "pinned"
+            _, cleaned_content = self.select_mode_and_clean_content(user_input)
+        elif cached:
+            route, (mode, cleaned_content) = "cached", cached
+        elif Config.COMBINED_TEXT_MODE:
+            # One text-provider call decides the mode and answers text requests directly
+            route = "combined"
+            mode, cleaned_content, response_data = self.classify_and_generate(user_input, context)
+        elif Config.SPECULATIVE_TEXT:
+            # Start the likely text answer while the classifier is still deciding
+            route = "speculative"
+            mode, cleaned_content, response_data = self.classify_with_speculation(
+                user_input, context
+            )
+        else:
+            route = "classifier"
+            mode, cleaned_content = self.select_mode_and_clean_content(user_input)
+        classify_seconds = time.perf_counter() - start
+
+        prompt = self._with_context(cleaned_content, context) if mode == "text" else cleaned_content
+        if response_data is None:
+            response_data = self.process_content(mode, prompt, provider, model)
+
+        attach_turn_metrics(
+            response_data, route, prompt, classify_seconds, time.perf_counter() - start
+        )
+        return mode, cleaned_content, response_data
+
+    async def route_async(
+        self,
+        user_input: str,
+        mode: Optional[str] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        context: Optional[List[Dict[str, str]]] = None,
+    ) -> Tuple[str, str, Any]:
+        """Async variant of route, blocking provider calls run in the provider executor."""
+        start = time.perf_counter()
+        if not mode and provider and model:
+            mode = self.find_mode_for_model(provider, model)
+
+        cached = None
+        if not mode and (Config.COMBINED_TEXT_MODE or Config.SPECULATIVE_TEXT):
+            # A known classification needs neither a combined call nor a speculative one
+            cached = self._cached_classification(user_input)
+
+        response_data = None
+        if mode == "text":
+            logger.info("Using explicit text mode, skipping classification")
+            route, cleaned_content = "pinned", user_input
+        elif mode:
+            logger.info(f"Using explicit {mode} mode, classifying only to clean the input")
+            route = "pinned"
+            _, cleaned_content = await self.select_mode_and_clean_content_async(user_input)
+        elif cached:
+            route, (mode, cleaned_content) = "cached", cached
+        elif Config.COMBINED_TEXT_MODE:
+            # One text-provider call decides the mode and answers text requests directly
+            route = "combined"
+            mode, cleaned_content, response_data = await self.classify_and_generate_async(
+                user_input, context
+            )
+        elif Config.SPECULATIVE_TEXT:
+            # Start the likely text answer while the classifier is still deciding
+            route = "speculative"
+            mode, cleaned_content, response_data = await self.classify_with_speculation_async(
+                user_input, context
+            )
+        else:
+            route = "classifier"
+            mode, cleaned_content = await self.select_mode_and_clean_content_async(user_input)
+        classify_seconds = time.perf_counter() - start
+
+        prompt = self._with_context(cleaned_content, context) if mode == "text" else cleaned_content
+        if response_data is None:
+            response_data = await self.process_content_async(mode, prompt, provider, model)
+
+        attach_turn_metrics(
+            response_data, route, prompt, classify_seconds, time.perf_counter() - start
+        )
+        return mode, cleaned_content, response_data
+
     def get_available_providers(self, mode: str) -> List[str]:
         """Get list of available providers for a specific mode."""
         try:
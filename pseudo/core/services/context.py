@@ -0,0 +1,205 @@
+"""Token-budgeted conversation context for text generation, with optional rolling summaries."""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pseudo.core.config import Config
+from pseudo.core.services import storage
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Rough bytes of UTF-8 text per token for common tokenizers
+BYTES_PER_TOKEN = 4
+
+# Tokens a chat format spends on the role and separators of each message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# First tail window read when walking back through a chat, doubled until the budget is full
+TAIL_WINDOW = 16
+
+# Rolling summary of turns older than the context window, stored in the chat directory
+SUMMARY_FILE = "summary.json"
+
+# Chats with a summary being written by this process
+_summarizing: Set[str] = set()
+_summarizing_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the tokens in a text from its UTF-8 length, without a tokenizer."""
+    return len(text.encode("utf-8")) // BYTES_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+
+def _turn(message: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """Convert a stored message to a provider chat message, None if it adds no context."""
+    if message.get("role") == "user" and isinstance(message.get("content"), str):
+        return {"role": "user", "content": message["content"]}
+
+    if message.get("role") != "assistant" or message.get("provider") == "system":
+        return None
+    if message.get("mode") in ("image", "audio"):
+        # The model cannot see media, so it gets what was asked for instead
+        request = message.get("cleaned_content") or message.get("original_input") or ""
+        return {"role": "assistant", "content": f"[Generated {message['mode']}: {request}]"}
+    if isinstance(message.get("content"), str):
+        return {"role": "assistant", "content": message["content"]}
+    return None
+
+
+def _walk_back(
+    chat_manager: Any, chat_id: str, budget: int, before: str = "", after: str = ""
+) -> Tuple[List[Dict[str, str]], Optional[str]]:
+    """Collect turns newest first while they fit in budget tokens.
+
+    Only messages timestamped from after (inclusive) up to before (exclusive) are used, if
+    they are set. Returns the turns, oldest first, and the timestamp of the oldest turn kept
+    if older turns did not fit, else None. The tail window read from disk doubles as it is
+    used up, so the work is O(budget) rather than O(chat length).
+    """
+    turns: List[Dict[str, str]] = []
+    used = 0
+    seen = 0
+    window = TAIL_WINDOW
+    oldest_kept = None
+
+    while True:
+        batch = chat_manager.tail_messages(chat_id, window)
+        for message in reversed(batch[: len(batch) - seen]):
+            timestamp = message.get("timestamp", "")
+            if after and timestamp < after:
+                return turns[::-1], None
+            if before and timestamp >= before:
+                continue
+
+            turn = _turn(message)
+            if turn is None:
+                continue
+            cost = estimate_tokens(turn["content"])
+            if used + cost > budget:
+                return turns[::-1], oldest_kept or timestamp
+            turns.append(turn)
+            used += cost
+            oldest_kept = timestamp
+
+        if len(batch) < window:
+            return turns[::-1], None
+        seen = len(batch)
+        window *= 2
+
+
+def load_summary(chat_manager: Any, chat_id: str) -> Optional[Dict[str, str]]:
+    """Return the chat's rolling summary, if any.
+
+    The summary is {"before": timestamp, "text": ...} and covers every message older than
+    the timestamp.
+    """
+    summary_file = chat_manager.base_dir / chat_id / SUMMARY_FILE
+    if not summary_file.exists():
+        return None
+    try:
+        return storage.read_file(summary_file)
+    except Exception as e:
+        logger.error(f"Error loading summary for {chat_id}: {e}")
+        return None
+
+
+def assemble_context(
+    chat_manager: Any, chat_id: str, budget: Optional[int] = None
+) -> Tuple[List[Dict[str, str]], Optional[str]]:
+    """Build the chat history to send before a new text prompt.
+
+    Args:
+        chat_manager: The ChatManager holding the chat
+        chat_id: The chat the prompt belongs to
+        budget: Token budget for the history, defaults to CONTEXT_TOKEN_BUDGET
+
+    Returns:
+        The provider chat messages, oldest first, and the timestamp before which turns
+        fell outside the budget without being summarized (None if nothing was dropped).
+    """
+    budget = Config.CONTEXT_TOKEN_BUDGET if budget is None else budget
+    if budget <= 0:
+        return [], None
+
+    summary = load_summary(chat_manager, chat_id) if Config.CONTEXT_SUMMARIES else None
+    context: List[Dict[str, str]] = []
+    after = ""
+    if summary and summary.get("text"):
+        content = f"Summary of the earlier conversation: {summary['text']}"
+        context.append({"role": "system", "content": content})
+        budget -= estimate_tokens(content)
+        after = summary.get("before", "")
+
+    turns, dropped_before = _walk_back(chat_manager, chat_id, budget, after=after)
+    return context + turns, dropped_before
+
+
+def summarize_in_background(router: Any, chat_manager: Any, chat_id: str) -> None:
+    """Fold the turns that no longer fit the context window into the chat's summary.
+
+    Runs at most once per chat at a time, in a daemon thread, so responses never wait on it.
+    """
+    with _summarizing_lock:
+        if chat_id in _summarizing:
+            return
+        _summarizing.add(chat_id)
+
+    def run() -> None:
+        try:
+            _update_summary(router, chat_manager, chat_id)
+        except Exception as e:
+            logger.error(f"Error summarizing chat {chat_id}: {e}")
+        finally:
+            with _summarizing_lock:
+                _summarizing.discard(chat_id)
+
+    threading.Thread(target=run, name="context-summary", daemon=True).start()
+
+
+def _update_summary(router: Any, chat_manager: Any, chat_id: str) -> None:
+    """Summarize all but the newest half budget of turns into the chat's summary.
+
+    Leaving half the budget free means the next several turns fit without a new summary.
+    """
+    from pseudo.core.prompts import load_prompt
+
+    _, before = _walk_back(chat_manager, chat_id, Config.CONTEXT_TOKEN_BUDGET // 2)
+    if before is None:
+        return
+
+    summary = load_summary(chat_manager, chat_id) or {"before": "", "text": ""}
+    # Turns beyond one budget of unsummarized history are dropped rather than read
+    turns, _ = _walk_back(
+        chat_manager,
+        chat_id,
+        Config.CONTEXT_TOKEN_BUDGET,
+        before=before,
+        after=summary["before"],
+    )
+    if not turns:
+        return
+
+    transcript = "\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+    if summary["text"]:
+        transcript = f"Previous summary: {summary['text']}\n\n{transcript}"
+    response = router.process_content(
+        "text",
+        [
+            {"role": "system", "content": load_prompt("summarize")},
+            {"role": "user", "content": transcript},
+        ],
+    )
+
+    if not isinstance(response, dict) or response.get("provider") == "system":
+        logger.warning(f"Could not summarize chat {chat_id}")
+        return
+    text = response.get("content")
+    if not isinstance(text, str) or not text.strip():
+        return
+
+    storage.write_file(
+        chat_manager.base_dir / chat_id / SUMMARY_FILE, {"before": before, "text": text.strip()}
+    )
+    logger.info(f"Updated the context summary of chat {chat_id}")
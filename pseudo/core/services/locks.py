@@ -0,0 +1,183 @@
+"""Locks on the chat history shared by every process and node serving the same directory."""
+
+import logging
+import os
+import re
+import socket
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, Set, Tuple
+
+from pseudo.core.config import Config
+
+try:
+    import fcntl
+except ImportError:  #  Windows, locks then only cover one process
+    fcntl = None
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Directory under CHAT_HISTORY_DIR holding the lock files, hidden from directory scans
+LOCK_DIR = ".locks"
+
+# Chats share this many lock files, so the lock directory never grows with the chats
+CHAT_LOCK_STRIPES = 64
+
+# Sleep between attempts while another node holds a file lock
+POLL_INTERVAL = 0.01
+
+
+class LockTimeout(Exception):
+    """Raised when a chat history lock cannot be acquired within LOCK_TIMEOUT."""
+
+
+@lru_cache(maxsize=None)
+def node_id() -> str:
+    """Return this server's name for lock and temporary files, NODE_ID or the hostname."""
+    # Only letters, digits and underscores, so the name can be parsed back out of file names
+    return re.sub(r"[^A-Za-z0-9_]", "_", Config.NODE_ID or socket.gethostname())
+
+
+class FileLocks:
+    """POSIX record locks on files under LOCK_DIR.
+
+    NFS (v4, or v3 with lockd) and SMB forward these locks to the file server, so they hold
+    across nodes sharing the directory. The kernel releases them when a process dies.
+    """
+
+    def __init__(self, base_dir: Path) -> None:
+        """Initialize the locks for a chat history directory."""
+        self.lock_dir = Path(base_dir) / LOCK_DIR
+
+    @contextmanager
+    def acquire(self, name: str, timeout: float) -> Iterator[None]:
+        """Hold the named lock, raising LockTimeout if it stays taken for timeout seconds."""
+        if fcntl is None:
+            yield
+            return
+
+        self.lock_dir.mkdir(exist_ok=True)
+        fd = os.open(self.lock_dir / f"{name}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise LockTimeout(f"Timed out waiting for the {name} lock")
+                    time.sleep(POLL_INTERVAL)
+            yield
+        finally:
+            # Closing the descriptor releases the lock
+            os.close(fd)
+
+
+class RedisLocks:
+    """Locks held as Redis keys, for shared filesystems that do not forward file locks.
+
+    A lock expires after LOCK_LEASE_SECONDS, so a crashed node cannot hold it forever.
+    """
+
+    def __init__(self, url: str) -> None:
+        """Initialize the locks with a client for the Redis server at url."""
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._lock_error = redis.exceptions.LockError
+
+    @contextmanager
+    def acquire(self, name: str, timeout: float) -> Iterator[None]:
+        """Hold the named lock, raising LockTimeout if it stays taken for timeout seconds."""
+        lock = self._client.lock(
+            f"pseudo:lock:{name}", timeout=Config.LOCK_LEASE_SECONDS, blocking_timeout=timeout
+        )
+        if not lock.acquire():
+            raise LockTimeout(f"Timed out waiting for the {name} lock")
+        try:
+            yield
+        finally:
+            try:
+                lock.release()
+            except self._lock_error:
+                logger.warning(f"The {name} lock expired before it was released")
+
+
+class LockManager:
+    """Hands out chat history locks, re-entrant within a thread.
+
+    The backend only orders processes and nodes, so a lock is also held in-process, which
+    keeps two threads of one process out of each other's way.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the manager, backends are created on first use."""
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._guards: Dict[Tuple[str, str], threading.Lock] = {}
+        self._backends: Dict[str, Any] = {}
+
+    def _guard(self, key: Tuple[str, str]) -> threading.Lock:
+        """Return the in-process lock for a (directory, name) pair."""
+        with self._lock:
+            # A fork can copy a lock held by another thread, the child starts afresh
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._guards = {}
+                self._backends = {}
+            return self._guards.setdefault(key, threading.Lock())
+
+    def _backend(self, base_dir: str) -> Any:
+        """Return the LOCK_BACKEND locks for a chat history directory."""
+        with self._lock:
+            if base_dir not in self._backends:
+                if Config.LOCK_BACKEND == "redis":
+                    self._backends[base_dir] = RedisLocks(Config.REDIS_URL)
+                else:
+                    self._backends[base_dir] = FileLocks(Path(base_dir))
+            return self._backends[base_dir]
+
+    @contextmanager
+    def hold(self, base_dir: Path, name: str) -> Iterator[None]:
+        """Hold the named lock of a chat history directory for the duration of the block."""
+        key = (str(base_dir), name)
+        held: Set[Tuple[str, str]] = self._local.__dict__.setdefault("held", set())
+        if key in held:
+            yield
+            return
+
+        guard = self._guard(key)
+        if not guard.acquire(timeout=Config.LOCK_TIMEOUT):
+            raise LockTimeout(f"Timed out waiting for the {name} lock")
+        held.add(key)
+        try:
+            with self._backend(key[0]).acquire(name, Config.LOCK_TIMEOUT):
+                yield
+        finally:
+            held.discard(key)
+            guard.release()
+
+
+# Process-wide lock manager shared by all chat managers
+lock_manager = LockManager()
+
+
+def history_lock(base_dir: Path) -> ContextManager[None]:
+    """Hold the lock serializing read-modify-write cycles of history.json."""
+    return lock_manager.hold(base_dir, "history")
+
+
+def chat_lock(base_dir: Path, chat_id: str) -> ContextManager[None]:
+    """Hold the lock for one chat's files, shared with the chats in the same stripe.
+
+    Take it before the history lock, never after, so two locks are always taken in one order.
+    """
+    stripe = zlib.crc32(chat_id.encode()) % CHAT_LOCK_STRIPES
+    return lock_manager.hold(base_dir, f"chat-{stripe}")
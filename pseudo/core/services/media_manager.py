@@ -3,7 +3,6 @@
 import os
 import uuid
 import logging
-import requests
 from pathlib import Path
 from typing import Union, Dict, Any, Optional
 
@@ -50,6 +49,8 @@ class MediaManager:
             # Handle different content types for storage
             if isinstance(content, str) and content.startswith("http"):
                 # Content is a URL - download it
+                import requests
+
                 response = requests.get(content, timeout=30)
                 response.raise_for_status()
                 with open(target_path, "wb") as f:
@@ -60,6 +61,8 @@ class MediaManager:
                     f.write(content)
             elif isinstance(content, dict) and "url" in content:
                 # Content is a dict with URL - download from the URL
+                import requests
+
                 response = requests.get(content["url"], timeout=30)
                 response.raise_for_status()
                 with open(target_path, "wb") as f:
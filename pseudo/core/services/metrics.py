@@ -0,0 +1,220 @@
+"""Latency and attempt accounting for chat turns, and its aggregation over the chat history."""
+
+import logging
+import math
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pseudo.core.services import storage
+from pseudo.core.services.context import estimate_tokens
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Latency percentiles reported by aggregate
+PERCENTILES = (50, 90, 99)
+
+# Longest provider error kept in an attempt record
+MAX_ERROR_CHARS = 200
+
+
+def attempt(
+    provider: str, model: str, seconds: float, error: Optional[str] = None
+) -> Dict[str, Any]:
+    """Return the record of one provider call, failed if error is given."""
+    record = {"provider": provider, "model": model, "ms": round(seconds * 1000, 1), "ok": not error}
+    if error:
+        record["error"] = error[:MAX_ERROR_CHARS]
+    return record
+
+
+def _prompt_text(prompt: Any) -> str:
+    """Return the text of a string prompt or of a list of chat messages."""
+    if isinstance(prompt, list):
+        return "\n".join(str(message.get("content", "")) for message in prompt)
+    return prompt if isinstance(prompt, str) else ""
+
+
+def attach_turn_metrics(
+    response: Any, route: str, prompt: Any, classify_seconds: float, total_seconds: float
+) -> None:
+    """Replace the provider attempts on a response with the metrics of the whole turn.
+
+    route is how the mode was decided: pinned, cached, combined, speculative, classifier
+    or batch. A response shared from an identical in-flight generation has no attempts of
+    its own and is marked coalesced.
+    Token counts are estimated from text length, providers do not report them uniformly.
+    """
+    if not isinstance(response, dict):
+        return
+
+    attempts = response.pop("attempts", [])
+    metrics = {
+        "route": route,
+        "classify_ms": round(classify_seconds * 1000, 1),
+        "total_ms": round(total_seconds * 1000, 1),
+        "attempts": attempts,
+        "fallbacks": sum(1 for record in attempts if not record["ok"]),
+    }
+    if response.pop("coalesced", False):
+        metrics["coalesced"] = True
+    if isinstance(response.get("content"), str):
+        metrics["estimated_tokens"] = {
+            "input": estimate_tokens(_prompt_text(prompt)),
+            "output": estimate_tokens(response["content"]),
+        }
+    response["metrics"] = metrics
+
+
+def iter_turn_metrics(base_dir: Path, since: str = "") -> Iterator[Dict[str, Any]]:
+    """Yield every assistant message with metrics, timestamped at or after since.
+
+    Only lines mentioning metrics are decoded. Archived chats and chats whose messages
+    predate the message log have no metrics and are skipped.
+    """
+    from pseudo.core.services.chat_history import MESSAGES_FILE
+
+    for name in os.listdir(base_dir):
+        messages_file = Path(base_dir) / name / MESSAGES_FILE
+        if name.startswith(".") or not messages_file.is_file():
+            continue
+
+        try:
+            with open(messages_file, "rb") as f:
+                for line in f:
+                    if b'"metrics"' not in line:
+                        continue
+                    try:
+                        message = storage.loads(line)
+                    except ValueError:
+                        continue
+                    if message.get("timestamp", "") >= since and message.get("metrics"):
+                        yield message
+        except OSError as e:
+            logger.error(f"Error reading metrics of chat {name}: {e}")
+
+
+def since_days(days: Optional[float]) -> str:
+    """Return the ISO time days ago, comparable with message timestamps, or "" for all time."""
+    if not days:
+        return ""
+    return (datetime.now() - timedelta(days=days)).isoformat()
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    """Return nearest-rank percentiles of the values, None for each if there are none."""
+    values = sorted(values)
+    return {
+        f"p{p}": values[max(0, math.ceil(p / 100 * len(values)) - 1)] if values else None
+        for p in PERCENTILES
+    }
+
+
+def aggregate(base_dir: Path, since: str = "") -> Dict[str, Any]:
+    """Summarize turn latency and provider attempts across the chat history.
+
+    Args:
+        base_dir: The chat history directory
+        since: Only count turns timestamped at or after this ISO time
+
+    Returns:
+        Dict: Per mode, the turn count, failure and fallback rates and total latency
+        percentiles. Per mode/provider/model, the attempt count, failure rate and latency
+        percentiles of successful calls, fastest median first. Turns that shared another
+        turn's generation are only counted as coalesced, they made no provider call.
+    """
+    modes: Dict[str, Dict[str, Any]] = {}
+    providers: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    coalesced = 0
+
+    for message in iter_turn_metrics(base_dir, since):
+        metrics = message["metrics"]
+        if metrics.get("coalesced"):
+            coalesced += 1
+            continue
+        mode = message.get("mode", "text")
+        turns = modes.setdefault(mode, {"turns": 0, "failures": 0, "fallbacks": 0, "ms": []})
+        turns["turns"] += 1
+        turns["failures"] += message.get("provider") == "system"
+        turns["fallbacks"] += metrics.get("fallbacks", 0) > 0
+        turns["ms"].append(metrics.get("total_ms", 0))
+
+        for record in metrics.get("attempts", []):
+            key = (mode, record["provider"], record["model"])
+            entry = providers.setdefault(key, {"attempts": 0, "failures": 0, "ms": []})
+            entry["attempts"] += 1
+            if record["ok"]:
+                entry["ms"].append(record["ms"])
+            else:
+                entry["failures"] += 1
+
+    provider_rows = []
+    for (mode, provider, model), entry in providers.items():
+        provider_rows.append(
+            {
+                "mode": mode,
+                "provider": provider,
+                "model": model,
+                "attempts": entry["attempts"],
+                "failures": entry["failures"],
+                "failure_rate": entry["failures"] / entry["attempts"],
+                "latency_ms": _percentiles(entry["ms"]),
+            }
+        )
+    provider_rows.sort(
+        key=lambda row: (row["mode"], row["latency_ms"]["p50"] is None, row["latency_ms"]["p50"])
+    )
+
+    return {
+        "since": since or None,
+        "turns": sum(turns["turns"] for turns in modes.values()),
+        "coalesced": coalesced,
+        "modes": {
+            mode: {
+                "turns": turns["turns"],
+                "failure_rate": turns["failures"] / turns["turns"],
+                "fallback_rate": turns["fallbacks"] / turns["turns"],
+                "total_ms": _percentiles(turns["ms"]),
+            }
+            for mode, turns in sorted(modes.items())
+        },
+        "providers": provider_rows,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render an aggregate report as plain-text tables for the command line."""
+
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.0f}"
+
+    lines = [f"{report['turns']} turns" + (f" since {report['since']}" if report["since"] else "")]
+    if report.get("coalesced"):
+        lines[0] += f", {report['coalesced']} more shared an identical generation"
+    lines.append("")
+    lines.append(
+        f"{'mode':<6} {'turns':>6} {'failed':>7} {'fallback':>9} {'p50 ms':>8} "
+        f"{'p90 ms':>8} {'p99 ms':>8}"
+    )
+    for mode, row in report["modes"].items():
+        lines.append(
+            f"{mode:<6} {row['turns']:>6} {row['failure_rate']:>7.1%} {row['fallback_rate']:>9.1%} "
+            f"{ms(row['total_ms']['p50']):>8} {ms(row['total_ms']['p90']):>8} "
+            f"{ms(row['total_ms']['p99']):>8}"
+        )
+
+    lines.append("")
+    lines.append(
+        f"{'mode':<6} {'provider/model':<40} {'calls':>6} {'failed':>7} {'p50 ms':>8} "
+        f"{'p90 ms':>8} {'p99 ms':>8}"
+    )
+    for row in report["providers"]:
+        name = f"{row['provider']}/{row['model']}"
+        lines.append(
+            f"{row['mode']:<6} {name:<40} {row['attempts']:>6} {row['failure_rate']:>7.1%} "
+            f"{ms(row['latency_ms']['p50']):>8} {ms(row['latency_ms']['p90']):>8} "
+            f"{ms(row['latency_ms']['p99']):>8}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,218 @@
+"""Per provider/model rate limiting and concurrency caps shared across worker processes."""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, Optional, Union
+
+from pseudo.core.config import Config
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Longest sleep between checks while waiting for a concurrency slot
+POLL_INTERVAL = 0.05
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a provider slot cannot be acquired before the deadline."""
+
+
+def get_limits(provider_config: Dict[str, Any], model: str) -> Optional[Dict[str, float]]:
+    """Return the rate limit settings for a model from its provider's credentials entry.
+
+    A provider entry may contain, for example:
+        "rate_limit": {"requests_per_minute": 60, "burst": 10, "max_concurrent": 4,
+                       "models": {"dall-e-3": {"requests_per_minute": 5}}}
+    Model entries override the provider values. Returns None when nothing is limited.
+    """
+    settings = provider_config.get("rate_limit")
+    if not settings:
+        return None
+
+    limits = {key: value for key, value in settings.items() if key != "models"}
+    limits.update(settings.get("models", {}).get(model, {}))
+
+    rate = float(limits.get("requests_per_minute", 0)) / 60
+    max_concurrent = int(limits.get("max_concurrent", 0))
+    if rate <= 0 and max_concurrent <= 0:
+        return None
+
+    return {
+        "rate": rate,  #  Tokens added per second, 0 means no rate limit
+        "burst": float(limits.get("burst", max(1.0, rate * 60))),
+        "max_concurrent": max_concurrent,  #  0 means no concurrency cap
+    }
+
+
+class RateLimiter:
+    """Token buckets and in-flight leases per (provider, model) stored in SQLite.
+
+    Every worker process opens the same database, and each check runs in an immediate
+    transaction, so the limits hold for the whole server and not per process. Leases
+    expire after RATE_LIMIT_LEASE_SECONDS, so a crashed worker cannot hold a slot forever.
+    """
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None) -> None:
+        """Initialize the limiter, the database is opened on first use."""
+        self.db_path = Path(
+            db_path or Config.RATE_LIMIT_DB or Path(Config.RUNTIME_DIR) / ".rate_limits.db"
+        )
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, creating the schema on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+        connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS leases (id TEXT PRIMARY KEY, key TEXT, expires REAL)"
+        )
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    def _try_acquire(self, key: str, limits: Dict[str, float]) -> Union[str, float]:
+        """Take a token and a concurrency slot, returning a lease id or seconds to wait.
+
+        The lease id is empty when the model has no concurrency cap.
+        """
+        connection = self._connection()
+        now = time.time()
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM leases WHERE expires < ?", (now,))
+
+            if limits["max_concurrent"]:
+                (in_flight,) = connection.execute(
+                    "SELECT COUNT(*) FROM leases WHERE key = ?", (key,)
+                ).fetchone()
+                if in_flight >= limits["max_concurrent"]:
+                    connection.execute("COMMIT")
+                    return POLL_INTERVAL
+
+            if limits["rate"]:
+                row = connection.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens = limits["burst"]
+                if row:
+                    tokens = min(limits["burst"], row[0] + (now - row[1]) * limits["rate"])
+                if tokens < 1:
+                    connection.execute("COMMIT")
+                    return (1 - tokens) / limits["rate"]
+                connection.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                    (key, tokens - 1, now),
+                )
+
+            # Without a concurrency cap there is no slot to hold, only the token
+            lease_id = ""
+            if limits["max_concurrent"]:
+                lease_id = uuid.uuid4().hex
+                connection.execute(
+                    "INSERT INTO leases (id, key, expires) VALUES (?, ?, ?)",
+                    (lease_id, key, now + Config.RATE_LIMIT_LEASE_SECONDS),
+                )
+            connection.execute("COMMIT")
+            return lease_id
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def acquire(self, provider: str, model: str, limits: Dict[str, float], timeout: float) -> str:
+        """Wait in line for a slot for provider/model and return its lease id.
+
+        Raises RateLimitTimeout if the slot would not be free within timeout seconds.
+        """
+        key = f"{provider}/{model}"
+        deadline = time.monotonic() + timeout
+        waited = False
+
+        while True:
+            result = self._try_acquire(key, limits)
+            if isinstance(result, str):
+                if waited:
+                    logger.info(f"Acquired {key} slot after queueing")
+                return result
+
+            remaining = deadline - time.monotonic()
+            if result > remaining:
+                raise RateLimitTimeout(f"{key} is rate limited, no slot within {timeout:g}s")
+            waited = True
+            time.sleep(min(result, POLL_INTERVAL) if limits["max_concurrent"] else result)
+
+    def available(self, provider: str, model: str, provider_config: Dict[str, Any]) -> bool:
+        """Return whether a call to provider/model would get a slot now, without taking it."""
+        limits = get_limits(provider_config, model)
+        if limits is None:
+            return True
+
+        key = f"{provider}/{model}"
+        now = time.time()
+        try:
+            connection = self._connection()
+            if limits["max_concurrent"]:
+                (in_flight,) = connection.execute(
+                    "SELECT COUNT(*) FROM leases WHERE key = ? AND expires >= ?", (key, now)
+                ).fetchone()
+                if in_flight >= limits["max_concurrent"]:
+                    return False
+
+            if limits["rate"]:
+                row = connection.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                if row and min(limits["burst"], row[0] + (now - row[1]) * limits["rate"]) < 1:
+                    return False
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading rate limit state of {key}: {e}")
+        return True
+
+    def release(self, lease_id: str) -> None:
+        """Free the concurrency slot held by a lease."""
+        if lease_id:
+            self._connection().execute("DELETE FROM leases WHERE id = ?", (lease_id,))
+
+    @contextmanager
+    def slot(
+        self, provider: str, model: str, limits: Dict[str, float], timeout: float
+    ) -> Iterator[None]:
+        """Hold a provider/model slot for the duration of a provider call."""
+        lease_id = self.acquire(provider, model, limits, timeout)
+        try:
+            yield
+        finally:
+            self.release(lease_id)
+
+    def limit(
+        self,
+        provider: str,
+        model: str,
+        provider_config: Dict[str, Any],
+        timeout: Optional[float] = None,
+    ) -> ContextManager[None]:
+        """Return a context manager that limits one call, or a no-op if nothing is configured."""
+        limits = get_limits(provider_config, model)
+        if limits is None:
+            return nullcontext()
+        if timeout is None:
+            timeout = Config.RATE_LIMIT_MAX_WAIT
+        return self.slot(provider, model, limits, timeout)
+
+
+# Process-wide limiter shared by all routers
+rate_limiter = RateLimiter()
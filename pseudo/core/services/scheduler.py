@@ -0,0 +1,197 @@
+"""Adaptive provider queue ordering from measured latency and success rate."""
+
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from pseudo.core.config import Config
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Seconds a process reuses the statistics it read for a mode before reading them again
+REFRESH_INTERVAL = 1.0
+
+# Lowest success rate used when scoring, so an entry that always fails still has a finite score
+MIN_SUCCESS_RATE = 0.01
+
+
+def _score(row: Dict[str, Any]) -> float:
+    """Return the expected milliseconds until a successful call, lower is better."""
+    if row["latency_ms"] is None:
+        return float("inf")
+    return row["latency_ms"] / max(row["success_rate"], MIN_SUCCESS_RATE)
+
+
+class ProviderScheduler:
+    """Rolling latency and success rate per (mode, provider, model) stored in SQLite.
+
+    Each call updates exponentially weighted averages (weight ADAPTIVE_EWMA_ALPHA for the
+    newest call) in a database every worker on the host shares, so the learned order is the
+    same in all workers and survives restarts. Latency is only averaged over successful calls.
+    Errors are logged and leave the queue in credentials.json order.
+    """
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None) -> None:
+        """Initialize the scheduler, the database is opened on first use."""
+        self.db_path = Path(
+            db_path
+            or Config.ADAPTIVE_ROUTING_DB
+            or Path(Config.RUNTIME_DIR) / ".adaptive_routing.db"
+        )
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Tuple[float, Dict[Tuple[str, str], Dict[str, Any]]]] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, creating the schema on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+        connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS provider_stats (mode TEXT, provider TEXT, model TEXT, "
+            "latency_ms REAL, success_rate REAL, calls INTEGER, updated REAL, "
+            "PRIMARY KEY (mode, provider, model))"
+        )
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    def _mode_stats(self, mode: str) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Return the statistics of a mode's provider/models, read at most once a second."""
+        with self._lock:
+            cached = self._stats.get(mode)
+        if cached and time.monotonic() - cached[0] < REFRESH_INTERVAL:
+            return cached[1]
+
+        rows = (
+            self._connection()
+            .execute(
+                "SELECT provider, model, latency_ms, success_rate, calls FROM provider_stats "
+                "WHERE mode = ?",
+                (mode,),
+            )
+            .fetchall()
+        )
+        stats = {
+            (provider, model): {"latency_ms": latency_ms, "success_rate": success, "calls": calls}
+            for provider, model, latency_ms, success, calls in rows
+        }
+        with self._lock:
+            self._stats[mode] = (time.monotonic(), stats)
+        return stats
+
+    def order(self, mode: str, queue: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """Return the queue ordered by expected time to a successful call.
+
+        Entries without calls yet follow the measured ones in credentials.json order, so the
+        order only changes once there is data, and entries that never succeeded come last.
+        With probability ADAPTIVE_EXPLORATION a random other entry is tried first, so entries
+        further down keep being measured. An exploring request costs at most one extra call.
+        """
+        if len(queue) < 2:
+            return queue
+
+        try:
+            stats = self._mode_stats(mode)
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading provider statistics, using queue order: {e}")
+            return queue
+
+        def rank(entry: Tuple[str, str]) -> Tuple[int, float]:
+            if entry not in stats:
+                return 1, 0.0
+            score = _score(stats[entry])
+            return (0, score) if score != float("inf") else (2, 0.0)
+
+        # The sort is stable, so ties keep their credentials.json order
+        ordered = sorted(queue, key=rank)
+
+        if random.random() < Config.ADAPTIVE_EXPLORATION:
+            explored = random.choice(ordered[1:])
+            ordered.remove(explored)
+            ordered.insert(0, explored)
+            logger.info(f"Exploring {explored[0]}/{explored[1]} first for {mode} mode")
+        return ordered
+
+    def record(self, mode: str, attempts: List[Dict[str, Any]]) -> None:
+        """Fold the attempts of one request into the rolling statistics."""
+        if not attempts:
+            return
+
+        alpha = Config.ADAPTIVE_EWMA_ALPHA
+        now = time.time()
+        try:
+            connection = self._connection()
+            for attempt in attempts:
+                ok = 1.0 if attempt["ok"] else 0.0
+                latency_ms = attempt["ms"] if attempt["ok"] else None
+                # A first call sets the averages, later calls move them by alpha
+                connection.execute(
+                    "INSERT INTO provider_stats (mode, provider, model, latency_ms, success_rate, "
+                    "calls, updated) VALUES (?1, ?2, ?3, ?4, ?5, 1, ?6) "
+                    "ON CONFLICT (mode, provider, model) DO UPDATE SET "
+                    "latency_ms = CASE WHEN ?4 IS NULL THEN latency_ms "
+                    "WHEN latency_ms IS NULL THEN ?4 ELSE latency_ms + ?7 * (?4 - latency_ms) END, "
+                    "success_rate = success_rate + ?7 * (?5 - success_rate), "
+                    "calls = calls + 1, updated = ?6",
+                    (mode, attempt["provider"], attempt["model"], latency_ms, ok, now, alpha),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Error recording provider statistics: {e}")
+            return
+
+        with self._lock:
+            self._stats.pop(mode, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the statistics and current order (without exploration) per mode."""
+        try:
+            rows = (
+                self._connection()
+                .execute(
+                    "SELECT mode, provider, model, latency_ms, success_rate, calls, updated "
+                    "FROM provider_stats"
+                )
+                .fetchall()
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading provider statistics: {e}")
+            rows = []
+
+        modes: Dict[str, List[Dict[str, Any]]] = {}
+        for mode, provider, model, latency_ms, success, calls, updated in rows:
+            modes.setdefault(mode, []).append(
+                {
+                    "provider": provider,
+                    "model": model,
+                    "latency_ms": latency_ms,
+                    "success_rate": success,
+                    "calls": calls,
+                    "updated": updated,
+                }
+            )
+        for entries in modes.values():
+            entries.sort(key=_score)
+            for entry in entries:
+                score = _score(entry)
+                entry["expected_ms"] = None if score == float("inf") else round(score, 1)
+
+        return {
+            "enabled": Config.ADAPTIVE_ROUTING,
+            "exploration": Config.ADAPTIVE_EXPLORATION,
+            "modes": modes,
+        }
+
+
+# Process-wide scheduler shared by all routers
+provider_scheduler = ProviderScheduler()
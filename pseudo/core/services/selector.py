@@ -0,0 +1,120 @@
+"""Keeps the local Ollama selector model loaded and reports whether it is ready."""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from pseudo.core.config import Config
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Selector lifecycle states
+DISABLED = "disabled"
+LOADING = "loading"
+READY = "ready"
+ERROR = "error"
+
+
+class SelectorManager:
+    """Preloads the selector model in Ollama, pings it on a schedule and tracks readiness.
+
+    While the selector is loading or unreachable, classification is routed to the
+    lighter fallback selector (if configured) or the credentials queue.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the manager from the SELECTOR_* settings."""
+        self.enabled = Config.SELECTOR_ENABLED
+        self.model = f"{Config.SELECTOR_MODEL}:{Config.SELECTOR_MODEL_TAG}"
+        self.fallback_model = Config.SELECTOR_FALLBACK_MODEL or None
+        self.state = LOADING if self.enabled else DISABLED
+        self.last_ping: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def ensure_started(self) -> None:
+        """Start the keep-alive thread once per process, including after a fork."""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            # Threads do not survive fork, so a forked worker starts its own
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.state = LOADING
+            self._thread = threading.Thread(
+                target=self._run, name="selector-keep-alive", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Load the selector, then ping it every SELECTOR_PING_INTERVAL seconds."""
+        while True:
+            self._ping()
+            # Retry sooner while the model is not loaded
+            interval = Config.SELECTOR_PING_INTERVAL if self.state == READY else 10
+            time.sleep(interval)
+
+    def _ping(self) -> None:
+        """Ask Ollama to load the selector (a no-op if loaded) and extend its keep-alive."""
+        import requests
+
+        start = time.perf_counter()
+        try:
+            # A generate request without a prompt only loads the model
+            response = requests.post(
+                f"{Config.OLLAMA_HOST.rstrip('/')}/api/generate",
+                json={"model": self.model, "keep_alive": Config.SELECTOR_KEEP_ALIVE},
+                timeout=Config.SELECTOR_LOAD_TIMEOUT,
+            )
+            response.raise_for_status()
+        except Exception as e:
+            if self.state != ERROR:
+                logger.warning(f"Selector model {self.model} is not available: {e}")
+            self.state = ERROR
+            self.last_error = str(e)
+            return
+
+        if self.state != READY:
+            self.load_seconds = round(time.perf_counter() - start, 3)
+            logger.info(f"Selector model {self.model} loaded in {self.load_seconds}s")
+        self.state = READY
+        self.last_error = None
+        self.last_ping = datetime.now().isoformat()
+
+    def candidate(self) -> Optional[Tuple[str, str]]:
+        """Return the Ollama (provider, model) to classify with first, or None."""
+        if not self.enabled:
+            return None
+
+        self.ensure_started()
+        if self.state == READY:
+            return "ollama", self.model
+        if self.fallback_model:
+            return "ollama", self.fallback_model
+        return None
+
+    def status(self) -> Dict[str, Any]:
+        """Return the selector state for the health endpoint."""
+        return {
+            "state": self.state,
+            "ready": self.state == READY,
+            "model": self.model,
+            "fallback_model": self.fallback_model,
+            "last_ping": self.last_ping,
+            "last_error": self.last_error,
+            "load_seconds": self.load_seconds,
+        }
+
+
+# Process-wide selector shared by all routers
+selector_manager = SelectorManager()
@@ -0,0 +1,162 @@
+"""Cache shared through SQLite by every worker process on a host."""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from pseudo.core.config import Config
+from pseudo.core.services import storage
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Bytes of the database file mapped into each process, so reads skip the read() copies
+MMAP_SIZE = 64 * 1024 * 1024
+
+# An entry's last use is only rewritten when older than this, so hits are mostly reads
+TOUCH_INTERVAL = 60.0
+
+# Writes between evictions of least recently used entries
+EVICT_EVERY = 100
+
+
+def cache_key(text: str) -> str:
+    """Return a short fixed-length key for arbitrary text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SharedCache:
+    """Namespaced key-value entries in a SQLite database used by all workers.
+
+    Every worker opens the same WAL-mode database, so an entry one worker computes is a hit
+    in all others and the data is held once, in the page cache, rather than per process.
+    An entry can carry a validator (e.g. a file's mtime and size), and is a miss when the
+    caller's validator differs. Each namespace keeps its SHARED_CACHE_MAX_ENTRIES most
+    recently used entries. Errors are logged and treated as misses.
+    """
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None) -> None:
+        """Initialize the cache, the database is opened on first use."""
+        self.db_path = Path(
+            db_path or Config.SHARED_CACHE_DB or Path(Config.RUNTIME_DIR) / ".shared_cache.db"
+        )
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, creating the schema on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+        connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")  #  A lost cache entry is recomputed
+        connection.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries (namespace TEXT, key TEXT, validator TEXT, "
+            "value BLOB, used REAL, PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (namespace, used)")
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    def _count(self, namespace: str, outcome: str) -> None:
+        """Count a hit or miss for a namespace in this process."""
+        with self._lock:
+            counters = self._counters.setdefault(namespace, {"hits": 0, "misses": 0})
+            counters[outcome] += 1
+
+    def get(self, namespace: str, key: str, validator: str = "") -> Optional[Any]:
+        """Return the cached value, or None if it is missing or its validator differs."""
+        if not Config.SHARED_CACHE:
+            return None
+
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT validator, value, used FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None or row[0] != validator:
+                self._count(namespace, "misses")
+                return None
+
+            now = time.time()
+            if now - row[2] > TOUCH_INTERVAL:
+                connection.execute(
+                    "UPDATE entries SET used = ? WHERE namespace = ? AND key = ?",
+                    (now, namespace, key),
+                )
+            self._count(namespace, "hits")
+            return storage.loads(row[1])
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Error reading {namespace} cache entry: {e}")
+            self._count(namespace, "misses")
+            return None
+
+    def set(self, namespace: str, key: str, value: Any, validator: str = "") -> None:
+        """Store a JSON-serializable value for all workers."""
+        if not Config.SHARED_CACHE:
+            return
+
+        try:
+            connection = self._connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, validator, value, used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, validator, storage.dumps(value, "json"), time.time()),
+            )
+
+            with self._lock:
+                self._writes += 1
+                evict = self._writes % EVICT_EVERY == 0
+            if evict:
+                self._evict(connection, namespace)
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing {namespace} cache entry: {e}")
+
+    def _evict(self, connection: sqlite3.Connection, namespace: str) -> None:
+        """Delete all but the SHARED_CACHE_MAX_ENTRIES most recently used entries."""
+        connection.execute(
+            "DELETE FROM entries WHERE namespace = ? AND key IN (SELECT key FROM entries "
+            "WHERE namespace = ? ORDER BY used DESC LIMIT -1 OFFSET ?)",
+            (namespace, namespace, Config.SHARED_CACHE_MAX_ENTRIES),
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return this process's hit rates and the shared entry counts per namespace."""
+        with self._lock:
+            namespaces = {name: dict(counters) for name, counters in self._counters.items()}
+
+        try:
+            rows = (
+                self._connection()
+                .execute("SELECT namespace, COUNT(*) FROM entries GROUP BY namespace")
+                .fetchall()
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Error counting cache entries: {e}")
+            rows = []
+
+        for name, entries in rows:
+            namespaces.setdefault(name, {"hits": 0, "misses": 0})["entries"] = entries
+        for counters in namespaces.values():
+            counters.setdefault("entries", 0)
+            lookups = counters["hits"] + counters["misses"]
+            counters["hit_rate"] = counters["hits"] / lookups if lookups else None
+
+        return {"enabled": Config.SHARED_CACHE, "pid": os.getpid(), "namespaces": namespaces}
+
+
+# Process-wide cache shared by all routers and chat managers
+shared_cache = SharedCache()
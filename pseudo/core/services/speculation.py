@@ -0,0 +1,90 @@
+"""Bookkeeping for speculative text generation started while classification runs."""
+
+import threading
+from typing import Any, Dict
+
+
+class SpeculationStats:
+    """Thread-safe counters for speculative text generation, overall and per provider.
+
+    A hit is a speculative answer that was used because the classifier chose text. A miss
+    is one that was thrown away; its provider time and output size are counted as waste.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty counters."""
+        self._lock = threading.Lock()
+        self._providers: Dict[str, Dict[str, float]] = {}
+        self.skipped = 0
+
+    def _entry(self, provider: str) -> Dict[str, float]:
+        """Return the counters for a provider, creating them on first use."""
+        return self._providers.setdefault(
+            provider,
+            {
+                "started": 0,
+                "hits": 0,
+                "misses": 0,
+                "cancelled": 0,
+                "wasted_seconds": 0.0,
+                "wasted_chars": 0,
+            },
+        )
+
+    def record_started(self, provider: str) -> None:
+        """Count a speculative call that was started."""
+        with self._lock:
+            self._entry(provider)["started"] += 1
+
+    def record_skipped(self) -> None:
+        """Count a request where the cost guard did not allow speculation."""
+        with self._lock:
+            self.skipped += 1
+
+    def record_hit(self, provider: str) -> None:
+        """Count a speculative answer that was used."""
+        with self._lock:
+            self._entry(provider)["hits"] += 1
+
+    def record_miss(self, provider: str, cancelled: bool) -> None:
+        """Count a speculative answer that was not needed."""
+        with self._lock:
+            entry = self._entry(provider)
+            entry["misses"] += 1
+            if cancelled:
+                entry["cancelled"] += 1
+
+    def record_waste(self, provider: str, seconds: float, response: Any) -> None:
+        """Add the provider time and output size of a discarded speculative call."""
+        content = response.get("content") if isinstance(response, dict) else response
+        with self._lock:
+            entry = self._entry(provider)
+            entry["wasted_seconds"] += seconds
+            if isinstance(content, str):
+                entry["wasted_chars"] += len(content)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable summary including the hit rate."""
+        with self._lock:
+            providers = {name: dict(entry) for name, entry in self._providers.items()}
+            skipped = self.skipped
+
+        hits = sum(entry["hits"] for entry in providers.values())
+        misses = sum(entry["misses"] for entry in providers.values())
+        for entry in providers.values():
+            decided = entry["hits"] + entry["misses"]
+            entry["hit_rate"] = entry["hits"] / decided if decided else None
+
+        return {
+            "hits": hits,
+            "misses": misses,
+            "skipped": skipped,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+            "wasted_seconds": sum(entry["wasted_seconds"] for entry in providers.values()),
+            "wasted_chars": sum(entry["wasted_chars"] for entry in providers.values()),
+            "providers": providers,
+        }
+
+
+# Process-wide statistics shared by all routers
+speculation_stats = SpeculationStats()
@@ -0,0 +1,145 @@
+"""Encoding of chat history files, with the format detected from the file contents."""
+
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from pseudo.core.config import Config
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Encodings that STORAGE_FORMAT may name
+STORAGE_FORMATS = ("json", "msgpack")
+
+# Every zstd frame starts with these bytes
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# First bytes of a JSON document, everything else is read as MessagePack
+JSON_START = b"{[ \t\r\n"
+
+# Documents in each chat directory that convert_history rewrites
+CHAT_FILES = ("metadata.json", "summary.json")
+
+
+def detect_format(raw: bytes) -> str:
+    """Return "zstd", "json" or "msgpack" for the raw contents of a history file."""
+    if raw.startswith(ZSTD_MAGIC):
+        return "zstd"
+    if not raw or raw[0] in JSON_START:
+        return "json"
+    return "msgpack"
+
+
+def loads(raw: bytes) -> Any:
+    """Decode history file contents in any supported format."""
+    fmt = detect_format(raw)
+    if fmt == "zstd":
+        import zstandard
+
+        return loads(zstandard.ZstdDecompressor().decompress(raw))
+    if fmt == "msgpack":
+        import msgpack
+
+        return msgpack.unpackb(raw)
+
+    try:
+        import orjson
+
+        return orjson.loads(raw)
+    except ImportError:
+        return json.loads(raw)
+
+
+def dumps(data: Any, fmt: Optional[str] = None, compress: bool = False) -> bytes:
+    """Encode data as compact JSON or MessagePack, optionally compressed with zstd.
+
+    fmt defaults to STORAGE_FORMAT. If msgpack is not installed, compact JSON is written.
+    """
+    fmt = fmt or Config.STORAGE_FORMAT
+    raw = None
+
+    if fmt == "msgpack":
+        try:
+            import msgpack
+
+            raw = msgpack.packb(data)
+        except ImportError:
+            logger.warning("msgpack is not installed, writing chat history as JSON")
+
+    if raw is None:
+        try:
+            import orjson
+
+            raw = orjson.dumps(data)
+        except ImportError:
+            raw = json.dumps(data, separators=(",", ":")).encode()
+
+    if compress:
+        import zstandard
+
+        raw = zstandard.ZstdCompressor(level=Config.ZSTD_LEVEL).compress(raw)
+    return raw
+
+
+def read_file(path: Union[str, Path]) -> Any:
+    """Read and decode a history file."""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def replace_file(path: Union[str, Path], raw: bytes) -> None:
+    """Replace path with raw bytes atomically, so readers never see a partial file."""
+    path = Path(path)
+    # A random name, as process and thread IDs repeat across nodes sharing the directory
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_file(
+    path: Union[str, Path], data: Any, fmt: Optional[str] = None, compress: bool = False
+) -> None:
+    """Encode data and replace path atomically."""
+    replace_file(path, dumps(data, fmt, compress))
+
+
+def convert_history(base_dir: Union[str, Path], fmt: str, compress: bool = False) -> Dict[str, int]:
+    """Rewrite history.json and every chat's metadata.json and summary.json in another format.
+
+    Messages of chats that predate the message log are kept in metadata.json and converted
+    with it. The message logs stay JSON lines, as they are appended to line by line, and
+    archived chats are converted when they are restored and next written.
+    Returns the number of files converted and failed, and their total size before and after.
+    """
+    base_dir = Path(base_dir)
+    files = [base_dir / "history.json"] + [
+        chat_dir / name
+        for chat_dir in base_dir.iterdir()
+        if chat_dir.is_dir() and not chat_dir.name.startswith(".")
+        for name in CHAT_FILES
+    ]
+
+    stats = {"converted": 0, "failed": 0, "bytes_before": 0, "bytes_after": 0}
+    for path in files:
+        if not path.exists():
+            continue
+        try:
+            raw = path.read_bytes()
+            write_file(path, loads(raw), fmt, compress)
+            stats["bytes_before"] += len(raw)
+            stats["bytes_after"] += path.stat().st_size
+            stats["converted"] += 1
+        except Exception as e:
+            stats["failed"] += 1
+            logger.error(f"Error converting {path}: {e}")
+
+    return stats
@@ -0,0 +1,140 @@
+"""Deferred removal of deleted chats, moved aside by rename and reclaimed in the background."""
+
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from pseudo.core.config import Config
+from pseudo.core.services import locks
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Directory under CHAT_HISTORY_DIR holding deleted chats, hidden from directory scans
+TRASH_DIR = ".trash"
+
+# Prefix of trash entries a collector has claimed
+CLAIMED_PREFIX = ".gc-"
+
+# Seconds after which a claim by another node is taken over, its owner cannot be checked
+FOREIGN_CLAIM_SECONDS = 24 * 3600
+
+
+def move_to_trash(base_dir: Path, path: Path) -> Path:
+    """Rename a chat directory or archive into the trash in constant time."""
+    trash_dir = base_dir / TRASH_DIR
+    trash_dir.mkdir(exist_ok=True)
+    # A unique suffix keeps a re-created and re-deleted chat from colliding
+    target = trash_dir / f"{path.name}.{uuid.uuid4().hex}"
+    os.replace(path, target)
+    return target
+
+
+def _abandoned(trash_dir: Path, name: str) -> bool:
+    """Return whether a claimed entry belongs to a collector process that has exited.
+
+    Claims are named after the node and process, and a process can only be checked on its
+    own node. A claim from another node is taken over once FOREIGN_CLAIM_SECONDS old.
+    """
+    owner = name[len(CLAIMED_PREFIX) :].split("-", 1)[0]
+    node, _, pid = owner.rpartition(".")
+    if node and node != locks.node_id():
+        try:
+            return time.time() - (trash_dir / name).stat().st_ctime > FOREIGN_CLAIM_SECONDS
+        except OSError:
+            return False
+
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except (ValueError, OSError):
+        return False
+    return False
+
+
+def empty_trash(base_dir: Path) -> int:
+    """Remove everything in the trash and return the number of entries removed.
+
+    Each entry is first renamed to a name claiming it for this process, so collectors in
+    several worker processes or nodes never remove the same entry. Entries claimed by a
+    collector that exited before finishing are claimed again.
+    """
+    trash_dir = base_dir / TRASH_DIR
+    if not trash_dir.is_dir():
+        return 0
+
+    owner = f"{locks.node_id()}.{os.getpid()}"
+    removed = 0
+    for name in os.listdir(trash_dir):
+        if name.startswith(CLAIMED_PREFIX):
+            if not _abandoned(trash_dir, name):
+                continue
+            name_without_claim = name[len(CLAIMED_PREFIX) :].split("-", 1)[1]
+        else:
+            name_without_claim = name
+
+        claimed = trash_dir / f"{CLAIMED_PREFIX}{owner}-{name_without_claim}"
+        try:
+            os.rename(trash_dir / name, claimed)
+        except OSError:
+            continue  #  Another collector got there first
+
+        try:
+            if claimed.is_dir():
+                shutil.rmtree(claimed)
+            else:
+                claimed.unlink()
+            removed += 1
+        except OSError as e:
+            logger.error(f"Error removing {claimed}: {e}")
+
+    return removed
+
+
+class TrashCollector:
+    """Empties the trash in a daemon thread, woken after deletes and every TRASH_GC_INTERVAL."""
+
+    def __init__(self) -> None:
+        """Initialize the collector, the thread starts on first use."""
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._base_dir: Optional[Path] = None
+        self.collected = 0  #  Trash entries removed by this process
+
+    def ensure_started(self, base_dir: Path) -> None:
+        """Start the collector thread once per process, including after a fork."""
+        with self._lock:
+            self._base_dir = Path(base_dir)
+            # Threads do not survive fork, so a forked worker starts its own
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="trash-collector", daemon=True)
+            self._thread.start()
+
+    def wake(self, base_dir: Path) -> None:
+        """Ask the collector to empty the trash now."""
+        self.ensure_started(base_dir)
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        """Empty the trash, then wait for a wake-up or the next interval."""
+        while True:
+            self._wakeup.clear()
+            try:
+                self.collected += empty_trash(self._base_dir)
+            except Exception as e:
+                logger.error(f"Error emptying trash: {e}")
+            self._wakeup.wait(Config.TRASH_GC_INTERVAL)
+
+
+# Process-wide collector shared by all chat managers
+trash_collector = TrashCollector()
@@ -0,0 +1,111 @@
+"""Benchmark of turn latency with the static credentials queue and with adaptive ordering."""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Project root, so this checkout of pseudo is imported
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# Simulated providers in credentials.json order: (provider, model) -> (median ms, failure rate)
+PROVIDERS = {
+    ("openai", "gpt-4o"): (2400, 0.08),
+    ("anthropic", "claude-3-5-sonnet"): (1500, 0.03),
+    ("ollama", "llama3"): (900, 0.25),
+}
+
+# The second provider slows down this much for the second half of the run
+DEGRADED_FACTOR = 4
+
+
+def call(rng: random.Random, entry: Tuple[str, str], degraded: bool) -> Tuple[float, bool]:
+    """Simulate one provider call, returning (milliseconds, succeeded)."""
+    median, failure_rate = PROVIDERS[entry]
+    if degraded and entry == ("anthropic", "claude-3-5-sonnet"):
+        median *= DEGRADED_FACTOR
+    ms = median * rng.lognormvariate(0, 0.4)
+    if rng.random() < failure_rate:
+        # Failures come back sooner than answers, e.g. errors or rate limit timeouts
+        return ms / 3, False
+    return ms, True
+
+
+def run(adaptive: bool, args: argparse.Namespace, db_path: Path) -> Dict[str, float]:
+    """Send the simulated requests through one queue strategy and summarize the latency."""
+    from pseudo.core.config import Config
+    from pseudo.core.services.metrics import attempt
+    from pseudo.core.services.scheduler import ProviderScheduler
+
+    Config.ADAPTIVE_EXPLORATION = args.exploration
+    scheduler = ProviderScheduler(db_path)
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+
+    turns: List[float] = []
+    failed = 0
+    overhead = 0.0
+    for index in range(args.requests):
+        degraded = index >= args.requests // 2
+
+        start = time.perf_counter()
+        queue = scheduler.order("text", list(PROVIDERS)) if adaptive else list(PROVIDERS)
+        overhead += time.perf_counter() - start
+
+        attempts = []
+        for entry in queue:
+            ms, ok = call(rng, entry, degraded)
+            attempts.append(attempt(entry[0], entry[1], ms / 1000, None if ok else "error"))
+            if ok:
+                break
+        failed += not attempts[-1]["ok"]
+        turns.append(sum(record["ms"] for record in attempts))
+
+        if adaptive:
+            start = time.perf_counter()
+            scheduler.record("text", attempts)
+            overhead += time.perf_counter() - start
+
+    half = args.requests // 2
+    first, second = sorted(turns[:half]), sorted(turns[half:])
+    return {
+        "p50 before": first[len(first) // 2],
+        "p90 before": first[int(len(first) * 0.9)],
+        "p50 after": second[len(second) // 2],
+        "p90 after": second[int(len(second) * 0.9)],
+        "failed": failed / args.requests,
+        "overhead_us": overhead / args.requests * 1e6,
+    }
+
+
+def main():
+    """Main benchmark execution function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--exploration", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{len(PROVIDERS)} providers, the fastest reliable one slows {DEGRADED_FACTOR}x halfway")
+    print(f"{'':>9} {'first half':>17} {'second half':>17}")
+    print(
+        f"{'queue':>9} {'p50 ms':>8} {'p90 ms':>8} {'p50 ms':>8} {'p90 ms':>8} {'failed':>7} "
+        f"{'overhead us':>12}"
+    )
+    for adaptive in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            result = run(adaptive, args, Path(tmp) / "adaptive.db")
+        print(
+            f"{'adaptive' if adaptive else 'static':>9} {result['p50 before']:>8.0f} "
+            f"{result['p90 before']:>8.0f} {result['p50 after']:>8.0f} "
+            f"{result['p90 after']:>8.0f} {result['failed']:>7.2%} {result['overhead_us']:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark of peak memory for appending to and tailing chats as they grow."""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+# Project root, so this checkout of pseudo is imported
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from pseudo.core.services.chat_history import MESSAGES_FILE, ChatManager  # noqa: E402
+
+
+def build_message(index: int) -> Dict:
+    """Return an assistant message shaped like what ChatManager stores."""
+    return {
+        "role": "assistant",
+        "mode": "text",
+        "content": f"Answer {index}. " + "The tradeoffs depend on the workload. " * 10,
+        "provider": "openai",
+        "model": "gpt-4-turbo",
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+def write_chat(base_dir: Path, chat_id: str, count: int, legacy: bool) -> None:
+    """Write a chat with count messages, in metadata.json (legacy) or the message log."""
+    chat_dir = base_dir / chat_id
+    (chat_dir / "media").mkdir(parents=True)
+    metadata = {"id": chat_id, "title": "Bench", "created_at": "", "updated_at": ""}
+
+    if legacy:
+        metadata["messages"] = [build_message(i) for i in range(count)]
+    else:
+        with open(chat_dir / MESSAGES_FILE, "w") as f:
+            for i in range(count):
+                f.write(json.dumps(build_message(i)) + "\n")
+
+    with open(chat_dir / "metadata.json", "w") as f:
+        json.dump(metadata, f)
+
+
+def legacy_add_message(base_dir: Path, chat_id: str) -> None:
+    """Append a message the way ChatManager did before the message log."""
+    metadata_file = base_dir / chat_id / "metadata.json"
+    with open(metadata_file, "r") as f:
+        metadata = json.load(f)
+    metadata["messages"].append(build_message(-1))
+    with open(metadata_file, "w") as f:
+        json.dump(metadata, f, indent=2)
+
+
+def measure(func: Callable[[], object]) -> Tuple[float, float]:
+    """Return the peak traced memory in MB and the time in ms of one call."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024, elapsed
+
+
+def main():
+    """Main benchmark execution function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="Messages per chat"
+    )
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print(f"{'messages':>9} {'operation':<22} {'peak MB':>9} {'ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(tmp)
+        manager = ChatManager(base_dir=base_dir)
+
+        for size in args.sizes:
+            write_chat(base_dir, f"legacy-{size}", size, legacy=True)
+            write_chat(base_dir, f"log-{size}", size, legacy=False)
+
+            operations = {
+                "legacy add_message": lambda: legacy_add_message(base_dir, f"legacy-{size}"),
+                "add_message": lambda: manager.add_message(f"log-{size}", build_message(-1)),
+                "tail_messages(20)": lambda: manager.tail_messages(f"log-{size}", 20),
+                "iter_messages": lambda: sum(1 for _ in manager.iter_messages(f"log-{size}")),
+            }
+            for name, operation in operations.items():
+                peak, elapsed = measure(operation)
+                print(f"{size:>9} {name:<22} {peak:9.2f} {elapsed:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
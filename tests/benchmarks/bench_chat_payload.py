@@ -0,0 +1,79 @@
+"""Benchmark of /api/chats/<id> payload size and serialization time for a large chat."""
+
+import argparse
+import gzip
+import json
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+from typing import Dict
+
+# Project root, so this checkout of pseudo is imported
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from pseudo.core.services.chat_history import compact_chat_view  # noqa: E402
+
+
+def build_chat(turns: int) -> Dict:
+    """Build chat metadata shaped like what ChatManager stores, with turns user/assistant pairs."""
+    messages = []
+    for turn in range(turns):
+        prompt = f"Question {turn}: explain the tradeoffs of approach number {turn} in detail"
+        timestamp = datetime.now().isoformat()
+        messages.append({"role": "user", "content": prompt, "timestamp": timestamp})
+        messages.append(
+            {
+                "role": "assistant",
+                "mode": "text",
+                "original_input": prompt,
+                "cleaned_content": prompt,
+                "provider": "openai",
+                "model": "gpt-4-turbo",
+                "content": f"Answer {turn}. " + "The tradeoffs depend on the workload. " * 20,
+                "timestamp": timestamp,
+            }
+        )
+    return {"id": "bench", "title": "Benchmark chat", "messages": messages}
+
+
+def main():
+    """Main benchmark execution function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=2000, help="User/assistant pairs")
+    parser.add_argument("--number", type=int, default=10, help="Serializations per timing")
+    args = parser.parse_args()
+
+    chat = build_chat(args.turns)
+    compact = compact_chat_view(chat)
+
+    encoders = {"json": lambda obj: json.dumps(obj).encode()}
+    try:
+        import orjson
+
+        encoders["orjson"] = orjson.dumps
+    except ImportError:
+        print("orjson is not installed, skipping it")
+
+    print(f"{'encoder':<8} {'view':<8} {'ms/call':>8} {'bytes':>10} {'gzip':>10} {'brotli':>10}")
+    for name, encode in encoders.items():
+        for view, payload in (("full", chat), ("compact", compact)):
+            seconds = min(timeit.repeat(lambda: encode(payload), number=args.number, repeat=3))
+            body = encode(payload)
+            gzipped = len(gzip.compress(body, compresslevel=6))
+            try:
+                import brotli
+
+                brotli_size = str(len(brotli.compress(body, quality=5)))
+            except ImportError:
+                brotli_size = "-"
+            print(
+                f"{name:<8} {view:<8} {seconds / args.number * 1000:8.2f} "
+                f"{len(body):>10} {gzipped:>10} {brotli_size:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark of the classifier response parser against the previous line-scan parser."""
+
+import argparse
+import re
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+# Project root, so this checkout of pseudo is imported
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from pseudo.core.services.classifier_parser import parse_classifier_output  # noqa: E402
+
+# Representative classifier outputs, one per form
+SAMPLES: Dict[str, str] = {
+    "plain": "mode: image\ncontent: a watercolor painting of a lighthouse at dusk",
+    "fenced": "```\nmode: audio\ncontent: Welcome aboard, please fasten your seatbelts\n```",
+    "reasoning": "<think>\n"
+    + "The user wants a picture. Maybe mode: text? No.\n" * 40
+    + "</think>\n```\nmode: image\ncontent: a red fox in the snow\n```",
+    "json": '{"mode": "text", "content": "Explain how tides work"}',
+    "invalid": "I am not sure what you want. Could you clarify your request?\n" * 5,
+}
+
+
+def legacy_parse(response_content: str) -> Optional[Tuple[str, str]]:
+    """The line-scan parser that ContentRouter used before the parser module."""
+    mode = None
+    cleaned_content = None
+
+    for line in response_content.split("\n"):
+        line = line.strip()
+        if line.startswith("mode:"):
+            mode = line.replace("mode:", "").strip().lower()
+        elif line.startswith("content:"):
+            cleaned_content = line.replace("content:", "").strip()
+
+    if not mode or not cleaned_content:
+        code_block_match = re.search(r"```(.*?)```", response_content, re.DOTALL)
+        if code_block_match:
+            code_block = code_block_match.group(1)
+            for line in code_block.split("\n"):
+                line = line.strip()
+                if line.startswith("mode:"):
+                    mode = line.replace("mode:", "").strip().lower()
+                elif line.startswith("content:"):
+                    cleaned_content = line.replace("content:", "").strip()
+
+    if mode in ["text", "image", "audio"] and cleaned_content:
+        return mode, cleaned_content
+    return None
+
+
+def time_parser(
+    parser: Callable[[str], Optional[Tuple[str, str]]], sample: str, number: int
+) -> float:
+    """Return the best mean time per call in microseconds over five repeats."""
+    timings = timeit.repeat(lambda: parser(sample), number=number, repeat=5)
+    return min(timings) / number * 1_000_000
+
+
+def main():
+    """Main benchmark execution function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000, help="Calls per timing repeat")
+    args = parser.parse_args()
+
+    print(f"{'sample':<12} {'legacy':>10} {'parser':>10}  result")
+    for name, sample in SAMPLES.items():
+        legacy = time_parser(legacy_parse, sample, args.number)
+        current = time_parser(parse_classifier_output, sample, args.number)
+        print(
+            f"{name:<12} {legacy:8.2f}us {current:8.2f}us  "
+            f"{legacy_parse(sample)} -> {parse_classifier_output(sample)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
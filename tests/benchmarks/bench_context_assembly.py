@@ -0,0 +1,80 @@
+"""Benchmark showing context assembly time depends on the token budget, not chat length."""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Project root, so this checkout of pseudo is imported
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from pseudo.core.services.chat_history import MESSAGES_FILE, ChatManager  # noqa: E402
+from pseudo.core.services.context import assemble_context  # noqa: E402
+
+
+def write_chat(base_dir: Path, chat_id: str, turns: int) -> None:
+    """Write a chat of turns user/assistant pairs straight to its message log."""
+    chat_dir = base_dir / chat_id
+    (chat_dir / "media").mkdir(parents=True)
+    start = datetime(2025, 1, 1)
+
+    with open(chat_dir / MESSAGES_FILE, "w") as f:
+        for turn in range(turns):
+            timestamp = (start + timedelta(seconds=turn)).isoformat()
+            user = {"role": "user", "content": f"Question {turn}?", "timestamp": timestamp}
+            assistant = {
+                "role": "assistant",
+                "mode": "text",
+                "content": f"Answer {turn}. " + "It depends on the workload. " * 8,
+                "provider": "openai",
+                "model": "gpt-4-turbo",
+                "timestamp": timestamp,
+            }
+            f.write(json.dumps(user) + "\n" + json.dumps(assistant) + "\n")
+
+    with open(chat_dir / "metadata.json", "w") as f:
+        json.dump({"id": chat_id, "title": "Bench", "created_at": "", "updated_at": ""}, f)
+
+
+def main():
+    """Main benchmark execution function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--turns", type=int, nargs="+", default=[10, 1000, 25000], help="Chat lengths in turns"
+    )
+    parser.add_argument(
+        "--budgets", type=int, nargs="+", default=[500, 2000, 8000], help="Token budgets"
+    )
+    parser.add_argument("--number", type=int, default=50, help="Assemblies per timing")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print(f"{'turns':>7} {'budget':>7} {'messages':>9} {'ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(tmp)
+        manager = ChatManager(base_dir=base_dir)
+        for turns in args.turns:
+            chat_id = f"chat-{turns}"
+            write_chat(base_dir, chat_id, turns)
+            for budget in args.budgets:
+                context, _ = assemble_context(manager, chat_id, budget)
+                seconds = min(
+                    timeit.repeat(
+                        lambda: assemble_context(manager, chat_id, budget),
+                        number=args.number,
+                        repeat=3,
+                    )
+                )
+                print(
+                    f"{turns:>7} {budget:>7} {len(context):>9} {seconds / args.number * 1000:8.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Import-time budget check for Pseudo's entry points based on `python -X importtime`."""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Project root, so the subprocess imports this checkout of pseudo
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# Modules timed, with their cumulative import budget in milliseconds
+BUDGETS_MS = {
+    "pseudo": 30,
+    "pseudo.core.app": 100,
+    "pseudo.core.routes": 400,
+}
+
+# Heavy dependencies that must not be loaded by importing the modules above
+LAZY_MODULES = ["apicenter", "PIL", "requests", "openai", "anthropic", "elevenlabs"]
+
+
+def measure_import(module: str) -> Tuple[float, Dict[str, float]]:
+    """Import a module in a fresh interpreter and return (total_ms, cumulative_ms_by_module).
+
+    Modules already loaded by interpreter startup (site, .pth hooks) are left out.
+    """
+    startup = _parse_importtime(_run_importtime("pass"))
+    timings = _parse_importtime(_run_importtime(f"import {module}"))
+    for name in startup:
+        timings.pop(name, None)
+
+    return timings.get(module, 0.0), timings
+
+
+def _run_importtime(code: str) -> str:
+    """Run code in a fresh interpreter with -X importtime and return its stderr."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, "PYTHONPATH": str(PROJECT_ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stderr
+
+
+def _parse_importtime(output: str) -> Dict[str, float]:
+    """Parse -X importtime output into cumulative milliseconds per module."""
+    # Lines look like: "import time:       self [us] |      cumulative | imported package"
+    timings = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        timings[name.strip()] = int(cumulative) / 1000
+    return timings
+
+
+def run_checks(runs: int) -> List[str]:
+    """Measure every budgeted module and return a list of budget violations."""
+    failures = []
+
+    for module, budget in BUDGETS_MS.items():
+        # Keep the best of several runs to reduce noise from the OS page cache
+        samples = [measure_import(module) for _ in range(runs)]
+        total, timings = min(samples, key=lambda sample: sample[0])
+
+        status = "ok" if total <= budget else "OVER BUDGET"
+        print(f"{module:<24} {total:8.1f} ms  (budget {budget} ms)  {status}")
+        if total > budget:
+            failures.append(f"{module} took {total:.1f} ms, budget is {budget} ms")
+
+        # Heavy dependencies must stay lazy
+        loaded = [name for name in LAZY_MODULES if name in timings]
+        if loaded:
+            failures.append(f"{module} eagerly imports {', '.join(loaded)}")
+
+        # Show the slowest imports to make regressions easy to track down
+        slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[1:6]
+        for name, cumulative in slowest:
+            print(f"    {name:<40} {cumulative:8.1f} ms")
+
+    return failures
+
+
+def main():
+    """Main benchmark execution function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="Runs per module, best is kept")
+    args = parser.parse_args()
+
+    failures = run_checks(args.runs)
+    if failures:
+        print("\nImport-time budget check failed:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+
+    print("\nImport-time budget check passed")
+
+
+if __name__ == "__main__":
+    main()
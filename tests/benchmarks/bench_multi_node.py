@@ -0,0 +1,101 @@
+"""Benchmark of several nodes writing one shared chat history, checking nothing is lost."""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Project root, so this checkout of pseudo is imported
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def run_node(
+    node: int, base_dir: str, backend: str, shared_ids: List[str], chats: int, messages: int
+) -> Tuple[List[str], float]:
+    """Create chats and append to the shared chats as one node, returning its chat IDs."""
+    # Config is read on import, so each node process sets its environment first
+    os.environ["NODE_ID"] = f"node{node}"
+    os.environ["LOCK_BACKEND"] = backend
+
+    from pseudo.core.services.chat_history import ChatManager
+
+    start = time.perf_counter()
+    created = []
+    for _ in range(chats):
+        chat_id = ChatManager(base_dir=Path(base_dir)).create_new_chat()
+        created.append(chat_id)
+        for index in range(messages):
+            # A manager per message, as the server creates one per request
+            for target in (chat_id, shared_ids[index % len(shared_ids)]):
+                ChatManager(base_dir=Path(base_dir)).add_message(
+                    target, {"role": "user", "content": f"node{node} message {index}"}
+                )
+    return created, time.perf_counter() - start
+
+
+def check_history(base_dir: Path, expected: List[str], shared_ids: List[str]) -> Dict[str, int]:
+    """Count chats missing from the index and messages missing from the shared chats."""
+    from pseudo.core.services.chat_history import ChatManager
+
+    manager = ChatManager(base_dir=base_dir)
+    indexed = {chat["id"] for chat in manager.history["chats"]}
+    return {
+        "missing_chats": len(set(expected) - indexed),
+        "shared_messages": sum(len(list(manager.iter_messages(chat_id))) for chat_id in shared_ids),
+    }
+
+
+def main():
+    """Main benchmark execution function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chats", type=int, default=10, help="Chats created per node")
+    parser.add_argument("--messages", type=int, default=10, help="Messages per created chat")
+    parser.add_argument("--backend", choices=["file", "redis"], default="file")
+    parser.add_argument("--dir", help="Shared directory, e.g. an NFS mount (default: a temp dir)")
+    args = parser.parse_args()
+
+    # Fresh interpreters, like separate machines, rather than forks sharing state
+    context = multiprocessing.get_context("spawn")
+
+    print(
+        f"{'nodes':>6} {'writes':>7} {'seconds':>8} {'writes/s':>9} {'lost chats':>11} "
+        f"{'lost msgs':>10}"
+    )
+    for nodes in args.nodes:
+        with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+            base_dir = Path(tmp)
+            from pseudo.core.services.chat_history import ChatManager
+
+            manager = ChatManager(base_dir=base_dir)
+            shared_ids = [manager.create_new_chat() for _ in range(4)]
+
+            start = time.perf_counter()
+            with context.Pool(nodes) as pool:
+                results = pool.starmap(
+                    run_node,
+                    [
+                        (node, tmp, args.backend, shared_ids, args.chats, args.messages)
+                        for node in range(nodes)
+                    ],
+                )
+            elapsed = time.perf_counter() - start
+
+            expected = shared_ids + [chat_id for created, _ in results for chat_id in created]
+            counts = check_history(base_dir, expected, shared_ids)
+            writes = nodes * args.chats * (1 + 2 * args.messages)
+            lost_messages = nodes * args.chats * args.messages - counts["shared_messages"]
+            print(
+                f"{nodes:>6} {writes:>7} {elapsed:>8.2f} {writes / elapsed:>9.0f} "
+                f"{counts['missing_chats']:>11} {lost_messages:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
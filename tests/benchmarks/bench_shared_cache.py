@@ -0,0 +1,120 @@
+"""Benchmark of classifier cache hit rate and memory with per-process and shared caches."""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List
+
+# Project root, so this checkout of pseudo is imported
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def anon_rss_kb() -> int:
+    """Return the process's private resident memory in KB (Linux only, else 0)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def build_inputs(seed: int, count: int, vocabulary: int) -> List[int]:
+    """Draw prompt numbers with a Zipf-like skew, as popular prompts repeat across users."""
+    rng = random.Random(seed)
+    weights = [1 / (rank**1.1) for rank in range(1, vocabulary + 1)]
+    return rng.choices(range(vocabulary), weights=weights, k=count)
+
+
+def classification(prompt: int) -> List[str]:
+    """Return a classifier result shaped like a real one, about 1 KB of cleaned content."""
+    return ["text", f"Prompt {prompt}: " + "explain the tradeoffs in detail. " * 30]
+
+
+def run_worker(kind: str, worker: int, db_path: str, args: argparse.Namespace) -> Dict:
+    """Look up each input in a cache, filling it on a miss, and report hits and memory."""
+    # Config is read on import, so each worker process sets its environment first
+    os.environ["SHARED_CACHE_DB"] = db_path
+    os.environ["SHARED_CACHE_MAX_ENTRIES"] = str(args.capacity)
+
+    from pseudo.core.services.shared_cache import SharedCache, cache_key
+
+    inputs = build_inputs(worker, args.requests // args.workers, args.vocabulary)
+    rss_before = anon_rss_kb()
+    hits = 0
+    # CPU time, so workers sharing fewer cores than there are workers compare fairly
+    start = time.process_time()
+
+    if kind == "process":
+        local: OrderedDict = OrderedDict()
+        for prompt in inputs:
+            key = cache_key(f"full\0v1\0prompt {prompt}")
+            if key in local:
+                local.move_to_end(key)
+                hits += 1
+                continue
+            local[key] = classification(prompt)
+            if len(local) > args.capacity:
+                local.popitem(last=False)
+    else:
+        cache = SharedCache()
+        for prompt in inputs:
+            key = cache_key(f"full\0v1\0prompt {prompt}")
+            if cache.get("classifier", key) is not None:
+                hits += 1
+                continue
+            cache.set("classifier", key, classification(prompt))
+
+    return {
+        "hits": hits,
+        "lookups": len(inputs),
+        "seconds": time.process_time() - start,
+        "rss_kb": anon_rss_kb() - rss_before,
+    }
+
+
+def main():
+    """Main benchmark execution function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=48000, help="Lookups over all workers")
+    parser.add_argument("--vocabulary", type=int, default=50000, help="Distinct prompts")
+    parser.add_argument("--capacity", type=int, default=10000, help="Entries per cache")
+    args = parser.parse_args()
+
+    # Fresh interpreters, like gunicorn workers after their first requests
+    context = multiprocessing.get_context("spawn")
+
+    print(f"{'workers':>7} {'cache':>8} {'hit rate':>9} {'CPU us/lookup':>14} {'RSS MB total':>13}")
+    for workers in args.workers:
+        args.workers = workers
+        for kind in ("process", "shared"):
+            with tempfile.TemporaryDirectory() as tmp:
+                db_path = str(Path(tmp) / "cache.db")
+                with context.Pool(workers) as pool:
+                    results = pool.starmap(
+                        run_worker, [(kind, worker, db_path, args) for worker in range(workers)]
+                    )
+
+            hits = sum(result["hits"] for result in results)
+            lookups = sum(result["lookups"] for result in results)
+            seconds = sum(result["seconds"] for result in results)
+            rss_mb = sum(result["rss_kb"] for result in results) / 1024
+            print(
+                f"{workers:>7} {kind:>8} {hits / lookups:>9.1%} "
+                f"{seconds / lookups * 1e6:>14.1f} {rss_mb:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
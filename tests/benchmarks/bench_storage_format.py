@@ -0,0 +1,107 @@
+"""Benchmark of chat metadata size and read/write time for each storage encoding."""
+
+import argparse
+import json
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+# Project root, so this checkout of pseudo is imported
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from pseudo.core.services import storage  # noqa: E402
+
+
+def build_metadata(turns: int) -> Dict:
+    """Build chat metadata shaped like what ChatManager stores, with turns user/assistant pairs."""
+    messages = []
+    for turn in range(turns):
+        prompt = f"Question {turn}: explain the tradeoffs of approach number {turn} in detail"
+        timestamp = datetime.now().isoformat()
+        messages.append({"role": "user", "content": prompt, "timestamp": timestamp})
+        messages.append(
+            {
+                "role": "assistant",
+                "mode": "text",
+                "original_input": prompt,
+                "cleaned_content": prompt,
+                "provider": "openai",
+                "model": "gpt-4-turbo",
+                "content": f"Answer {turn}. " + "The tradeoffs depend on the workload. " * 20,
+                "timestamp": timestamp,
+            }
+        )
+    timestamp = datetime.now().isoformat()
+    return {
+        "id": "bench",
+        "title": "Benchmark chat",
+        "created_at": timestamp,
+        "updated_at": timestamp,
+        "messages": messages,
+    }
+
+
+def legacy_write(path: Path, data: Dict) -> None:
+    """Write metadata the way ChatManager did before storage encodings."""
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def legacy_read(path: Path) -> Dict:
+    """Read metadata the way ChatManager did before storage encodings."""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def main():
+    """Main benchmark execution function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200, help="User/assistant pairs per chat")
+    parser.add_argument("--number", type=int, default=20, help="Writes and reads per timing")
+    args = parser.parse_args()
+
+    data = build_metadata(args.turns)
+    encodings: Dict[str, Tuple[Callable, Callable]] = {
+        "json (indent=2)": (legacy_write, legacy_read),
+        "json": (lambda p, d: storage.write_file(p, d, "json"), storage.read_file),
+    }
+    try:
+        import msgpack  # noqa: F401
+
+        encodings["msgpack"] = (lambda p, d: storage.write_file(p, d, "msgpack"), storage.read_file)
+    except ImportError:
+        print("msgpack is not installed, skipping it")
+    try:
+        import zstandard  # noqa: F401
+
+        for fmt in list(encodings)[1:]:
+            encodings[f"{fmt} + zstd"] = (
+                lambda p, d, fmt=fmt: storage.write_file(p, d, fmt, compress=True),
+                storage.read_file,
+            )
+    except ImportError:
+        print("zstandard is not installed, skipping compressed encodings")
+
+    print(f"{'encoding':<18} {'bytes':>10} {'write ms':>10} {'read ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "metadata.json"
+        for name, (write, read) in encodings.items():
+            write_seconds = min(
+                timeit.repeat(lambda: write(path, data), number=args.number, repeat=3)
+            )
+            assert read(path) == data
+            read_seconds = min(timeit.repeat(lambda: read(path), number=args.number, repeat=3))
+            print(
+                f"{name:<18} {path.stat().st_size:>10} "
+                f"{write_seconds / args.number * 1000:10.2f} "
+                f"{read_seconds / args.number * 1000:10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Shared fixtures: scripted providers in place of apicenter, with a credentials file."""
+
+import io
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to sys.path so we can import pseudo
+parent_dir = str(Path(__file__).resolve().parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from pseudo.core.config import Config  # noqa: E402
+from pseudo.core.services import content_router  # noqa: E402
+from pseudo.core.services.selector import selector_manager  # noqa: E402
+
+# Providers of the test credentials, keyed "k" so every one of them is usable
+CREDENTIALS = {
+    "modes": {
+        "text": {
+            "providers": {
+                "openai": {"api_key": "k", "models": ["gpt-a", "gpt-b"]},
+                "anthropic": {"api_key": "k", "models": ["claude"]},
+                "ollama": {"models": ["llama3"]},
+            }
+        },
+        "image": {"providers": {"openai": {"api_key": "k", "models": ["dall-e-3"]}}},
+        "audio": {"providers": {"elevenlabs": {"api_key": "k", "models": ["eleven"]}}},
+    }
+}
+
+
+class FakeAPICenter:
+    """Answers provider calls from scripts and records them, in place of apicenter.
+
+    Classifier prompts are recognized by their system prompt. They are answered with
+    the mode and cleaned content set for the input in classifications (text and the
+    input as-is by default), or with the raw reply set for it in replies.
+    """
+
+    def __init__(self, classifier_prompt: str) -> None:
+        self.classifier_prompt = classifier_prompt
+        self.classifications = {}  #  Input -> (mode, cleaned content)
+        self.replies = {}  #  Input -> raw classifier or single-pass reply
+        self.failing = set()  #  (provider, model) pairs that raise
+        self.delay = 0.0  #  Seconds every call takes
+        self.calls = []  #  (kind, provider, model, prompt) in call order
+        self._lock = threading.Lock()
+
+    def _call(self, kind, provider, model, prompt):
+        with self._lock:
+            self.calls.append((kind, provider, model, prompt))
+        time.sleep(self.delay)
+        if (provider, model) in self.failing:
+            raise RuntimeError(f"{provider}/{model} is down")
+
+    def kinds(self, kind):
+        """Return the (provider, model, prompt) of each recorded call of a kind."""
+        return [call[1:] for call in self.calls if call[0] == kind]
+
+    def text(self, provider, model, prompt, **options):
+        system = prompt[0]["content"] if isinstance(prompt, list) else ""
+        if not system.startswith(self.classifier_prompt):
+            self._call("text", provider, model, prompt)
+            user_input = prompt[-1]["content"] if isinstance(prompt, list) else prompt
+            return f"{provider}/{model} answers {user_input}"
+
+        # The single-pass prompt extends the classifier prompt
+        combined = system != self.classifier_prompt
+        self._call("combined" if combined else "classify", provider, model, prompt)
+        user_input = prompt[-1]["content"]
+        if user_input in self.replies:
+            return self.replies[user_input]
+        mode, cleaned = self.classifications.get(user_input, ("text", user_input))
+        reply = f"mode: {mode}\ncontent: {cleaned}"
+        if combined and mode == "text":
+            reply += f"\n---\ncombined answer to {cleaned}"
+        return reply
+
+    def image(self, provider, model, prompt, **options):
+        from PIL import Image
+
+        self._call("image", provider, model, prompt)
+        buffer = io.BytesIO()
+        Image.new("RGB", (2, 2)).save(buffer, "PNG")
+        return buffer.getvalue()
+
+    def audio(self, provider, model, prompt, **options):
+        self._call("audio", provider, model, prompt)
+        return b"ID3 audio bytes"
+
+
+@pytest.fixture
+def providers(tmp_path, monkeypatch):
+    """Route through a FakeAPICenter, with test credentials and chat history in tmp_path."""
+    credentials_file = tmp_path / "credentials.json"
+    credentials_file.write_text(json.dumps(CREDENTIALS))
+    monkeypatch.setenv("PSEUDO_CREDENTIALS_PATH", str(credentials_file))
+    monkeypatch.setattr(Config, "CHAT_HISTORY_DIR", str(tmp_path / "chat_history"))
+
+    # Every request reaches the scripted classifier, over the plain text API
+    monkeypatch.setattr(Config, "CLASSIFIER_CACHE_TTL", 0)
+    monkeypatch.setattr(Config, "CLASSIFIER_STREAMING", False)
+    monkeypatch.setattr(Config, "COMBINED_TEXT_MODE", False)
+    monkeypatch.setattr(Config, "SPECULATIVE_TEXT", False)
+    monkeypatch.setattr(Config, "ADAPTIVE_ROUTING", False)
+    monkeypatch.setattr(selector_manager, "enabled", False)
+
+    fake = FakeAPICenter(content_router.ContentRouter().classifier_prompt)
+    monkeypatch.setattr(content_router, "_apicenter", fake)
+    return fake
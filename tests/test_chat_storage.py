@@ -0,0 +1,314 @@
+"""Tests for the chat message log, archiving, the trash and the change feed."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to sys.path so we can import pseudo
+parent_dir = str(Path(__file__).resolve().parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from pseudo.core.config import Config  # noqa: E402
+from pseudo.core.services import archive, chat_history, storage, trash  # noqa: E402
+from pseudo.core.services.chat_history import MESSAGES_FILE, ChatManager  # noqa: E402
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Return a chat manager on an empty chat history directory."""
+    return ChatManager(base_dir=tmp_path)
+
+
+def add_turns(manager, chat_id, count, size=20):
+    """Add count alternating user and assistant messages of about size characters."""
+    for index in range(count):
+        role = "user" if index % 2 == 0 else "assistant"
+        content = f"{index}:" + "x" * size
+        assert manager.add_message(chat_id, {"role": role, "content": content})
+
+
+def contents(messages):
+    """Return the content of each message."""
+    return [message["content"] for message in messages]
+
+
+def test_legacy_messages_move_into_the_log(manager):
+    """A chat with its messages in metadata.json is read as-is and migrated on append."""
+    chat_id = manager.create_new_chat()
+    metadata_file = manager.base_dir / chat_id / "metadata.json"
+    metadata = storage.read_file(metadata_file)
+    metadata["messages"] = [
+        {"role": "user", "content": "old question"},
+        {"role": "assistant", "content": "old answer"},
+    ]
+    storage.write_file(metadata_file, metadata)
+
+    assert contents(manager.get_chat(chat_id)["messages"]) == ["old question", "old answer"]
+    assert contents(manager.tail_messages(chat_id, 1)) == ["old answer"]
+
+    manager.add_message(chat_id, {"role": "user", "content": "new question"})
+
+    assert "messages" not in storage.read_file(metadata_file)
+    log = (manager.base_dir / chat_id / MESSAGES_FILE).read_bytes().splitlines()
+    assert [json.loads(line)["content"] for line in log] == [
+        "old question",
+        "old answer",
+        "new question",
+    ]
+    assert contents(manager.get_chat(chat_id)["messages"])[-1] == "new question"
+
+
+def test_truncated_last_line_is_skipped_and_not_joined(manager):
+    """A record cut off by a crash is skipped, and the next append starts a new line."""
+    chat_id = manager.create_new_chat()
+    add_turns(manager, chat_id, 3)
+    with open(manager.base_dir / chat_id / MESSAGES_FILE, "ab") as f:
+        f.write(b'{"role": "assistant", "content": "cut o')
+
+    assert len(manager.get_chat(chat_id)["messages"]) == 3
+    assert contents(manager.tail_messages(chat_id, 1)) == contents(
+        manager.get_chat(chat_id)["messages"][-1:]
+    )
+
+    manager.add_message(chat_id, {"role": "user", "content": "after the crash"})
+
+    messages = manager.get_chat(chat_id)["messages"]
+    assert len(messages) == 4
+    assert messages[-1]["content"] == "after the crash"
+    assert contents(manager.tail_messages(chat_id, 2)) == contents(messages[-2:])
+
+
+@pytest.mark.parametrize("block_size", [chat_history.TAIL_BLOCK_SIZE, 97, 1024])
+def test_tail_matches_full_read_across_blocks(manager, monkeypatch, block_size):
+    """The tail is the end of the full message list, however blocks split the lines."""
+    monkeypatch.setattr(chat_history, "TAIL_BLOCK_SIZE", block_size)
+    chat_id = manager.create_new_chat()
+    # About 200 KB, so the default 64 KB block size needs several reads
+    add_turns(manager, chat_id, 150, size=1400)
+    messages = manager.get_chat(chat_id)["messages"]
+    assert (manager.base_dir / chat_id / MESSAGES_FILE).stat().st_size > 3 * 64 * 1024
+
+    for count in (1, 2, 45, 46, 47, 100, 150, 500):
+        assert contents(manager.tail_messages(chat_id, count)) == contents(messages[-count:])
+    assert manager.tail_messages(chat_id, 0) == []
+
+
+def test_archive_and_restore_through_get_chat(manager):
+    """An archived chat keeps its index entry and comes back whole when it is read."""
+    chat_id = manager.create_new_chat()
+    add_turns(manager, chat_id, 4)
+    (manager.base_dir / chat_id / "media" / "image_1.png").write_bytes(b"png bytes")
+    before = manager.get_chat(chat_id)["messages"]
+
+    # A negative age archives every chat, however recently it was updated
+    assert manager.archive_cold_chats(-1) == 1
+    assert not (manager.base_dir / chat_id).exists()
+    assert archive.find_archive(manager.base_dir, chat_id) is not None
+    assert [chat["id"] for chat in manager.get_all_chats()] == [chat_id]
+    assert manager.history["chats"][0]["archived"] is True
+
+    assert manager.get_chat(chat_id)["messages"] == before
+    assert (manager.base_dir / chat_id / "media" / "image_1.png").read_bytes() == b"png bytes"
+    assert archive.find_archive(manager.base_dir, chat_id) is None
+    assert "archived" not in manager.history["chats"][0]
+
+
+def test_media_route_restores_archived_chat(tmp_path, monkeypatch):
+    """Media of an archived chat is served after unpacking the chat."""
+    pytest.importorskip("flask")
+    from pseudo.core.app import create_app
+
+    monkeypatch.setattr(Config, "CHAT_HISTORY_DIR", str(tmp_path))
+    app = create_app()
+    manager = ChatManager(base_dir=tmp_path)
+    chat_id = manager.create_new_chat()
+    (tmp_path / chat_id / "media" / "audio_1.mp3").write_bytes(b"mp3 bytes")
+    add_turns(manager, chat_id, 2)
+    assert manager.archive_cold_chats(-1) == 1
+
+    client = app.test_client()
+    response = client.get(f"/chat_history/{chat_id}/media/audio_1.mp3")
+    assert response.status_code == 200
+    assert response.data == b"mp3 bytes"
+    assert not ChatManager(base_dir=tmp_path).history["chats"][0].get("archived")
+
+
+def test_deleted_chats_go_to_trash_and_are_collected(manager, monkeypatch):
+    """Deleting renames chats and archives into the trash, emptying it removes them."""
+    # The background collector would empty the trash before it can be inspected
+    monkeypatch.setattr(trash.trash_collector, "wake", lambda base_dir: None)
+    kept, deleted, archived = (manager.create_new_chat() for _ in range(3))
+    add_turns(manager, archived, 2)
+    manager.archive_cold_chats(-1)
+    manager.get_chat(kept)
+
+    assert sorted(manager.delete_chats([deleted, archived, "../escape"])) == sorted(
+        [deleted, archived]
+    )
+    assert [chat["id"] for chat in manager.history["chats"]] == [kept]
+    assert len(os.listdir(manager.base_dir / trash.TRASH_DIR)) == 2
+
+    assert trash.empty_trash(manager.base_dir) == 2
+    assert os.listdir(manager.base_dir / trash.TRASH_DIR) == []
+    assert manager.get_chat(deleted) is None
+    assert manager.get_chat(archived) is None
+    assert manager.get_chat(kept) is not None
+
+
+def test_claims_of_exited_collectors_are_taken_over(tmp_path):
+    """An entry claimed by a collector process that has exited is removed by the next one."""
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+
+    trash_dir = tmp_path / trash.TRASH_DIR
+    trash_dir.mkdir()
+    owner = f"{trash.locks.node_id()}.{exited.pid}"
+    (trash_dir / f"{trash.CLAIMED_PREFIX}{owner}-chat.abc").mkdir()
+    live = f"{trash.CLAIMED_PREFIX}{trash.locks.node_id()}.{os.getpid()}-other.def"
+    (trash_dir / live).mkdir()
+
+    assert trash.empty_trash(tmp_path) == 1
+    assert os.listdir(trash_dir) == [live]
+
+
+def test_cleanup_skips_archived_chats_and_reads_any_format(tmp_path, monkeypatch):
+    """Maintenance does not recreate a chat archived under it and reads compressed indexes."""
+    pytest.importorskip("zstandard")
+    import pseudo
+
+    monkeypatch.setenv("CHAT_HISTORY_DIR", str(tmp_path))
+    manager = ChatManager(base_dir=tmp_path)
+    kept, archived = manager.create_new_chat(), manager.create_new_chat()
+    for chat_id in (kept, archived):
+        metadata = storage.read_file(tmp_path / chat_id / "metadata.json")
+        storage.write_file(tmp_path / chat_id / "metadata.json", {**metadata, "message_count": 2})
+    add_turns(manager, archived, 2)
+    manager.archive_cold_chats(-1)
+    manager.get_chat(kept)
+
+    pseudo.clean_history_files()
+
+    assert "message_count" not in storage.read_file(tmp_path / kept / "metadata.json")
+    assert not (tmp_path / archived).exists()
+    assert pseudo.get_schema_version(tmp_path) == pseudo.HISTORY_SCHEMA_VERSION
+
+    history_file = tmp_path / "history.json"
+    storage.write_file(history_file, storage.read_file(history_file), "msgpack", compress=True)
+    assert pseudo._has_chats(history_file)
+
+
+def test_change_feed_returns_changes_since_a_version(manager, monkeypatch):
+    """Chats changed after a version are listed, deleted ones come back as tombstones."""
+    monkeypatch.setattr(trash.trash_collector, "wake", lambda base_dir: None)
+    updated, deleted, untouched = (manager.create_new_chat() for _ in range(3))
+    since = manager.history["version"]
+
+    assert manager.get_changes(since) == {
+        "version": since,
+        "reset": False,
+        "chats": [],
+        "deleted": [],
+    }
+
+    add_turns(manager, updated, 1)
+    manager.delete_chats([deleted])
+    changes = manager.get_changes(since)
+
+    assert changes["reset"] is False
+    assert changes["version"] == since + 2
+    assert [chat["id"] for chat in changes["chats"]] == [updated]
+    assert changes["deleted"] == [deleted]
+    # A client that saw the update only gets the deletion
+    assert manager.get_changes(since + 1)["chats"] == []
+    assert manager.get_changes(since + 1)["deleted"] == [deleted]
+    assert untouched in [chat["id"] for chat in manager.get_changes(0)["chats"]]
+
+
+def test_change_feed_resets_clients_older_than_the_tombstones(manager, monkeypatch):
+    """Once old tombstones are dropped, clients from before them reload the full list."""
+    monkeypatch.setattr(trash.trash_collector, "wake", lambda base_dir: None)
+    monkeypatch.setattr(Config, "CHANGE_FEED_TOMBSTONES", 2)
+    kept = manager.create_new_chat()
+    doomed = [manager.create_new_chat() for _ in range(3)]
+    since = manager.history["version"]
+    for chat_id in doomed:
+        manager.delete_chats([chat_id])
+
+    floor = manager.history["tombstone_floor"]
+    assert floor == since + 1
+    assert [tombstone["id"] for tombstone in manager.history["deleted"]] == doomed[1:]
+
+    changes = manager.get_changes(since)
+    assert changes["reset"] is True
+    assert [chat["id"] for chat in changes["chats"]] == [kept]
+    assert changes["deleted"] == []
+
+    changes = manager.get_changes(floor)
+    assert changes["reset"] is False
+    assert changes["deleted"] == doomed[1:]
+
+    # Versions from the future, after a restore from backup, also reset
+    assert manager.get_changes(manager.history["version"] + 1)["reset"] is True
+
+
+def test_change_streams_are_capped(tmp_path, monkeypatch):
+    """Past CHANGE_FEED_MAX_STREAMS a stream is refused until an open one closes."""
+    pytest.importorskip("flask")
+    from pseudo.core.app import create_app
+
+    monkeypatch.setattr(Config, "CHAT_HISTORY_DIR", str(tmp_path))
+    app = create_app()
+    app.config.update(
+        CHANGE_FEED_STREAM=True, CHANGE_FEED_MAX_STREAMS=1, CHANGE_FEED_POLL_INTERVAL=0.01
+    )
+    client = app.test_client()
+
+    first = client.get("/api/chats/changes/stream?since=0", buffered=False)
+    assert first.status_code == 200
+    assert next(first.response).startswith(b"id: 0\nevent: changes\n")
+
+    refused = client.get("/api/chats/changes/stream", buffered=False)
+    assert refused.status_code == 503
+    assert refused.get_json() == {"error": "Too many open change streams"}
+
+    first.close()
+    again = client.get("/api/chats/changes/stream", buffered=False)
+    assert again.status_code == 200
+    again.close()
+
+
+def test_convert_history_rewrites_every_document(manager):
+    """The index, metadata with legacy messages and summaries are converted, the log is not."""
+    pytest.importorskip("msgpack")
+    legacy, logged = manager.create_new_chat(), manager.create_new_chat()
+    metadata_file = manager.base_dir / legacy / "metadata.json"
+    storage.write_file(
+        metadata_file,
+        {**storage.read_file(metadata_file), "messages": [{"role": "user", "content": "old"}]},
+    )
+    add_turns(manager, logged, 2)
+    summary = {"before": "2024-06-01T00:00:00", "text": "earlier turns"}
+    storage.write_file(manager.base_dir / logged / "summary.json", summary)
+    log = (manager.base_dir / logged / MESSAGES_FILE).read_bytes()
+
+    stats = storage.convert_history(manager.base_dir, "msgpack")
+
+    assert stats["converted"] == 4 and stats["failed"] == 0
+    for path in (
+        manager.base_dir / "history.json",
+        metadata_file,
+        manager.base_dir / logged / "metadata.json",
+        manager.base_dir / logged / "summary.json",
+    ):
+        assert storage.detect_format(path.read_bytes()) == "msgpack"
+    assert storage.read_file(manager.base_dir / logged / "summary.json") == summary
+    assert (manager.base_dir / logged / MESSAGES_FILE).read_bytes() == log
+
+    reloaded = ChatManager(base_dir=manager.base_dir)
+    assert contents(reloaded.get_chat(legacy)["messages"]) == ["old"]
+    assert len(reloaded.get_chat(logged)["messages"]) == 2
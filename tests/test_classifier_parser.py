@@ -0,0 +1,113 @@
+"""Fuzz tests for the classifier response parser."""
+
+import json
+import random
+import string
+import sys
+from pathlib import Path
+
+# Add parent directory to sys.path so we can import pseudo
+parent_dir = str(Path(__file__).resolve().parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from pseudo.core.services.classifier_parser import (  # noqa: E402
+    VALID_MODES,
+    StreamingClassifierParser,
+    parse_classifier_output,
+)
+
+# Fixed seed so failures are reproducible
+SEED = 20240601
+CASES = 2000
+
+# Text a model may put around its answer
+NOISE = [
+    "",
+    "Sure, here is the classification.\n",
+    "<think>The user says mode: audio, but content: maybe not.\n</think>\n",
+    "<think>\nhmm\n</think>",
+    "Note: the request is clear.\n",
+]
+
+
+def random_content(rng: random.Random) -> str:
+    """Return random cleaned content without line breaks or surrounding quotes."""
+    alphabet = string.ascii_letters + string.digits + " .,!?:=-'\"é你"
+    content = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 60)))
+    return content.strip(" \t*`\"',") or "x"
+
+
+def render(rng: random.Random, mode: str, content: str) -> str:
+    """Render a mode and content in one of the forms classifiers produce."""
+    mode_text = rng.choice([mode, mode.upper(), mode.capitalize()])
+    form = rng.choice(["plain", "fenced", "equals", "bullets", "bold", "json", "json_pretty"])
+
+    if form == "json":
+        body = json.dumps({"mode": mode_text, "content": content}, ensure_ascii=rng.random() < 0.5)
+    elif form == "json_pretty":
+        body = json.dumps({"mode": mode_text, "content": content}, indent=2)
+    elif form == "equals":
+        body = f"mode = {mode_text}\ncontent = {content}"
+    elif form == "bullets":
+        body = f"- mode: {mode_text}\n- content: {content}"
+    elif form == "bold":
+        body = f"**mode:** {mode_text}\n**content:** {content}"
+    else:
+        key = rng.choice(["mode", "Mode"])
+        body = f"{key}: {mode_text}\ncontent: {content}"
+
+    if form == "fenced" or (form.startswith("json") and rng.random() < 0.5):
+        body = f"```{rng.choice(['', 'json', 'yaml'])}\n{body}\n```"
+
+    return rng.choice(NOISE) + body + rng.choice(["", "\n", "\n\nLet me know if you need more."])
+
+
+def test_parses_every_form():
+    """Every rendered form parses back to the mode and content that produced it."""
+    rng = random.Random(SEED)
+    for _ in range(CASES):
+        mode = rng.choice(VALID_MODES)
+        content = random_content(rng)
+        output = render(rng, mode, content)
+        assert parse_classifier_output(output) == (mode, content), output
+
+
+def test_garbage_never_raises():
+    """Random text either parses to a valid mode or returns None, without raising."""
+    rng = random.Random(SEED)
+    alphabet = string.printable + 'éß你`{}"\\'
+    fragments = ["mode:", "content:", "```", "<think>", "</think>", '"mode": "', "\n"]
+    for _ in range(CASES):
+        pieces = [
+            rng.choice(fragments) if rng.random() < 0.3 else rng.choice(alphabet)
+            for _ in range(rng.randint(0, 80))
+        ]
+        result = parse_classifier_output("".join(pieces))
+        assert result is None or (result[0] in VALID_MODES and result[1])
+
+
+def test_reasoning_is_ignored():
+    """Fields inside a reasoning block never override the answer after it."""
+    output = "<think>\nmode: audio\ncontent: wrong\n</think>\nmode: image\ncontent: a red fox"
+    assert parse_classifier_output(output) == ("image", "a red fox")
+    assert parse_classifier_output("<think>\nmode: audio\ncontent: unfinished") is None
+
+
+def test_streaming_matches_full_parse():
+    """The streaming parser agrees with the full parser however the output is chunked."""
+    rng = random.Random(SEED)
+    for _ in range(CASES // 4):
+        mode = rng.choice(VALID_MODES)
+        content = random_content(rng)
+        output = render(rng, mode, content)
+
+        parser = StreamingClassifierParser()
+        position = 0
+        while position < len(output):
+            size = rng.randint(1, 8)
+            if parser.feed(output[position : position + size]):
+                break
+            position += size
+        result, _ = parser.finish()
+        assert result == parse_classifier_output(output), output
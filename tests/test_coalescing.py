@@ -0,0 +1,212 @@
+"""Tests for single-flight coalescing of identical provider generations."""
+
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to sys.path so we can import pseudo
+parent_dir = str(Path(__file__).resolve().parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from pseudo.core.config import Config  # noqa: E402
+from pseudo.core.services.chat_history import ChatManager  # noqa: E402
+from pseudo.core.services.coalescing import SingleFlight  # noqa: E402
+from pseudo.core.services.content_router import ContentRouter  # noqa: E402
+from pseudo.core.services.metrics import aggregate, attach_turn_metrics  # noqa: E402
+
+
+def wait_for_followers(flights, count):
+    """Wait until count callers have joined a flight in progress."""
+    deadline = time.monotonic() + 5
+    while flights.coalesced < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert flights.coalesced == count
+
+
+def test_identical_calls_share_one_flight():
+    """Concurrent calls with one key run the function once and get separate copies."""
+    flights = SingleFlight()
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def generate(prompt):
+        calls.append(prompt)
+        started.set()
+        release.wait(5)
+        return {"content": prompt.upper()}
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flights.do, "key", generate, "hi")
+        assert started.wait(5)
+        followers = [executor.submit(flights.do, "key", generate, "hi") for _ in range(3)]
+        while flights.coalesced < 3:
+            time.sleep(0.01)
+        release.set()
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert calls == ["hi"]
+    assert all(result == {"content": "HI"} for result in results)
+    assert len({id(result) for result in results}) == len(results)
+
+    # The flight ends with the call, a later call runs again
+    assert flights.do("key", generate, "again") == {"content": "AGAIN"}
+    assert calls == ["hi", "again"]
+
+
+def test_followers_get_the_leaders_exception():
+    """An exception of the shared call is raised in every caller."""
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("provider down")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flights.do, "key", fail)
+        assert started.wait(5)
+        follower = executor.submit(flights.do, "key", fail)
+        while flights.coalesced < 1:
+            time.sleep(0.01)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match="provider down"):
+                future.result()
+
+
+def test_results_are_isolated_copies():
+    """Changing one caller's result, however deep, does not change another's."""
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def generate():
+        started.set()
+        release.wait(5)
+        return {"content": "answer", "media": {"sizes": [1, 2]}}
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        leader = executor.submit(flights.do, "key", generate)
+        assert started.wait(5)
+        followers = [executor.submit(flights.do, "key", generate) for _ in range(2)]
+        wait_for_followers(flights, 2)
+        release.set()
+        results = [leader.result()] + [future.result() for future in followers]
+
+    results[0]["media"]["sizes"].append(3)
+    results[1]["content"] = "changed"
+    assert results[2] == {"content": "answer", "media": {"sizes": [1, 2]}}
+    assert results[1]["media"]["sizes"] == [1, 2]
+
+
+def test_caller_arriving_after_the_flight_ends_starts_a_new_one():
+    """Once the leader stops sharing, a new caller runs the call instead of taking the result."""
+    finished = threading.Event()
+    release = threading.Event()
+
+    class PausingFlight(SingleFlight):
+        def _finish(self, key, future):
+            shared = super()._finish(key, future)
+            finished.set()
+            release.wait(5)
+            return shared
+
+    flights = PausingFlight()
+    calls = []
+
+    def generate(prompt):
+        calls.append(prompt)
+        return prompt
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        leader = executor.submit(flights.do, "key", generate, "first")
+        # The leader has left the table but not yet published its result
+        assert finished.wait(5)
+        finished.clear()
+        release.set()
+        assert flights.do("key", generate, "second") == "second"
+        assert leader.result() == "first"
+
+    assert calls == ["first", "second"]
+    assert flights.coalesced == 0
+
+
+def test_sync_and_async_callers_join_one_flight():
+    """A Flask thread and callers on event loops in other threads share one call."""
+    flights = SingleFlight()
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def generate():
+        calls.append("sync")
+        started.set()
+        release.wait(5)
+        return {"content": "shared"}
+
+    async def agenerate():
+        calls.append("async")
+        return {"content": "not shared"}
+
+    def join_async():
+        return asyncio.run(flights.do_async("key", agenerate))
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        leader = executor.submit(flights.do, "key", generate)
+        assert started.wait(5)
+        followers = [executor.submit(join_async) for _ in range(2)]
+        wait_for_followers(flights, 2)
+        release.set()
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert calls == ["sync"]
+    assert results == [{"content": "shared"}] * 3
+
+    # An async leader is joined by a sync caller the same way
+    async def aslow():
+        calls.append("async")
+        started.set()
+        await asyncio.sleep(0.2)
+        return {"content": "from the loop"}
+
+    started.clear()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        leader = executor.submit(asyncio.run, flights.do_async("other", aslow))
+        assert started.wait(5)
+        assert flights.do("other", generate) == {"content": "from the loop"}
+        assert leader.result() == {"content": "from the loop"}
+    assert calls == ["sync", "async"]
+
+
+def test_followers_record_no_provider_attempts(providers, tmp_path, monkeypatch):
+    """Only the leader's turn reports provider calls, so the stats count each call once."""
+    monkeypatch.setattr(Config, "REQUEST_COALESCING", True)
+    providers.delay = 0.2
+    router = ContentRouter()
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        responses = list(executor.map(lambda _: router.process_content("text", "hi"), range(3)))
+
+    assert len(providers.kinds("text")) == 1
+    assert sum("attempts" in response for response in responses) == 1
+    assert sum(bool(response.get("coalesced")) for response in responses) == 2
+
+    manager = ChatManager(base_dir=tmp_path / "history")
+    chat_id = manager.create_new_chat()
+    for response in responses:
+        attach_turn_metrics(response, "classifier", "hi", 0.0, 0.2)
+        assert "coalesced" not in response
+        manager.add_message(chat_id, {"role": "assistant", **response})
+
+    report = aggregate(manager.base_dir)
+    assert (report["turns"], report["coalesced"]) == (1, 2)
+    assert [(row["provider"], row["attempts"]) for row in report["providers"]] == [("openai", 1)]
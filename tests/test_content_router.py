@@ -0,0 +1,155 @@
+"""Tests for the single-pass and speculative text paths of the content router."""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to sys.path so we can import pseudo
+parent_dir = str(Path(__file__).resolve().parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from pseudo.core.config import Config  # noqa: E402
+from pseudo.core.services import content_router  # noqa: E402
+from pseudo.core.services.content_router import ContentRouter  # noqa: E402
+from pseudo.core.services.speculation import SpeculationStats  # noqa: E402
+
+
+@pytest.fixture
+def router(providers):
+    """Return a router over the scripted providers."""
+    return ContentRouter()
+
+
+def parse(router, reply):
+    """Parse a single-pass reply as if openai/gpt-a had sent it."""
+    return router._parse_combined_response(reply, "openai", "gpt-a", "question", 0.5)
+
+
+def test_combined_reply_is_split_at_the_first_separator(router):
+    """The answer follows the first separator line and may contain more of them."""
+    mode, cleaned, response = parse(
+        router, "mode: text\ncontent: question\n---\nfirst part\n\n---\nsecond part"
+    )
+
+    assert (mode, cleaned) == ("text", "question")
+    assert response["content"] == "first part\n\n---\nsecond part"
+    assert response["provider"] == "openai"
+    assert [entry["model"] for entry in response["attempts"]] == ["gpt-a"]
+
+
+def test_reasoning_before_the_header_is_ignored(router):
+    """A separator written while thinking does not split the reply."""
+    reply = "<think>\nmode: image?\n---\nno, text\n</think>\nmode: text\ncontent: q\n---\nanswer"
+
+    mode, cleaned, response = parse(router, reply)
+
+    assert (mode, cleaned) == ("text", "q")
+    assert response["content"] == "answer"
+
+
+@pytest.mark.parametrize(
+    "reply",
+    [
+        "mode: text\ncontent: question",  #  Separator missing
+        "mode: text\ncontent: question\n---\n   ",  #  Nothing after it
+        "mode: image\ncontent: question\n---\nignored answer",  #  Not text
+    ],
+)
+def test_reply_without_a_text_answer_leaves_generation_to_the_queue(router, reply):
+    """The classification is kept, and no response is returned for the caller to use."""
+    mode, cleaned, response = parse(router, reply)
+
+    assert cleaned == "question"
+    assert mode in ("text", "image")
+    assert response is None
+
+
+def test_reply_without_a_header_is_rejected(router):
+    """A reply that does not start with a classification is not a result."""
+    assert parse(router, "Here is my answer\n---\nmode: text") is None
+
+
+def test_invalid_replies_fall_through_to_text(router, providers):
+    """Each classifier is tried in turn; when none answers validly the input is used as-is."""
+    providers.replies["question"] = "I cannot classify this"
+    providers.failing.add(("anthropic", "claude"))
+
+    assert router.classify_and_generate("question") == ("text", "question", None)
+    assert [call[:2] for call in providers.kinds("combined")] == [
+        ("openai", "gpt-a"),
+        ("anthropic", "claude"),
+        ("ollama", "llama3"),
+    ]
+
+
+def test_combined_call_answers_text_in_one_request(router, providers):
+    """A text input is classified and answered by the first classifier."""
+    mode, cleaned, response = router.classify_and_generate("hello")
+
+    assert (mode, cleaned) == ("text", "hello")
+    assert response["content"] == "combined answer to hello"
+    assert len(providers.calls) == 1
+
+
+@pytest.fixture
+def speculation(router, providers, monkeypatch):
+    """Speculate on openai with fresh statistics, while classification takes a moment."""
+    monkeypatch.setattr(Config, "SPECULATIVE_PROVIDERS", ["openai"])
+    monkeypatch.setattr(content_router, "speculation_stats", SpeculationStats())
+    # The speculative call starts before the classification ends, so it is never cancelled
+    providers.delay = 0.05
+    return content_router.speculation_stats
+
+
+def wasted(stats):
+    """Return the provider statistics once a discarded speculative call has been counted."""
+    deadline = time.monotonic() + 5
+    while not stats.snapshot()["wasted_seconds"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return stats.snapshot()["providers"]["openai"]
+
+
+def test_speculative_answer_is_used_when_the_input_is_text(router, providers, speculation):
+    """Text with the input unchanged takes the answer generated during classification."""
+    mode, cleaned, response = router.classify_with_speculation("hello")
+
+    assert (mode, cleaned) == ("text", "hello")
+    assert response["content"] == "openai/gpt-a answers hello"
+    assert len(providers.kinds("text")) == 1
+    snapshot = speculation.snapshot()
+    assert (snapshot["hits"], snapshot["misses"], snapshot["hit_rate"]) == (1, 0, 1.0)
+
+
+@pytest.mark.parametrize(
+    "classification",
+    [("text", "why is the sky blue"), ("image", "a cat")],
+    ids=["cleaned", "image"],
+)
+def test_speculative_answer_is_discarded_and_counted_as_waste(
+    router, providers, speculation, classification
+):
+    """A cleaned input or another mode throws the answer away and records its cost."""
+    user_input = "please answer: why is the sky blue, or draw a cat"
+    providers.classifications[user_input] = classification
+
+    mode, cleaned, response = router.classify_with_speculation(user_input)
+
+    assert (mode, cleaned, response) == (*classification, None)
+    entry = wasted(speculation)
+    assert (entry["started"], entry["hits"], entry["misses"], entry["cancelled"]) == (1, 0, 1, 0)
+    assert entry["wasted_seconds"] > 0
+    assert entry["wasted_chars"] == len(f"openai/gpt-a answers {user_input}")
+
+
+def test_speculation_is_skipped_without_a_cheap_provider(
+    router, providers, speculation, monkeypatch
+):
+    """No configured speculative provider means no extra call, only a skip."""
+    monkeypatch.setattr(Config, "SPECULATIVE_PROVIDERS", [])
+
+    assert router.classify_with_speculation("hello") == ("text", "hello", None)
+    assert providers.kinds("text") == []
+    assert speculation.snapshot()["skipped"] == 1
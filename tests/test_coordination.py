@@ -0,0 +1,102 @@
+"""Tests for the locks and the rate limiter shared by worker processes."""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to sys.path so we can import pseudo
+parent_dir = str(Path(__file__).resolve().parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from pseudo.core.config import Config  # noqa: E402
+from pseudo.core.services import locks  # noqa: E402
+from pseudo.core.services.chat_history import ChatManager  # noqa: E402
+from pseudo.core.services.rate_limiter import RateLimiter, RateLimitTimeout  # noqa: E402
+
+
+def test_concurrent_appends_keep_every_message(tmp_path):
+    """Threads appending to one chat through separate managers lose no message or index entry."""
+    chat_id = ChatManager(base_dir=tmp_path).create_new_chat()
+
+    def append(worker):
+        manager = ChatManager(base_dir=tmp_path)
+        for index in range(10):
+            manager.add_message(chat_id, {"role": "user", "content": f"{worker}-{index}"})
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(append, range(8)))
+
+    manager = ChatManager(base_dir=tmp_path)
+    messages = manager.get_chat(chat_id)["messages"]
+    assert sorted(message["content"] for message in messages) == sorted(
+        f"{worker}-{index}" for worker in range(8) for index in range(10)
+    )
+    # Every append stamped the chat with a new version in the shared index
+    assert manager.history["version"] == 81
+
+
+def test_locks_are_reentrant_and_time_out(tmp_path, monkeypatch):
+    """A thread may take a lock it holds again, another thread times out waiting for it."""
+    monkeypatch.setattr(Config, "LOCK_TIMEOUT", 0.2)
+    held = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with locks.chat_lock(tmp_path, "chat"), locks.history_lock(tmp_path):
+            with locks.history_lock(tmp_path):
+                held.set()
+                release.wait(5)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    try:
+        assert held.wait(5)
+        with pytest.raises(locks.LockTimeout):
+            with locks.history_lock(tmp_path):
+                pass
+    finally:
+        release.set()
+        thread.join()
+
+    with locks.history_lock(tmp_path):
+        pass
+
+
+def test_rate_limit_burst_and_refill(tmp_path):
+    """A bucket allows its burst, then refuses until a token is added again."""
+    limiter = RateLimiter(tmp_path / "limits.db")
+    config = {"rate_limit": {"requests_per_minute": 600, "burst": 2}}
+
+    for _ in range(2):
+        with limiter.limit("openai", "gpt-4o", config, timeout=0):
+            pass
+    assert not limiter.available("openai", "gpt-4o", config)
+    with pytest.raises(RateLimitTimeout):
+        with limiter.limit("openai", "gpt-4o", config, timeout=0):
+            pass
+
+    # 600 requests per minute adds a token every 0.1 seconds
+    with limiter.limit("openai", "gpt-4o", config, timeout=1):
+        pass
+    assert limiter.available("ollama", "llama3", {})
+
+
+def test_concurrency_cap_is_shared_and_released(tmp_path):
+    """Limiters on one database share the concurrency slots of a model."""
+    config = {"rate_limit": {"max_concurrent": 1, "models": {"dall-e-3": {"max_concurrent": 2}}}}
+    first, second = RateLimiter(tmp_path / "limits.db"), RateLimiter(tmp_path / "limits.db")
+
+    with first.limit("openai", "gpt-4o", config, timeout=0):
+        assert not second.available("openai", "gpt-4o", config)
+        with pytest.raises(RateLimitTimeout):
+            with second.limit("openai", "gpt-4o", config, timeout=0):
+                pass
+        # The model entry overrides the provider's cap
+        with second.limit("openai", "dall-e-3", config, timeout=0):
+            assert second.available("openai", "dall-e-3", config)
+    assert second.available("openai", "gpt-4o", config)
@@ -1,10 +1,10 @@
 """Test script for the gateway system's mode detection and content cleaning functionality."""
 
+import argparse
 import csv
 import logging
-
-# Add parent directory to sys.path so we can import pseudo
 import sys
+import time
 from pathlib import Path
 from typing import Dict, List
 
@@ -13,10 +13,13 @@ import numpy as np
 import pandas as pd
 import seaborn as sns
 
+# Add parent directory to sys.path so we can import pseudo
 parent_dir = str(Path(__file__).resolve().parent.parent.parent)
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
+from pseudo.core.config import Config  # noqa: E402
+from pseudo.core.services.classifier_parser import VALID_MODES  # noqa: E402
 from pseudo.core.services.content_router import ContentRouter  # noqa: E402
 
 # Set up logging
@@ -30,7 +33,7 @@ CATEGORIES = {"explicit_text": 1, "explicit_image": 2, "explicit_audio": 3, "vag
 EXPLICITNESS = {"very": 1, "moderate": 2, "less": 3, "none": 4}
 
 # Define modes and their numeric IDs
-MODES = {"text": 1, "image": 2, "audio": 3}
+MODES = {mode: index for index, mode in enumerate(VALID_MODES, start=1)}
 
 
 def get_test_case_id(category: str, explicitness: str, index: int) -> str:
@@ -339,8 +342,10 @@ def run_test_case(router: ContentRouter, test_case: Dict, run_number: int) -> Di
     explicitness = test_case["explicitness"]
     test_id = test_case["test_id"]
 
-    # Get mode and cleaned content
+    # Get mode and cleaned content, timing the classifier round-trip
+    start = time.perf_counter()
     detected_mode, cleaned_content = router.select_mode_and_clean_content(prompt)
+    latency_ms = (time.perf_counter() - start) * 1000
 
     return {
         "run_number": run_number,
@@ -352,6 +357,8 @@ def run_test_case(router: ContentRouter, test_case: Dict, run_number: int) -> Di
         "explicitness": explicitness,
         "test_id": test_id,
         "matches_expected": detected_mode == expected_mode,
+        "prompt_variant": router.prompt_variant,
+        "latency_ms": round(latency_ms, 1),
     }
 
 
@@ -644,30 +651,46 @@ def analyze_results(results_file: str):
 
 def main():
     """Main test execution function."""
+    parser = argparse.ArgumentParser(description="Measure classifier accuracy.")
+    parser.add_argument(
+        "--prompt", choices=["full", "compact"], default="full", help="Classifier prompt variant"
+    )
+    parser.add_argument("--runs", type=int, default=10, help="Runs per test case")
+    args = parser.parse_args()
+
+    # Every run must reach the classifier, not a result cached by an earlier run
+    Config.CLASSIFIER_CACHE_TTL = 0
+
     # Initialize router
-    router = ContentRouter()
+    router = ContentRouter(prompt_variant=args.prompt)
 
     # Load test cases
     test_cases = load_test_cases()
 
     # Run tests
     results = []
-    num_runs = 10  # Run each test case 10 times
+    num_runs = args.runs  # Run each test case 10 times by default
 
     for test_case in test_cases:
         for run in range(num_runs):
             result = run_test_case(router, test_case, run + 1)
             results.append(result)
 
-    # Save results in tests directory
+    # Save results in tests directory, other prompt variants get their own subdirectory
     output_dir = Path(__file__).parent
+    if args.prompt != "full":
+        output_dir = output_dir / f"prompt_{args.prompt}"
+        output_dir.mkdir(exist_ok=True)
     output_file = output_dir / "gateway_test_results.csv"
     save_results(results, str(output_file))
 
     # Analyze results
     analyze_results(str(output_file))
 
-    print(f"\nResults saved to {output_file}")
+    accuracy = sum(r["matches_expected"] for r in results) / len(results)
+    mean_latency = sum(r["latency_ms"] for r in results) / len(results)
+    print(f"\nPrompt '{args.prompt}': accuracy {accuracy:.1%}, mean latency {mean_latency:.0f} ms")
+    print(f"Results saved to {output_file}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+"""Tests for the provider rate limiter: token buckets, concurrency leases and deadlines."""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to sys.path so we can import pseudo
+parent_dir = str(Path(__file__).resolve().parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from pseudo.core.config import Config  # noqa: E402
+from pseudo.core.services import rate_limiter  # noqa: E402
+from pseudo.core.services.rate_limiter import RateLimiter, RateLimitTimeout  # noqa: E402
+
+
+class FakeClock:
+    """Stands in for the time module of the limiter; sleeping moves the clock forward."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.slept = 0.0
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept += seconds
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the limiter's clock with one that only moves when told to."""
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def limiter(tmp_path):
+    """Return a limiter on its own database."""
+    return RateLimiter(tmp_path / "limits.db")
+
+
+def leases(limiter):
+    """Return the number of leases stored, expired or not."""
+    return limiter._connection().execute("SELECT COUNT(*) FROM leases").fetchone()[0]
+
+
+# 60 requests per minute adds one token a second
+RATE = {"rate_limit": {"requests_per_minute": 60, "burst": 2}}
+CAP = {"rate_limit": {"max_concurrent": 2}}
+
+
+def test_bucket_refills_at_the_configured_rate(limiter, clock):
+    """After the burst, a token is added every 1 / rate seconds, up to the burst."""
+    for _ in range(2):
+        with limiter.limit("openai", "gpt-a", RATE, timeout=0):
+            pass
+    assert not limiter.available("openai", "gpt-a", RATE)
+
+    clock.now += 0.5
+    assert not limiter.available("openai", "gpt-a", RATE)
+    clock.now += 0.5
+    assert limiter.available("openai", "gpt-a", RATE)
+
+    # A long pause refills only up to the burst
+    clock.now += 3600
+    for _ in range(2):
+        with limiter.limit("openai", "gpt-a", RATE, timeout=0):
+            pass
+    with pytest.raises(RateLimitTimeout):
+        with limiter.limit("openai", "gpt-a", RATE, timeout=0):
+            pass
+    # Buckets are per model
+    assert limiter.available("openai", "gpt-b", RATE)
+
+
+def test_waiting_caller_gets_the_next_token(limiter, clock):
+    """A caller with time to wait sleeps until the next token is added."""
+    for _ in range(2):
+        with limiter.limit("openai", "gpt-a", RATE, timeout=0):
+            pass
+
+    with limiter.limit("openai", "gpt-a", RATE, timeout=5):
+        pass
+    assert clock.slept == pytest.approx(1.0)
+
+
+def test_deadline_expires_before_a_token_or_slot(limiter, clock):
+    """A caller gives up when the token or slot would not be free before its deadline."""
+    for _ in range(2):
+        with limiter.limit("openai", "gpt-a", RATE, timeout=0):
+            pass
+    # The next token is a second away, so a half-second deadline fails without waiting
+    with pytest.raises(RateLimitTimeout, match="openai/gpt-a"):
+        with limiter.limit("openai", "gpt-a", RATE, timeout=0.5):
+            pass
+    assert clock.slept == 0
+
+    # A held slot is polled for until the deadline
+    with limiter.limit("openai", "dall-e-3", CAP), limiter.limit("openai", "dall-e-3", CAP):
+        with pytest.raises(RateLimitTimeout):
+            with limiter.limit("openai", "dall-e-3", CAP, timeout=0.3):
+                pass
+    assert 0.25 <= clock.slept <= 0.3
+
+
+def test_slot_is_released_when_the_call_raises(limiter):
+    """A provider call that fails frees its concurrency slot."""
+    with pytest.raises(ValueError):
+        with limiter.limit("openai", "dall-e-3", CAP, timeout=0):
+            assert leases(limiter) == 1
+            raise ValueError("provider error")
+
+    assert leases(limiter) == 0
+    assert limiter.available("openai", "dall-e-3", CAP)
+
+
+def test_lease_of_a_crashed_worker_expires(limiter, clock):
+    """A slot that is never released is free again after RATE_LIMIT_LEASE_SECONDS."""
+    limits = rate_limiter.get_limits(CAP, "dall-e-3")
+    for _ in range(2):
+        limiter.acquire("openai", "dall-e-3", limits, timeout=0)
+    assert not limiter.available("openai", "dall-e-3", CAP)
+
+    clock.now += Config.RATE_LIMIT_LEASE_SECONDS + 1
+    assert limiter.available("openai", "dall-e-3", CAP)
+    with limiter.limit("openai", "dall-e-3", CAP, timeout=0):
+        assert leases(limiter) == 1
+
+
+def test_concurrent_callers_never_exceed_the_cap(tmp_path):
+    """Callers on separate connections to one database hold at most max_concurrent slots."""
+    db_path = tmp_path / "limits.db"
+    config = {"rate_limit": {"max_concurrent": 3, "requests_per_minute": 6000, "burst": 5}}
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def call(_):
+        nonlocal in_flight, peak
+        # A limiter per caller, like worker processes sharing the database
+        with RateLimiter(db_path).limit("openai", "gpt-a", config, timeout=30):
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=12) as executor:
+        list(executor.map(call, range(40)))
+
+    assert 1 < peak <= 3
+    assert leases(RateLimiter(db_path)) == 0
+    # 40 calls from a burst of 5 at 100 tokens a second take at least 0.35 seconds
+    assert time.monotonic() - start >= 0.35
@@ -0,0 +1,152 @@
+"""Tests for the orjson JSON provider and response compression."""
+
+import gzip
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+flask = pytest.importorskip("flask")
+
+# Add parent directory to sys.path so we can import pseudo
+parent_dir = str(Path(__file__).resolve().parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from pseudo.core import responses  # noqa: E402
+
+
+class FakeBrotli:
+    """Stands in for the brotli package, which is optional."""
+
+    @staticmethod
+    def compress(data, quality):
+        return b"br:" + data
+
+
+@pytest.fixture
+def app():
+    """Return a Flask app with the JSON provider and compression of create_app."""
+    app = flask.Flask(__name__)
+    app.config.update(
+        FAST_JSON=True, COMPRESS_MIN_SIZE=100, COMPRESS_GZIP_LEVEL=6, COMPRESS_BROTLI_QUALITY=5
+    )
+    responses.install_json_provider(app)
+    responses.register_compression(app)
+
+    @app.route("/big")
+    def big():
+        return flask.jsonify({"items": ["chat"] * 100})
+
+    @app.route("/small")
+    def small():
+        return flask.jsonify({"ok": True})
+
+    @app.route("/stream")
+    def stream():
+        lines = (json.dumps({"index": index}) + "\n" for index in range(100))
+        return flask.Response(lines, mimetype="application/x-ndjson")
+
+    @app.route("/image")
+    def image():
+        return flask.Response(b"\x89PNG" * 100, mimetype="image/png")
+
+    @app.route("/error")
+    def error():
+        return flask.jsonify({"error": "x" * 500}), 500
+
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def test_gzip_is_used_when_brotli_is_not_installed(client, monkeypatch):
+    """A client accepting both gets gzip if the brotli package is missing."""
+    monkeypatch.setattr(responses, "_brotli", lambda: None)
+    response = client.get("/big", headers={"Accept-Encoding": "br, gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert json.loads(gzip.decompress(response.data)) == {"items": ["chat"] * 100}
+
+
+def test_brotli_is_preferred_when_installed(client, monkeypatch):
+    """Brotli wins when the client accepts it, unless it is refused with q=0."""
+    monkeypatch.setattr(responses, "_brotli", lambda: FakeBrotli)
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.data.startswith(b"br:{")
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip, br;q=0"})
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_real_brotli_round_trips(client):
+    """With the brotli package installed, responses decompress to the original JSON."""
+    brotli = pytest.importorskip("brotli")
+    response = client.get("/big", headers={"Accept-Encoding": "br"})
+
+    assert response.headers["Content-Encoding"] == "br"
+    assert json.loads(brotli.decompress(response.data)) == {"items": ["chat"] * 100}
+
+
+def test_small_and_unaccepted_responses_are_sent_as_is(client, app):
+    """Bodies under COMPRESS_MIN_SIZE, or clients without gzip, get the plain body."""
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json() == {"ok": True}
+
+    response = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert len(response.data) > app.config["COMPRESS_MIN_SIZE"]
+
+
+@pytest.mark.parametrize("path", ["/stream", "/image", "/error"])
+def test_streams_media_and_errors_are_not_compressed(client, path):
+    """Streamed NDJSON, already compressed media and error responses pass through."""
+    response = client.get(path, headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert len(response.data) > 100
+
+
+def test_negative_min_size_turns_compression_off():
+    """COMPRESS_MIN_SIZE below zero registers no hook."""
+    app = flask.Flask(__name__)
+    app.config["COMPRESS_MIN_SIZE"] = -1
+    responses.register_compression(app)
+
+    assert app.after_request_funcs == {}
+
+
+def test_orjson_provider_matches_flask_output(app):
+    """Sorted keys, non-string keys and Flask's date format are kept."""
+    pytest.importorskip("orjson")
+    assert isinstance(app.json, responses.OrjsonProvider)
+
+    moment = datetime(2024, 6, 1, 12, 30, tzinfo=timezone.utc)
+    data = {"b": 1, "a": {2: "two"}, "when": moment}
+    assert json.loads(app.json.dumps(data)) == {
+        "a": {"2": "two"},
+        "b": 1,
+        "when": "Sat, 01 Jun 2024 12:30:00 GMT",
+    }
+    assert app.json.dumps(data).index('"a"') < app.json.dumps(data).index('"b"')
+    assert app.json.loads(b'{"x": [1, 2]}') == {"x": [1, 2]}
+
+
+def test_orjson_rejects_fall_back_to_the_standard_encoder(app):
+    """Values orjson cannot encode, like integers over 64 bits, still serialize."""
+    pytest.importorskip("orjson")
+    huge = 2**70
+
+    assert json.loads(app.json.dumps({"n": huge})) == {"n": huge}
+    with app.test_request_context():
+        response = flask.jsonify({"n": huge})
+    assert json.loads(response.get_data()) == {"n": huge}
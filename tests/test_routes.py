@@ -0,0 +1,237 @@
+"""Tests for the chat endpoints, served by Flask and by the ASGI app for uvicorn."""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to sys.path so we can import pseudo
+parent_dir = str(Path(__file__).resolve().parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from pseudo.core.config import Config  # noqa: E402
+from pseudo.core.services.chat_history import ChatManager  # noqa: E402
+
+
+@pytest.fixture
+def client(providers):
+    """Return a test client of an app whose providers are scripted."""
+    from pseudo.core.app import create_app
+
+    return create_app().test_client()
+
+
+def saved_messages(chat_id):
+    """Return the stored messages of a chat."""
+    return ChatManager(base_dir=Config.CHAT_HISTORY_DIR).get_chat(chat_id)["messages"]
+
+
+async def asgi_request(app, method, path, body=b""):
+    """Send one HTTP request to an ASGI app, returning (status, decoded JSON body)."""
+    events = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return events.pop(0) if events else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    await app(scope, receive, send)
+    body = b"".join(message.get("body", b"") for message in sent[1:])
+    return sent[0]["status"], json.loads(body)
+
+
+def test_chat_view_routes_in_the_request_thread(client, providers):
+    """The Flask view classifies and generates in its own thread and saves both messages."""
+    threads = set()
+    text = providers.text
+
+    def record_thread(*args, **kwargs):
+        threads.add(threading.get_ident())
+        return text(*args, **kwargs)
+
+    providers.text = record_thread
+    response = client.post("/api/chat", json={"message": "hello"})
+
+    assert response.status_code == 200
+    assert response.get_json()["response"] == "openai/gpt-a answers hello"
+    assert threads == {threading.get_ident()}
+    messages = saved_messages(response.get_json()["chat_id"])
+    assert [message["role"] for message in messages] == ["user", "assistant"]
+    assert messages[1]["metrics"]["route"] == "classifier"
+
+
+def test_asgi_app_serves_chat_on_the_event_loop(providers):
+    """Under uvicorn, chats waiting on providers run concurrently without a thread each."""
+    pytest.importorskip("asgiref")
+    from pseudo.core.server import create_asgi_app
+
+    app = create_asgi_app()
+    providers.delay = 0.2
+
+    async def chats(count):
+        requests = [
+            asgi_request(app, "POST", "/api/chat", json.dumps({"message": f"q{i}"}).encode())
+            for i in range(count)
+        ]
+        return await asyncio.gather(*requests)
+
+    start = time.perf_counter()
+    results = asyncio.run(chats(10))
+    # Sequential requests would take 10 x (classify + generate) = 4 seconds
+    assert time.perf_counter() - start < 2
+    assert all(status == 200 for status, _ in results)
+    assert sorted(body["response"] for _, body in results) == sorted(
+        f"openai/gpt-a answers q{i}" for i in range(10)
+    )
+    chat_id = results[0][1]["chat_id"]
+    assert [message["role"] for message in saved_messages(chat_id)] == ["user", "assistant"]
+
+    # Other routes still go through Flask
+    status, body = asyncio.run(asgi_request(app, "GET", "/api/chats"))
+    assert status == 200
+    assert len(body["chats"]) == 10
+
+    status, body = asyncio.run(asgi_request(app, "POST", "/api/chat", b"[1, 2]"))
+    assert status == 400
+    assert body == {"error": "Request body must be a JSON object"}
+
+
+def batch_lines(response):
+    """Return the decoded NDJSON lines of a batch response."""
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_batch_streams_every_item_and_saves_each_chat_once(client, providers, monkeypatch):
+    """Identical messages are classified once, and each chat is written once in input order."""
+    saves = []
+    add_messages = ChatManager.add_messages
+
+    def record_save(self, chat_id, messages, *args, **kwargs):
+        saves.append((chat_id, [message["content"] for message, _ in messages]))
+        return add_messages(self, chat_id, messages, *args, **kwargs)
+
+    monkeypatch.setattr(ChatManager, "add_messages", record_save)
+    other = ChatManager(base_dir=Config.CHAT_HISTORY_DIR).create_new_chat(save=True)
+    providers.delay = 0.05
+    messages = [
+        {"message": "same", "id": "a"},
+        {"message": "same", "chat_id": other},
+        {"message": "pinned", "model": "anthropic/claude"},
+        {"message": "last"},
+    ]
+
+    response = client.post("/api/chat/batch", json={"messages": messages})
+
+    assert response.status_code == 200
+    lines = batch_lines(response)
+    assert lines[-1] == {"done": True, "count": 4}
+    results = {line["index"]: line for line in lines[:-1]}
+    assert sorted(results) == [0, 1, 2, 3]
+    assert results[0]["id"] == "a"
+    assert results[2]["response"] == "anthropic/claude answers pinned"
+
+    # "same" is classified once, the pinned text item not at all
+    assert sorted(prompt[-1]["content"] for _, _, prompt in providers.kinds("classify")) == [
+        "last",
+        "same",
+    ]
+
+    new_chat = results[0]["chat_id"]
+    assert results[1]["chat_id"] == other
+    turns = [[item["message"], results[index]["response"]] for index, item in enumerate(messages)]
+    assert sorted(saves) == sorted([(new_chat, turns[0] + turns[2] + turns[3]), (other, turns[1])])
+    metrics = [message["metrics"] for message in saved_messages(new_chat)[1::2]]
+    assert [m["route"] for m in metrics] == ["batch", "pinned", "batch"]
+    # Items wait for their shared classification, pinned text items do not
+    assert metrics[0]["classify_ms"] > 0
+    assert metrics[1]["classify_ms"] == 0
+
+
+@pytest.mark.parametrize(
+    "body, error",
+    [
+        ([{"message": "hi"}], "Request body must be a JSON object"),
+        ({"messages": []}, "No messages provided"),
+        ({"messages": [{"message": "hi"}, {"mode": "text"}]}, "Every batch item needs a message"),
+        ({"messages": [{"message": "hi", "mode": "video"}]}, "Unsupported mode: video"),
+        ({"messages": [{"message": "hi"}], "model": "openai/unknown"}, "openai/unknown"),
+    ],
+)
+def test_batch_rejects_invalid_requests(client, providers, body, error):
+    """Malformed bodies and items are refused before anything is generated."""
+    response = client.post("/api/chat/batch", json=body)
+
+    assert response.status_code == 400
+    assert error in response.get_json()["error"]
+    assert providers.calls == []
+
+
+def test_batch_size_is_limited(client, providers):
+    """A batch over BATCH_MAX_MESSAGES is refused."""
+    client.application.config["BATCH_MAX_MESSAGES"] = 2
+    response = client.post("/api/chat/batch", json={"messages": [{"message": "hi"}] * 3})
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Too many messages, the limit is 2"}
+
+
+def test_pinned_model_is_tried_first_then_the_queue(client, providers):
+    """A pinned text model answers without classification, a failing one falls back."""
+    response = client.post("/api/chat", json={"message": "hi", "model": "anthropic/claude"})
+
+    assert response.status_code == 200
+    assert response.get_json()["response"] == "anthropic/claude answers hi"
+    assert providers.kinds("classify") == []
+
+    providers.failing.add(("anthropic", "claude"))
+    response = client.post("/api/chat", json={"message": "again", "model": "anthropic/claude"})
+
+    assert response.status_code == 200
+    assert response.get_json()["response"] == "openai/gpt-a answers again"
+    assert [call[:2] for call in providers.kinds("text")[1:]] == [
+        ("anthropic", "claude"),
+        ("openai", "gpt-a"),
+    ]
+    assert providers.kinds("classify") == []
+    metrics = saved_messages(response.get_json()["chat_id"])[1]["metrics"]
+    assert metrics["route"] == "pinned"
+
+
+@pytest.mark.parametrize(
+    "body, error",
+    [
+        ({"message": "hi", "model": "openai/gpt-4"}, "Unknown model: openai/gpt-4"),
+        (
+            {"message": "hi", "model": "openai/dall-e-3", "mode": "text"},
+            "Unknown model for text mode: openai/dall-e-3",
+        ),
+    ],
+)
+def test_unknown_pinned_model_is_refused(client, providers, body, error):
+    """A model that is not configured, or not for the pinned mode, is a 400."""
+    response = client.post("/api/chat", json=body)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+    assert providers.calls == []
@@ -0,0 +1,171 @@
+"""Tests for adaptive provider ordering from measured latency and success rate."""
+
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to sys.path so we can import pseudo
+parent_dir = str(Path(__file__).resolve().parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from pseudo.core.config import Config  # noqa: E402
+from pseudo.core.services import content_router, scheduler  # noqa: E402
+from pseudo.core.services.content_router import ContentRouter  # noqa: E402
+from pseudo.core.services.metrics import attempt  # noqa: E402
+from pseudo.core.services.scheduler import ProviderScheduler  # noqa: E402
+
+
+@pytest.fixture
+def adaptive(providers, tmp_path, monkeypatch):
+    """Turn adaptive routing on for the router, without exploration, on a fresh database."""
+    monkeypatch.setattr(Config, "ADAPTIVE_ROUTING", True)
+    monkeypatch.setattr(Config, "ADAPTIVE_EXPLORATION", 0.0)
+    fresh = ProviderScheduler(tmp_path / "adaptive.db")
+    monkeypatch.setattr(content_router, "provider_scheduler", fresh)
+    return fresh
+
+
+def test_scheduler_orders_by_expected_time(tmp_path, monkeypatch):
+    """Measured entries are ordered by latency over success rate, failing ones go last."""
+    monkeypatch.setattr(Config, "ADAPTIVE_EXPLORATION", 0.0)
+    scheduler = ProviderScheduler(tmp_path / "adaptive.db")
+    queue = [("openai", "gpt-4o"), ("anthropic", "claude"), ("ollama", "llama3"), ("x", "new")]
+
+    # Without data the configured order is kept
+    assert scheduler.order("text", queue) == queue
+
+    for _ in range(5):
+        scheduler.record(
+            "text",
+            [
+                attempt("openai", "gpt-4o", 2.0),
+                attempt("anthropic", "claude", 0.5),
+                attempt("ollama", "llama3", 0.1, "connection refused"),
+            ],
+        )
+
+    assert scheduler.order("text", queue) == [
+        ("anthropic", "claude"),
+        ("openai", "gpt-4o"),
+        ("x", "new"),
+        ("ollama", "llama3"),
+    ]
+    # Statistics are kept per mode
+    assert scheduler.order("image", queue) == queue
+
+    # Another process reading the same database learns the same order
+    assert ProviderScheduler(tmp_path / "adaptive.db").order("text", queue)[0] == (
+        "anthropic",
+        "claude",
+    )
+    snapshot = scheduler.snapshot()["modes"]["text"]
+    assert [entry["model"] for entry in snapshot] == ["claude", "gpt-4o", "llama3"]
+    assert snapshot[-1]["expected_ms"] is None
+
+
+def test_scheduler_explores_other_entries(tmp_path, monkeypatch):
+    """With exploration on, another entry is sometimes tried first."""
+    monkeypatch.setattr(Config, "ADAPTIVE_EXPLORATION", 1.0)
+    scheduler = ProviderScheduler(tmp_path / "adaptive.db")
+    queue = [("openai", "gpt-4o"), ("anthropic", "claude")]
+
+    assert scheduler.order("text", queue) == [("anthropic", "claude"), ("openai", "gpt-4o")]
+
+
+def test_averages_move_by_alpha_per_call(tmp_path, monkeypatch):
+    """Each call moves latency and success rate by alpha, failures leave latency alone."""
+    monkeypatch.setattr(Config, "ADAPTIVE_EWMA_ALPHA", 0.5)
+    scheduler = ProviderScheduler(tmp_path / "adaptive.db")
+
+    scheduler.record("text", [attempt("openai", "gpt-a", 0.1)])
+    scheduler.record("text", [attempt("openai", "gpt-a", 0.2)])
+    scheduler.record("text", [attempt("openai", "gpt-a", 5.0, "timeout")])
+
+    (entry,) = scheduler.snapshot()["modes"]["text"]
+    assert entry["calls"] == 3
+    assert entry["latency_ms"] == pytest.approx(150.0)
+    assert entry["success_rate"] == pytest.approx(0.5)
+    assert entry["expected_ms"] == pytest.approx(300.0)
+
+
+def test_recent_calls_change_the_order(tmp_path, monkeypatch):
+    """An entry that slows down is overtaken once its average passes the next one."""
+    monkeypatch.setattr(Config, "ADAPTIVE_EXPLORATION", 0.0)
+    monkeypatch.setattr(Config, "ADAPTIVE_EWMA_ALPHA", 0.5)
+    scheduler = ProviderScheduler(tmp_path / "adaptive.db")
+    queue = [("openai", "gpt-a"), ("anthropic", "claude")]
+    scheduler.record("text", [attempt("openai", "gpt-a", 0.1), attempt("anthropic", "claude", 0.2)])
+    assert scheduler.order("text", queue) == queue
+
+    # 100 -> 550 ms after one slow call, still behind claude's 200 ms
+    scheduler.record("text", [attempt("openai", "gpt-a", 1.0)])
+    assert scheduler.order("text", queue) == [("anthropic", "claude"), ("openai", "gpt-a")]
+
+    # Two fast calls bring it back to 550 -> 325 -> 212 ms, then 156 ms
+    for _ in range(2):
+        scheduler.record("text", [attempt("openai", "gpt-a", 0.1)])
+    assert scheduler.order("text", queue) == [("anthropic", "claude"), ("openai", "gpt-a")]
+    scheduler.record("text", [attempt("openai", "gpt-a", 0.1)])
+    assert scheduler.order("text", queue) == queue
+
+
+def test_no_exploration_is_deterministic(tmp_path, monkeypatch):
+    """With ADAPTIVE_EXPLORATION at 0, even the lowest random draw keeps the measured order."""
+    monkeypatch.setattr(Config, "ADAPTIVE_EXPLORATION", 0.0)
+    monkeypatch.setattr(scheduler.random, "random", lambda: 0.0)
+    ordering = ProviderScheduler(tmp_path / "adaptive.db")
+    queue = [("openai", "gpt-a"), ("anthropic", "claude"), ("ollama", "llama3")]
+    ordering.record("text", [attempt("ollama", "llama3", 0.1), attempt("openai", "gpt-a", 0.3)])
+
+    orders = {tuple(ordering.order("text", queue)) for _ in range(100)}
+    assert orders == {(("ollama", "llama3"), ("openai", "gpt-a"), ("anthropic", "claude"))}
+
+
+def test_pinned_entries_stay_in_front(adaptive, providers):
+    """A pinned model, then providers marked pinned, go before the adaptive order."""
+    credentials_file = Path(os.environ["PSEUDO_CREDENTIALS_PATH"])
+    credentials = json.loads(credentials_file.read_text())
+    credentials["modes"]["text"]["providers"]["anthropic"]["pinned"] = True
+    credentials_file.write_text(json.dumps(credentials))
+    adaptive.record(
+        "text",
+        [
+            attempt("ollama", "llama3", 0.1),
+            attempt("openai", "gpt-b", 0.2),
+            attempt("openai", "gpt-a", 0.4),
+            attempt("anthropic", "claude", 2.0),
+        ],
+    )
+    router = ContentRouter()
+
+    assert list(router._provider_candidates("text")) == [
+        ("anthropic", "claude"),
+        ("ollama", "llama3"),
+        ("openai", "gpt-b"),
+        ("openai", "gpt-a"),
+    ]
+    assert list(router._provider_candidates("text", "openai", "gpt-a")) == [
+        ("openai", "gpt-a"),
+        ("anthropic", "claude"),
+        ("ollama", "llama3"),
+        ("openai", "gpt-b"),
+    ]
+
+
+def test_coalesced_requests_are_recorded_once(adaptive, providers, monkeypatch):
+    """Only the request that called the provider feeds the averages."""
+    monkeypatch.setattr(Config, "REQUEST_COALESCING", True)
+    providers.delay = 0.2
+    router = ContentRouter()
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(lambda _: router.process_content("text", "hi"), range(3)))
+
+    assert len(providers.kinds("text")) == 1
+    (entry,) = adaptive.snapshot()["modes"]["text"]
+    assert (entry["provider"], entry["model"], entry["calls"]) == ("openai", "gpt-a", 1)
@@ -0,0 +1,120 @@
+"""Tests for the SQLite cache shared by worker processes and the classifier cache on it."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to sys.path so we can import pseudo
+parent_dir = str(Path(__file__).resolve().parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from pseudo.core.config import Config  # noqa: E402
+from pseudo.core.services import content_router, shared_cache  # noqa: E402
+from pseudo.core.services.content_router import ContentRouter  # noqa: E402
+from pseudo.core.services.shared_cache import SharedCache  # noqa: E402
+
+
+class FakeClock:
+    """Stands in for the time module of the cache; every reading is a second later."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def time(self) -> float:
+        self.now += 1
+        return self.now
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Return an enabled cache on its own database."""
+    monkeypatch.setattr(Config, "SHARED_CACHE", True)
+    return SharedCache(tmp_path / "cache.db")
+
+
+def test_entries_are_shared_between_connections(cache):
+    """A value written through one cache object is read through another on the database."""
+    cache.set("chat_summary", "a", {"title": "Chat"}, validator="1:10")
+    other = SharedCache(cache.db_path)
+
+    assert other.get("chat_summary", "a", validator="1:10") == {"title": "Chat"}
+    assert other.get("classifier", "a", validator="1:10") is None
+
+
+def test_validator_mismatch_is_a_miss(cache):
+    """An entry written for another version of its source is not returned."""
+    cache.set("chat_summary", "a", {"title": "Old title"}, validator="1:10:100")
+
+    assert cache.get("chat_summary", "a", validator="1:12:200") is None
+    assert cache.get("chat_summary", "a") is None
+    assert cache.get("chat_summary", "a", validator="1:10:100") == {"title": "Old title"}
+
+    counters = cache.snapshot()["namespaces"]["chat_summary"]
+    assert (counters["hits"], counters["misses"], counters["entries"]) == (1, 2, 1)
+
+    # A new value replaces the entry along with its validator
+    cache.set("chat_summary", "a", {"title": "New title"}, validator="1:12:200")
+    assert cache.get("chat_summary", "a", validator="1:12:200") == {"title": "New title"}
+    assert cache.get("chat_summary", "a", validator="1:10:100") is None
+
+
+def test_least_recently_used_entries_are_evicted_per_namespace(cache, monkeypatch):
+    """Each namespace keeps its SHARED_CACHE_MAX_ENTRIES most recently used entries."""
+    monkeypatch.setattr(shared_cache, "time", FakeClock())
+    monkeypatch.setattr(shared_cache, "TOUCH_INTERVAL", 0)
+    monkeypatch.setattr(shared_cache, "EVICT_EVERY", 1)
+    monkeypatch.setattr(Config, "SHARED_CACHE_MAX_ENTRIES", 3)
+
+    cache.set("chat_summary", "other", {"title": "Other"})
+    for index in range(3):
+        cache.set("classifier", str(index), [index])
+    # Reading the oldest entry makes it the most recently used
+    assert cache.get("classifier", "0") == [0]
+    cache.set("classifier", "3", [3])
+
+    assert [cache.get("classifier", str(index)) for index in range(4)] == [[0], None, [2], [3]]
+    assert cache.get("chat_summary", "other") == {"title": "Other"}
+
+
+def test_disabled_cache_stores_nothing(cache, monkeypatch):
+    """With SHARED_CACHE off every lookup misses without touching the database."""
+    monkeypatch.setattr(Config, "SHARED_CACHE", False)
+    cache.set("classifier", "a", ["text", "a"])
+
+    assert cache.get("classifier", "a") is None
+    assert not cache.db_path.exists()
+
+
+def test_classifications_expire_after_the_ttl(providers, cache, monkeypatch):
+    """A cached classification is reused within CLASSIFIER_CACHE_TTL and not after it."""
+    monkeypatch.setattr(content_router, "shared_cache", cache)
+    monkeypatch.setattr(Config, "CLASSIFIER_CACHE_TTL", 60)
+    router = ContentRouter()
+    providers.classifications["draw a cat"] = ("image", "a cat")
+
+    assert router.select_mode_and_clean_content("draw a cat") == ("image", "a cat")
+    assert router.select_mode_and_clean_content("draw a cat") == ("image", "a cat")
+    assert len(providers.kinds("classify")) == 1
+
+    # Age the entry past the TTL
+    key = router._classification_key("draw a cat")
+    mode, cleaned, made = cache.get("classifier", key)
+    cache.set("classifier", key, [mode, cleaned, made - 61])
+    providers.classifications["draw a cat"] = ("text", "draw a cat")
+
+    assert router.select_mode_and_clean_content("draw a cat") == ("text", "draw a cat")
+    assert len(providers.kinds("classify")) == 2
+
+
+def test_classifier_cache_is_off_by_default(monkeypatch):
+    """Without CLASSIFIER_CACHE_TTL set, classifications are not cached."""
+    monkeypatch.delenv("CLASSIFIER_CACHE_TTL", raising=False)
+    code = "from pseudo.core.config import Config; print(Config.CLASSIFIER_CACHE_TTL)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=parent_dir, capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "0"